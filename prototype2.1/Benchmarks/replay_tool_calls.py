@@ -0,0 +1,142 @@
+# Benchmarks/replay_tool_calls.py
+#
+# Replays tool calls recorded by projectfiles_main (TOOL_CALL_LOG=<file> or
+# run_conversation(record_path=...)) directly against the tool instances, with no
+# LLM involved, and reports latency percentiles, throughput and result drift.
+#
+# Run from the prototype2.1 directory:
+#   python -m Benchmarks.replay_tool_calls calls.jsonl --repeat 3 --output run_v2.jsonl
+#   python -m Benchmarks.replay_tool_calls calls.jsonl --baseline run_v1.jsonl
+
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from Tools.tool_call_recorder import load_tool_calls, result_digest
+
+# Tools that call an LLM themselves are skipped unless explicitly requested
+LLM_BACKED_TOOLS = {"query_dataset"}
+
+
+def replay(calls, available_functions, repeat=1):
+    """Execute every recorded call `repeat` times and return one result entry per execution."""
+    results = []
+    for _ in range(repeat):
+        for index, call in enumerate(calls):
+            function = available_functions.get(call["tool"])
+            start = time.perf_counter()
+            error = None
+            digest = None
+            try:
+                if function is None:
+                    raise KeyError(f"Unknown tool: {call['tool']}")
+                result = function(**call["arguments"])
+                # Only the tool call is timed, not hashing its result
+                latency_ms = (time.perf_counter() - start) * 1000
+                digest = result_digest(result)
+            except Exception as e:
+                latency_ms = (time.perf_counter() - start) * 1000
+                error = str(e)
+            results.append({
+                "index": index,
+                "tool": call["tool"],
+                "latency_ms": latency_ms,
+                "result_hash": digest,
+                "error": error,
+            })
+    return results
+
+
+def summarize(results, reference_hashes, wall_time):
+    """Compute per-tool latency percentiles, error and drift counts, and overall throughput."""
+    by_tool = defaultdict(list)
+    for entry in results:
+        by_tool[entry["tool"]].append(entry)
+
+    summary = {}
+    for tool, entries in sorted(by_tool.items()):
+        latencies = np.array([entry["latency_ms"] for entry in entries])
+        drifted = sum(
+            1 for entry in entries
+            if entry["error"] is None
+            and reference_hashes.get(entry["index"]) is not None
+            and entry["result_hash"] != reference_hashes[entry["index"]]
+        )
+        summary[tool] = {
+            "calls": len(entries),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "mean_ms": float(latencies.mean()),
+            "errors": sum(1 for entry in entries if entry["error"] is not None),
+            "drifted": drifted,
+        }
+
+    return {
+        "total_calls": len(results),
+        "wall_time_s": wall_time,
+        "throughput_calls_per_s": len(results) / wall_time if wall_time > 0 else 0.0,
+        "tools": summary,
+    }
+
+
+def print_report(report):
+    print(f"{'tool':<40}{'calls':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'drift':>7}")
+    for tool, stats in report["tools"].items():
+        print(f"{tool:<40}{stats['calls']:>7}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+              f"{stats['p99_ms']:>10.2f}{stats['errors']:>8}{stats['drifted']:>7}")
+    print(f"\n{report['total_calls']} calls in {report['wall_time_s']:.2f}s "
+          f"({report['throughput_calls_per_s']:.1f} calls/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded tool calls and benchmark the tools offline.")
+    parser.add_argument("recording", help="JSONL file written by the tool call recorder")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of passes over the recording")
+    parser.add_argument("--tools", help="Comma-separated list of tools to replay (default: all)")
+    parser.add_argument("--include-llm-tools", action="store_true",
+                        help="Also replay tools that call an LLM (e.g. query_dataset)")
+    parser.add_argument("--baseline", help="Results file from a previous replay to measure drift against "
+                                           "(default: the hashes in the recording)")
+    parser.add_argument("--output", help="Write per-call results to this JSONL file for later comparisons")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    calls = [call for call in load_tool_calls(args.recording) if call.get("error") is None]
+    if args.tools:
+        selected = set(args.tools.split(","))
+        calls = [call for call in calls if call["tool"] in selected]
+    if not args.include_llm_tools:
+        calls = [call for call in calls if call["tool"] not in LLM_BACKED_TOOLS]
+
+    if args.baseline:
+        reference_hashes = {entry["index"]: entry["result_hash"] for entry in load_tool_calls(args.baseline)}
+    else:
+        reference_hashes = {index: call.get("result_hash") for index, call in enumerate(calls)}
+
+    # Replayed calls must not be recorded again into the log being replayed
+    os.environ.pop("TOOL_CALL_LOG", None)
+    # Imported here so that loading every dataset is not part of the measured time
+    from projectfiles_main import available_functions
+
+    start = time.perf_counter()
+    results = replay(calls, available_functions, args.repeat)
+    report = summarize(results, reference_hashes, time.perf_counter() - start)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for entry in results:
+                f.write(json.dumps(entry) + "\n")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
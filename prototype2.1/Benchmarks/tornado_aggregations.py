@@ -0,0 +1,145 @@
+# Benchmarks/tornado_aggregations.py
+#
+# Times TornadoAnalysisTool's severity_impact and temporal_patterns analyses
+# against the original per-group filtering implementations (kept below as the
+# reference) on the full tornado dataset, and checks both return the same values.
+#
+# Run from the prototype2.1 directory:
+#   python -m Benchmarks.tornado_aggregations
+#   python -m Benchmarks.tornado_aggregations Datasets/Tornados.csv --repeat 20 --state TX
+
+import argparse
+import math
+import statistics
+import time
+
+import pandas as pd
+
+from Tools.tornado_analysis_tool import TornadoAnalysisTool
+
+
+def legacy_severity_impact(data: pd.DataFrame, state: str = None):
+    """Original implementation: re-filters the frame for every magnitude."""
+    if state:
+        data = data[data['st'] == state]
+    return {
+        "analysis": "severity_impact",
+        "magnitude_distribution": {
+            str(mag): {
+                "count": int(count),
+                "avg_injuries": float(data[data['mag'] == mag]['inj'].mean()),
+                "avg_fatalities": float(data[data['mag'] == mag]['fat'].mean()),
+                "avg_loss": float(data[data['mag'] == mag]['loss'].mean())
+            }
+            for mag, count in data['mag'].value_counts().items()
+        },
+        "correlation": {
+            "magnitude_injuries": float(data['mag'].corr(data['inj'])),
+            "magnitude_fatalities": float(data['mag'].corr(data['fat'])),
+            "magnitude_loss": float(data['mag'].corr(data['loss']))
+        },
+        "total_impact": {
+            "total_injuries": int(data['inj'].sum()),
+            "total_fatalities": int(data['fat'].sum()),
+            "total_loss": float(data['loss'].sum())
+        }
+    }
+
+
+def legacy_time_distribution(data: pd.DataFrame):
+    """Original time-of-day buckets, compared on the raw 'HH:MM:SS' strings."""
+    time_counts = data['time'].value_counts()
+    return {
+        "morning": int(time_counts[(time_counts.index >= '06:00:00') & (time_counts.index < '12:00:00')].sum()),
+        "afternoon": int(time_counts[(time_counts.index >= '12:00:00') & (time_counts.index < '18:00:00')].sum()),
+        "evening": int(time_counts[(time_counts.index >= '18:00:00') & (time_counts.index < '22:00:00')].sum()),
+        "night": int(time_counts[(time_counts.index >= '22:00:00') | (time_counts.index < '06:00:00')].sum())
+    }
+
+
+def legacy_temporal_patterns(data: pd.DataFrame, state: str = None):
+    """Original implementation: re-filters the frame for every year and season."""
+    if state:
+        data = data[data['st'] == state]
+    return {
+        "analysis": "temporal_patterns",
+        "yearly_trends": {
+            str(year): {
+                "count": int(count),
+                "avg_magnitude": float(data[data['yr'] == year]['mag'].mean()),
+                "total_injuries": int(data[data['yr'] == year]['inj'].sum()),
+                "total_fatalities": int(data[data['yr'] == year]['fat'].sum())
+            }
+            for year, count in data['yr'].value_counts().items()
+        },
+        "monthly_distribution": {
+            str(month): int(count)
+            for month, count in data['mo'].value_counts().sort_index().items()
+        },
+        "time_of_day": legacy_time_distribution(data),
+        "seasonal_patterns": {
+            "spring": int(data[data['mo'].isin([3, 4, 5])].shape[0]),
+            "summer": int(data[data['mo'].isin([6, 7, 8])].shape[0]),
+            "fall": int(data[data['mo'].isin([9, 10, 11])].shape[0]),
+            "winter": int(data[data['mo'].isin([12, 1, 2])].shape[0])
+        }
+    }
+
+
+def time_call(function, repeat):
+    """Return the median wall time of `repeat` calls in milliseconds, and the last result."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def same_values(expected, actual, rel_tol=1e-9):
+    """Compare nested results, treating NaN as equal and allowing float rounding differences."""
+    if isinstance(expected, dict):
+        return isinstance(actual, dict) and expected.keys() == actual.keys() and all(
+            same_values(expected[key], actual[key], rel_tol) for key in expected
+        )
+    if isinstance(expected, float):
+        return (math.isnan(expected) and math.isnan(actual)) or math.isclose(expected, actual, rel_tol=rel_tol)
+    return expected == actual
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tornado severity and temporal aggregations.")
+    parser.add_argument("path", nargs="?", default="Datasets/Tornados.csv", help="Path to Tornados.csv")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed calls per implementation")
+    parser.add_argument("--state", help="Also restrict both analyses to this state code")
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.path)
+    tool = TornadoAnalysisTool(data)
+    rows = int((data['st'] == args.state).sum()) if args.state else len(data)
+
+    # Warm up, so one-off precomputation is not part of the timings
+    tool.analyze_severity_impact(state=args.state)
+    tool.analyze_temporal_patterns(state=args.state)
+
+    cases = [
+        ("severity_impact",
+         lambda: legacy_severity_impact(data, args.state),
+         lambda: tool.analyze_severity_impact(state=args.state)),
+        ("temporal_patterns",
+         lambda: legacy_temporal_patterns(data, args.state),
+         lambda: tool.analyze_temporal_patterns(state=args.state)),
+    ]
+
+    print(f"{rows} tornadoes, median of {args.repeat} runs\n")
+    print(f"{'analysis':<22}{'legacy ms':>12}{'current ms':>12}{'speedup':>10}{'same result':>13}")
+    for name, legacy, current in cases:
+        legacy_ms, expected = time_call(legacy, args.repeat)
+        current_ms, actual = time_call(current, args.repeat)
+        speedup = legacy_ms / current_ms if current_ms > 0 else float("inf")
+        print(f"{name:<22}{legacy_ms:>12.2f}{current_ms:>12.2f}{speedup:>9.1f}x"
+              f"{str(same_values(expected, actual)):>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,12 @@
 import json
 import pandas as pd
 from Tools.ghgcontribution_tool import GHGContributionTool
-from groq import Groq  # Replace with your actual client import
+from Tools.llm_client import LLMClient
 from Configurations.api import API_KEY
 
 # Constants
 MODEL = 'llama3-groq-70b-8192-tool-use-preview'  # Replace with your actual model name
-client = Groq(api_key=API_KEY)  # Replace with your actual API key
+client = LLMClient.from_env(api_key=API_KEY)
 
 # Load your GHG emissions targets data into a DataFrame
 contribution_data = pd.read_csv('Datasets/CW_NDC.csv')  # Update the filename as necessary
@@ -3,7 +3,7 @@
 import json
 import pandas as pd
 from Tools.ghgemission_tool import EmissionsTool
-from groq import Groq  # Replace with your actual client import
+from Tools.llm_client import LLMClient
 from dotenv import load_dotenv
 from Configurations.api import API_KEY
 
@@ -34,7 +34,7 @@ available_functions = {
 }
 
 # Initialize your client for the LLM API
-client = Groq(api_key=API_KEY)
+client = LLMClient.from_env(api_key=API_KEY)
 
 # Function to handle the LLM conversation
 def run_conversation():
@@ -3,12 +3,12 @@
 import json
 import pandas as pd
 from Tools.landcover_tool import LandCoverTool
-from groq import Groq  # Replace with your actual client import
+from Tools.llm_client import LLMClient
 from Configurations.api import API_KEY
 
 # Constants
 MODEL = 'llama3-groq-70b-8192-tool-use-preview'  # Replace with your actual model name
-client = Groq(api_key=API_KEY)  # Replace with your actual API key
+client = LLMClient.from_env(api_key=API_KEY)
 
 # Load your sea level and GMSL data into DataFrames
 land_cover_data = pd.read_csv('Datasets/Land_Cover_Accounts.csv')
@@ -3,12 +3,12 @@
 import json
 import pandas as pd
 from Tools.sea_level_tool import SeaLevelTool
-from groq import Groq  # Replace with your actual client import
+from Tools.llm_client import LLMClient
 from Configurations.api import API_KEY
 
 # Constants
 MODEL = 'llama3-groq-70b-8192-tool-use-preview'  # Replace with your actual model name
-client = Groq(api_key=API_KEY)
+client = LLMClient.from_env(api_key=API_KEY)
 
 # Load your sea level and GMSL data into DataFrames
 sea_level_df = pd.read_csv('Datasets/Sea_Level_cleaned 2.csv')
@@ -0,0 +1,51 @@
+import pytest
+from Tools.answer_cache import AnswerCache, is_error_result, normalize_question, is_standalone_question
+
+def test_normalize_question_ignores_case_punctuation_and_filler():
+    assert normalize_question("What was the most fuel-efficient car in 2020?") == \
+        normalize_question("most fuel efficient car in 2020")
+
+def test_normalize_question_canonicalizes_entities():
+    assert normalize_question("Compare Germany's wind power") == "compare country_de wind power"
+    assert normalize_question("Tornadoes in West Virginia") == "tornadoes in state_wv"
+
+def test_follow_up_questions_are_not_standalone():
+    assert not is_standalone_question("and France?")
+    assert not is_standalone_question("What about wind power in France in 2020?")
+    assert not is_standalone_question("Show me the same for Texas")
+    assert is_standalone_question("Compare tornado characteristics between Oklahoma and Kansas")
+
+def test_cache_round_trip(tmp_path):
+    cache = AnswerCache("v1", path=str(tmp_path / "cache.sqlite3"))
+    tool_calls = [{"name": "analyze_national_wind_power", "arguments": {"analysis_type": "country_comparison", "country": "Germany"}}]
+    cache.put("Compare Germany's wind power performance", "Germany ranks 3rd.", tool_calls)
+    cached = cache.get("compare germany wind power performance")
+    assert cached == {"answer": "Germany ranks 3rd.", "tool_calls": tool_calls}
+
+def test_cache_skips_answers_without_tool_calls(tmp_path):
+    cache = AnswerCache("v1", path=str(tmp_path / "cache.sqlite3"))
+    cache.put("Which dataset should I use for solar?", "Please specify SARAH or MERRA.", [])
+    assert cache.get("Which dataset should I use for solar?") is None
+
+def test_cache_invalidated_by_dataset_version(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    tool_calls = [{"name": "analyze_tornado_data", "arguments": {"analysis_type": "f_scale_distribution"}}]
+    AnswerCache("v1", path=path).put("Show the F-scale distribution for all tornadoes", "answer", tool_calls)
+    assert AnswerCache("v1", path=path).get("Show the F-scale distribution for all tornadoes") is not None
+    assert AnswerCache("v2", path=path).get("Show the F-scale distribution for all tornadoes") is None
+
+def test_cache_skips_turns_with_failed_tool_calls(tmp_path):
+    cache = AnswerCache("v1", path=str(tmp_path / "cache.sqlite3"))
+    question = "What is the average CO2 emission per make in fuel_data?"
+    cache.put(question, "I couldn't run that query.", [
+        {"name": "sql_query", "arguments": {"query": "SELECT make, AVG(co2) FROM fuel"}, "failed": True},
+        {"name": "average_co2_by_make", "arguments": {}, "failed": False},
+    ])
+    assert cache.get(question) is None
+    cache.put(question, "Make A averages 210 g/km.", [{"name": "average_co2_by_make", "arguments": {}, "failed": False}])
+    assert cache.get(question)["answer"] == "Make A averages 210 g/km."
+
+def test_error_results_are_detected():
+    assert is_error_result({"error": "Only SELECT queries are allowed", "note": "..."})
+    assert not is_error_result({"rows": [], "row_count": 0})
+    assert not is_error_result("error")
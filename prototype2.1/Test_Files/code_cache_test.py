@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+from Tools.code_cache import GeneratedCodeCache, UnsafeCodeError, execute_generated_code, validate_generated_code
+
+@pytest.fixture
+def data():
+    return pd.DataFrame({"country": ["DE", "FR", "ES"], "output": [0.2, 0.3, 0.5]})
+
+def test_typical_generated_code_runs(data):
+    code = (
+        "import pandas as pd\n"
+        "from datetime import datetime\n"
+        "df = dfs[0]\n"
+        "top = df.sort_values('output', ascending=False).query('output > 0.25')\n"
+        "result = {'type': 'dataframe', 'value': top.assign(share=top['output'] / np.sum(df['output']))}\n"
+    )
+    answer = execute_generated_code(code, data)
+    assert [row["country"] for row in answer] == ["ES", "FR"]
+    text = "result = {'type': 'string', 'value': dfs[0].head(2).to_string(index=False)}"
+    assert "DE" in execute_generated_code(text, data)
+
+@pytest.mark.parametrize("code", [
+    "result = {'type': 'string', 'value': str(pd.io.common.os.listdir('/'))}",
+    "import pandas as pd\nresult = {'type': 'dataframe', 'value': pd.read_pickle('/tmp/x.pkl')}",
+    "result = {'type': 'dataframe', 'value': pd.read_csv('/etc/passwd')}",
+    "dfs[0].to_csv('/tmp/out.csv')\nresult = {'type': 'number', 'value': 1}",
+    "dfs[0].to_string('/tmp/out.txt')\nresult = {'type': 'number', 'value': 1}",
+    "dfs[0]['output'].to_numpy().tofile('/tmp/out.bin')\nresult = {'type': 'number', 'value': 1}",
+    "result = {'type': 'number', 'value': np.load('/tmp/x.npy')}",
+    "from pandas import read_parquet\nresult = {'type': 'number', 'value': 1}",
+    "import statistics\nresult = {'type': 'string', 'value': str(statistics.sys.path)}",
+    "import os\nresult = {'type': 'number', 'value': 1}",
+    "import numpy.lib.npyio\nresult = {'type': 'number', 'value': 1}",
+    "p = pd\nresult = {'type': 'number', 'value': 1}",
+    "result = {'type': 'string', 'value': dfs[0].eval('@pd.io.common.os.getcwd()')}",
+    "result = {'type': 'string', 'value': str(pd.eval('1 + 1'))}",
+    "result = {'type': 'dataframe', 'value': dfs[0].query('output > 0', engine='python')}",
+    "result = {'type': 'dataframe', 'value': dfs[0].query('@pd.io.common.os.listdir(\"/\")')}",
+    "q = dfs[0].query\nresult = {'type': 'dataframe', 'value': q('output > 0')}",
+    "result = {'type': 'string', 'value': str(dfs[0]._mgr)}",
+    "result = {'type': 'string', 'value': str(().__class__)}",
+    "g = (x for x in [1])\nresult = {'type': 'string', 'value': str(g.gi_frame.f_back)}",
+])
+def test_escapes_are_rejected(code, data):
+    with pytest.raises(UnsafeCodeError):
+        validate_generated_code(code)
+    with pytest.raises(UnsafeCodeError):
+        execute_generated_code(code, data)
+
+def test_cache_keeps_code_per_schema(tmp_path):
+    cache = GeneratedCodeCache(str(tmp_path / "code.sqlite3"))
+    cache.put("fuel_data", "Which make has the best mileage?", "schema1", "result = {'type': 'number', 'value': 1}")
+    assert cache.get("fuel_data", "which make has the best mileage", "schema1") is not None
+    assert cache.get("fuel_data", "Which make has the best mileage?", "schema2") is None
@@ -0,0 +1,89 @@
+import threading
+import time
+from types import SimpleNamespace
+import httpx
+import pytest
+import Tools.llm_client as llm_client
+from Tools.llm_client import LLMClient
+
+class StatusError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers={"retry-after": retry_after} if retry_after else {})
+
+class FakeSDK:
+    """Raises the queued errors in order, then returns a completion; tracks concurrent calls."""
+
+    def __init__(self, errors=(), delay=0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls.append(kwargs)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+            if self.errors:
+                raise self.errors.pop(0)
+        return "completion"
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(llm_client, "time", SimpleNamespace(sleep=sleeps.append))
+    monkeypatch.setattr(llm_client, "random", SimpleNamespace(uniform=lambda low, high: high))
+    return sleeps
+
+def make_client(sdk, **kwargs):
+    client = LLMClient(backend="local", **kwargs)
+    client._client = sdk
+    return client
+
+def test_transient_errors_are_retried_with_backoff(sleeps):
+    sdk = FakeSDK([StatusError(503), httpx.ConnectTimeout("slow"), StatusError(429)])
+    client = make_client(sdk, max_retries=3, backoff_base=0.5, backoff_max=8.0)
+    assert client.chat.completions.create(model="m", messages=[]) == "completion"
+    assert len(sdk.calls) == 4
+    assert sleeps == [0.5, 1.0, 2.0]
+
+def test_retries_stop_after_max_retries(sleeps):
+    sdk = FakeSDK([StatusError(500)] * 5)
+    client = make_client(sdk, max_retries=2)
+    with pytest.raises(StatusError):
+        client.create_chat_completion(model="m", messages=[])
+    assert len(sdk.calls) == 3 and len(sleeps) == 2
+
+@pytest.mark.parametrize("status", [400, 401, 404, 422])
+def test_client_errors_are_not_retried(sleeps, status):
+    sdk = FakeSDK([StatusError(status)])
+    with pytest.raises(StatusError):
+        make_client(sdk).create_chat_completion(model="m", messages=[])
+    assert len(sdk.calls) == 1 and sleeps == []
+
+def test_retry_after_is_honoured_and_capped(sleeps):
+    sdk = FakeSDK([StatusError(429, "3"), StatusError(429, "120"), StatusError(429, "Wed, 21 Oct 2026 07:28:00 GMT")])
+    client = make_client(sdk, max_retries=3, backoff_base=0.5, backoff_max=8.0)
+    client.create_chat_completion(model="m", messages=[])
+    # Numeric values are used up to backoff_max; dates fall back to jittered backoff
+    assert sleeps == [3.0, 8.0, 2.0]
+
+def test_model_override_and_concurrency_cap(sleeps):
+    sdk = FakeSDK(delay=0.05)
+    client = make_client(sdk, model="local-model", max_concurrency=2)
+    threads = [threading.Thread(target=client.create_chat_completion, kwargs={"model": "m", "messages": []})
+               for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(sdk.calls) == 6 and sdk.max_active == 2
+    assert {call["model"] for call in sdk.calls} == {"local-model"}
@@ -0,0 +1,82 @@
+import threading
+import time
+import pandas as pd
+import pytest
+
+pytest.importorskip("pandasai")
+pytest.importorskip("dotenv")
+import Tools.pandas_ai_router as pandas_ai_router
+from Tools.pandas_ai_router import PandasAIRouter
+
+class StubAgent:
+    def __init__(self):
+        self.memory = []
+
+    def start_new_conversation(self):
+        self.memory.clear()
+
+class StubSmartDataframe:
+    """Stands in for pandasai's SmartDataframe: remembers earlier questions and detects concurrent chats."""
+    instances = []
+    active = 0
+    max_active = 0
+    counter_lock = threading.Lock()
+
+    def __init__(self, data, name=None, description=None):
+        self.data = data
+        self._agent = StubAgent()
+        self.prompts = []
+        self.last_code_executed = "result = {'type': 'number', 'value': len(dfs[0])}"
+        StubSmartDataframe.instances.append(self)
+
+    def chat(self, question):
+        with StubSmartDataframe.counter_lock:
+            StubSmartDataframe.active += 1
+            StubSmartDataframe.max_active = max(StubSmartDataframe.max_active, StubSmartDataframe.active)
+        time.sleep(0.01)
+        self._agent.memory.append(question)
+        self.prompts.append(list(self._agent.memory))
+        with StubSmartDataframe.counter_lock:
+            StubSmartDataframe.active -= 1
+        return len(self.data)
+
+@pytest.fixture
+def router(monkeypatch):
+    StubSmartDataframe.instances, StubSmartDataframe.max_active = [], 0
+    monkeypatch.setattr(pandas_ai_router, "SmartDataframe", StubSmartDataframe)
+    datasets = {"fuel_data": pd.DataFrame({"make": ["A", "B"], "mpg": [30.0, 40.0]})}
+    return PandasAIRouter(datasets, code_cache_path=None, summary_views=False)
+
+def test_questions_do_not_see_earlier_conversations(router):
+    router.run_impl("fuel_data", "Which make has the best mileage?")
+    router.run_impl("fuel_data", "How many makes are there?")
+    frame, = StubSmartDataframe.instances
+    assert [len(prompt) for prompt in frame.prompts] == [1, 1]
+    assert frame.prompts[1][0].startswith("How many makes")
+
+def test_warm_frame_is_rebuilt_only_when_the_dataset_changes(router):
+    router.run_impl("fuel_data", "first question")
+    router.run_impl("fuel_data", "second question")
+    assert len(StubSmartDataframe.instances) == 1
+    router.datasets["fuel_data"] = pd.DataFrame({"make": ["A", "B", "C"], "mpg": [30.0, 40.0, 35.0]})
+    assert router.run_impl("fuel_data", "third question")["answer"] == 3
+    assert len(StubSmartDataframe.instances) == 2
+
+def test_questions_on_one_dataset_are_serialized(router):
+    threads = [threading.Thread(target=router.run_impl, args=("fuel_data", f"question {i}")) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert StubSmartDataframe.max_active == 1
+    assert len(StubSmartDataframe.instances[0].prompts) == 4
+
+def test_repeat_question_reuses_cached_code(monkeypatch, tmp_path):
+    StubSmartDataframe.instances = []
+    monkeypatch.setattr(pandas_ai_router, "SmartDataframe", StubSmartDataframe)
+    datasets = {"fuel_data": pd.DataFrame({"make": ["A", "B"], "mpg": [30.0, 40.0]})}
+    router = PandasAIRouter(datasets, code_cache_path=str(tmp_path / "code.sqlite3"), summary_views=False)
+    router.run_impl("fuel_data", "How many vehicles are listed?")
+    cached = router.run_impl("fuel_data", "how many vehicles are listed")
+    assert cached["answer"] == 2 and "cached" in cached["note"]
+    assert len(StubSmartDataframe.instances[0].prompts) == 1
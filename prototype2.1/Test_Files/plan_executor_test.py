@@ -0,0 +1,89 @@
+import json
+import time
+import pytest
+from Tools.plan_executor import PlanExecutor, PlanError
+
+def slow_top_countries(top_n=2):
+    time.sleep(0.2)
+    return {"results": [{"country": "DK"}, {"country": "IE"}][:top_n]}
+
+def slow_country_detail(country_code):
+    time.sleep(0.2)
+    return {"country_code": country_code, "capacity_factor": 0.3}
+
+def failing_tool():
+    raise ValueError("boom")
+
+@pytest.fixture
+def executor():
+    return PlanExecutor({
+        "top": slow_top_countries,
+        "detail": slow_country_detail,
+        "fail": failing_tool,
+    })
+
+def test_independent_steps_run_in_parallel(executor):
+    plan = executor.parse_plan(json.dumps({"steps": [
+        {"id": "s1", "tool": "detail", "arguments": {"country_code": "DE"}},
+        {"id": "s2", "tool": "detail", "arguments": {"country_code": "FR"}},
+    ]}))
+    start = time.time()
+    outcomes = executor.execute(plan["steps"])
+    assert time.time() - start < 0.35
+    assert outcomes["s2"]["result"]["country_code"] == "FR"
+
+def test_results_feed_dependent_steps(executor):
+    plan = executor.parse_plan(json.dumps({"steps": [
+        {"id": "s1", "tool": "top", "arguments": {"top_n": 1}},
+        {"id": "s2", "tool": "detail", "arguments": {"country_code": "$s1.results.0.country"}, "depends_on": ["s1"]},
+    ]}))
+    outcomes = executor.execute(plan["steps"])
+    assert outcomes["s2"]["arguments"] == {"country_code": "DK"}
+    assert outcomes["s2"]["result"]["country_code"] == "DK"
+
+def test_failed_step_skips_dependents(executor):
+    plan = executor.parse_plan(json.dumps({"steps": [
+        {"id": "s1", "tool": "fail"},
+        {"id": "s2", "tool": "detail", "arguments": {"country_code": "$s1.x"}, "depends_on": ["s1"]},
+    ]}))
+    outcomes = executor.execute(plan["steps"])
+    assert "boom" in outcomes["s1"]["result"]["error"]
+    assert outcomes["s2"]["result"]["error"] == "Skipped because step s1 failed"
+
+def test_invalid_plans_are_rejected(executor):
+    with pytest.raises(PlanError, match="Unknown tool"):
+        executor.parse_plan(json.dumps({"steps": [{"id": "s1", "tool": "missing"}]}))
+    with pytest.raises(PlanError, match="cycle"):
+        executor.parse_plan(json.dumps({"steps": [
+            {"id": "s1", "tool": "top", "depends_on": ["s2"]},
+            {"id": "s2", "tool": "top", "depends_on": ["s1"]},
+        ]}))
+    with pytest.raises(PlanError, match="valid JSON"):
+        executor.parse_plan("not json")
+
+def test_referenced_steps_become_dependencies(executor):
+    plan = executor.parse_plan(json.dumps({"steps": [
+        {"id": "s1", "tool": "top", "arguments": {"top_n": 1}},
+        {"id": "s2", "tool": "detail", "arguments": {"country_code": "$s1.results.0.country"}},
+    ]}))
+    assert plan["steps"][1]["depends_on"] == ["s1"]
+    assert executor.execute(plan["steps"])["s2"]["result"]["country_code"] == "DK"
+    with pytest.raises(PlanError, match="unknown steps: s9"):
+        executor.parse_plan(json.dumps({"steps": [
+            {"id": "s1", "tool": "detail", "arguments": {"country_code": "$s9.country"}},
+        ]}))
+    with pytest.raises(PlanError, match="cycle"):
+        executor.parse_plan(json.dumps({"steps": [
+            {"id": "s1", "tool": "detail", "arguments": {"country_code": "$s1.country"}},
+        ]}))
+
+@pytest.mark.parametrize("step, message", [
+    ({"id": "s1", "tool": "top", "arguments": ["DE"]}, "arguments must be an object"),
+    ({"id": "s1", "tool": "top", "arguments": "top_n=2"}, "arguments must be an object"),
+    ({"id": "s1", "tool": "top", "depends_on": "s0"}, "depends_on must be a list"),
+    ({"id": "s1", "tool": "top", "depends_on": [["s0"]]}, "depends_on must be a list"),
+    ({"id": ["s1"], "tool": "top"}, "Invalid step"),
+])
+def test_malformed_steps_are_rejected(executor, step, message):
+    with pytest.raises(PlanError, match=message):
+        executor.parse_plan(json.dumps({"steps": [step]}))
@@ -0,0 +1,103 @@
+import asyncio
+import sys
+import threading
+import time
+import types
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp.test_utils import TestClient, TestServer
+
+# The real projectfiles_main loads every dataset and the LLM client at import time
+sys.modules.setdefault("projectfiles_main", types.SimpleNamespace(
+    new_conversation=lambda: [{"role": "system", "content": "system"}],
+    process_user_message=None,
+))
+import projectfiles_server
+from projectfiles_server import ConversationServer, ServerBusyError
+
+def fake_turn(messages, user_input):
+    """Appends what a real turn does; 'boom' fails after the model asked for a tool."""
+    messages.append({"role": "user", "content": user_input})
+    if user_input == "boom":
+        messages.append({"role": "assistant", "content": None, "tool_calls": [{"id": "call_1"}]})
+        raise Exception("Error analyzing national wind power: boom")
+    messages.append({"role": "assistant", "content": f"echo {user_input}"})
+    return f"echo {user_input}"
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(projectfiles_server, "process_user_message", fake_turn)
+    return ConversationServer(max_workers=2, max_queued=1, max_sessions=3, session_ttl=60)
+
+async def with_client(server, scenario):
+    async with TestClient(TestServer(server.build_app())) as client:
+        return await scenario(client)
+
+def test_failed_turn_leaves_the_session_usable(server):
+    async def scenario(client):
+        session_id = (await (await client.post("/sessions")).json())["session_id"]
+        failed = await client.post(f"/sessions/{session_id}/messages", json={"content": "boom"})
+        assert failed.status == 500
+        assert server.sessions[session_id].messages == [{"role": "system", "content": "system"}]
+        ok = await client.post(f"/sessions/{session_id}/messages", json={"content": "hello"})
+        assert (await ok.json())["reply"] == "echo hello"
+        assert [m["role"] for m in server.sessions[session_id].messages] == ["system", "user", "assistant"]
+    asyncio.run(with_client(server, scenario))
+
+def test_malformed_bodies_are_rejected(server):
+    async def scenario(client):
+        session_id = (await (await client.post("/sessions")).json())["session_id"]
+        url = f"/sessions/{session_id}/messages"
+        for kwargs in ({"data": "not json"}, {"json": ["hello"]}, {"json": {"content": 3}}, {"json": {}}):
+            response = await client.post(url, **kwargs)
+            assert response.status == 400 and "error" in await response.json()
+    asyncio.run(with_client(server, scenario))
+
+def test_turns_beyond_capacity_are_rejected(monkeypatch, server):
+    release = threading.Event()
+    monkeypatch.setattr(projectfiles_server, "process_user_message", lambda messages, text: release.wait(5) and text)
+
+    async def scenario():
+        sessions = [server.create_session() for _ in range(3)]
+        # Two turns run and one waits for a worker, which is the limit
+        turns = [asyncio.create_task(server.handle_turn(session, "q")) for session in sessions]
+        await asyncio.sleep(0.1)
+        assert server._waiting == 3
+        with pytest.raises(ServerBusyError):
+            await server.handle_turn(sessions[0], "one too many")
+        release.set()
+        assert await asyncio.gather(*turns) == ["q", "q", "q"]
+        assert server._waiting == 0
+    asyncio.run(scenario())
+
+def test_turns_of_one_session_run_one_at_a_time(monkeypatch, server):
+    active, overlaps = [0], []
+
+    def slow_turn(messages, user_input):
+        active[0] += 1
+        overlaps.append(active[0])
+        time.sleep(0.05)
+        active[0] -= 1
+        return user_input
+
+    monkeypatch.setattr(projectfiles_server, "process_user_message", slow_turn)
+
+    async def scenario():
+        session = server.create_session()
+        return await asyncio.gather(server.handle_turn(session, "a"), server.handle_turn(session, "b"))
+    assert asyncio.run(scenario()) == ["a", "b"]
+    assert max(overlaps) == 1
+
+def test_idle_sessions_expire_to_make_room(server):
+    async def scenario():
+        sessions = [server.create_session() for _ in range(3)]
+        with pytest.raises(ServerBusyError):
+            server.create_session()
+        sessions[0].last_active -= 120
+        await sessions[1].lock.acquire()
+        sessions[1].last_active -= 120  # busy sessions are kept even when idle for long
+        server.create_session()
+        assert sessions[0].session_id not in server.sessions
+        assert sessions[1].session_id in server.sessions
+    asyncio.run(scenario())
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Tools.region_registry import RegionRegistry
+from Tools.wind_national_tool import WindNationalTool
+from Tools.on_offshore_wind_tool import OnOffshoreWindTool
+
+@pytest.fixture
+def hourly_data():
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2010-01-01", periods=24 * 365, freq="h")
+    data = pd.DataFrame({code: rng.uniform(0, 0.6, len(times)) for code in ["DE", "DK", "SE", "NO", "FI", "EL", "UK"]})
+    data.loc[:9, "SE"] = np.nan
+    data.insert(0, "time", times.strftime("%Y-%m-%d %H:%M:%S"))
+    return data
+
+def test_region_series_is_weighted_mean_of_present_members(hourly_data):
+    registry = RegionRegistry(hourly_data)
+    assert registry.members("nordics") == ["DK", "FI", "NO", "SE"]
+    assert np.allclose(registry.series("nordics"), hourly_data[["DK", "FI", "NO", "SE"]].mean(axis=1))
+    weighted = registry.series(["DE", "DK"], weights={"DE": 3, "DK": 1})
+    assert np.allclose(weighted, (3 * hourly_data["DE"] + hourly_data["DK"]) / 4)
+    assert registry.series("nordics") is registry.series("nordics")
+
+def test_region_codes_resolve_aliases(hourly_data):
+    registry = RegionRegistry(hourly_data)
+    assert registry.members(["GR", "GB"]) == ["EL", "UK"]
+    registry.define("north_sea", ["DE", "DK", "NO", "GB"])
+    assert registry.members("North_Sea") == ["DE", "DK", "NO", "UK"]
+    with pytest.raises(ValueError):
+        registry.members("atlantis")
+
+def test_wind_tools_answer_regional_questions(hourly_data):
+    result = WindNationalTool(hourly_data).run_impl("regional_pattern", region="nordics")
+    assert result["average_capacity_factor"] == pytest.approx(hourly_data[["DK", "FI", "NO", "SE"]].mean(axis=1).mean())
+    assert set(result["seasonal_averages"]) == {1, 2, 3, 4}
+
+    onoffshore = hourly_data.rename(columns={"DE": "DE_ON", "DK": "DK_ON", "NO": "NO_ON", "SE": "DK_OFF"})
+    summary = OnOffshoreWindTool(onoffshore).run_impl("regional_summary", countries=["DE", "DK"])
+    assert summary["onshore_countries"] == ["DE", "DK"] and summary["offshore_countries"] == ["DK"]
+    assert summary["offshore_capacity_factor"] == pytest.approx(onoffshore["DK_OFF"].mean())
@@ -0,0 +1,71 @@
+import threading
+import time
+import pytest
+from Tools.sandbox_pool import SandboxPool, SandboxError
+
+def add_offset(context, value):
+    return context + value
+
+def sleep_forever(context):
+    time.sleep(60)
+
+def spin(context):
+    while True:
+        pass
+
+def allocate(context, megabytes):
+    return len(bytearray(megabytes * 1024 * 1024))
+
+@pytest.fixture
+def pool():
+    pool = SandboxPool(lambda: 10, workers=1, cpu_seconds=1, memory_mb=256, timeout=5)
+    yield pool
+    pool.shutdown()
+
+def test_tasks_receive_the_worker_context(pool):
+    assert pool.run(add_offset, 5) == 15
+
+def test_timeout_recycles_the_pool(pool):
+    pool.timeout = 0.5
+    with pytest.raises(SandboxError, match="time limit"):
+        pool.run(sleep_forever)
+    pool.timeout = 5
+    assert pool.run(add_offset, 1) == 11
+
+def test_cpu_limit_kills_the_worker_and_the_pool_recovers(pool):
+    with pytest.raises(SandboxError, match="terminated"):
+        pool.run(spin)
+    assert pool.run(add_offset, 2) == 12
+
+def test_memory_limit_is_enforced(pool):
+    with pytest.raises(SandboxError):
+        pool.run(allocate, 1024)
+    assert pool.run(allocate, 16) == 16 * 1024 * 1024
+
+def sleep_then_return(context, seconds):
+    time.sleep(seconds)
+    return seconds
+
+def test_tasks_broken_by_another_tasks_timeout_are_retried():
+    pool = SandboxPool(lambda: 0, workers=2, cpu_seconds=0, memory_mb=0, timeout=1.0)
+    results = {}
+
+    def run(name, function, *args):
+        try:
+            results[name] = pool.run(function, *args)
+        except SandboxError as e:
+            results[name] = str(e)
+
+    try:
+        hung = threading.Thread(target=run, args=("hung", sleep_forever))
+        innocent = threading.Thread(target=run, args=("innocent", sleep_then_return, 0.8))
+        hung.start()
+        time.sleep(0.5)
+        # Still running when the hung task times out and the pool is recycled
+        innocent.start()
+        hung.join()
+        innocent.join()
+    finally:
+        pool.shutdown()
+    assert "time limit" in results["hung"]
+    assert results["innocent"] == 0.8
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Tools.solar_analysis_tool import SolarAnalysisTool
+from Tools.solar_daily import SolarDailyTable
+
+def make_solar(seed):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2001-01-01", periods=24 * 400, freq="h")
+    hour = times.hour.to_numpy()
+    # Longer days in summer, output only between sunrise and sunset
+    half_day = 4 + 3 * np.sin(2 * np.pi * (times.dayofyear.to_numpy() - 80) / 365)
+    daylight = np.abs(hour + 0.5 - 12) < half_day
+    data = {"time": times.strftime("%Y-%m-%d %H:%M:%S")}
+    for country, scale in [("DE", 0.6), ("FR", 0.7), ("ES", 0.9), ("NO", 0.4), ("SE", 0.45)]:
+        data[country] = np.where(daylight, scale * rng.uniform(0.1, 1.0, len(times)), 0.0)
+    return pd.DataFrame(data)
+
+@pytest.fixture
+def solar_tool():
+    return SolarAnalysisTool(make_solar(0), make_solar(1))
+
+def test_daily_table_matches_groupby(solar_tool):
+    data = solar_tool.sarah_data
+    daily = SolarDailyTable(data)
+    days = pd.to_datetime(data["time"]).dt.date
+    col = daily.column("ES")
+    assert np.array_equal(daily.daylight_hours[:, col], (data["ES"] > 0).groupby(days).sum().to_numpy())
+    assert np.allclose(daily.daily_max[:, col], data["ES"].groupby(days).max().to_numpy())
+    assert np.allclose(daily.energy[:, col], data["ES"].groupby(days).sum().to_numpy())
+
+def test_seasonal_daylight_counts_only_lit_hours(solar_tool):
+    result = solar_tool.run_impl("daylight_patterns", "sarah", country_code="DE")
+    assert result["seasonal_variation"]["winter"] < result["seasonal_variation"]["summer"] < 24
+    assert result["timing_metrics"]["earliest_sunrise"] <= result["timing_metrics"]["average_sunrise"]
+    assert "DE" in solar_tool.sarah_data.columns and "datetime" not in solar_tool.sarah_data.columns
+
+def test_regional_comparison_matches_hourly_data(solar_tool):
+    result = solar_tool.run_impl("regional_comparison", "merra", country_code="ES", comparison_country="NO")
+    es = solar_tool.merra_data["ES"]
+    assert result["country1"]["average_output"] == pytest.approx(es.mean())
+    assert result["country1"]["output_stability"] == pytest.approx(es.std() / es.mean())
+    assert result["country1"]["daylight_hours"] == pytest.approx((es > 0).mean() * 24)
+
+def test_clear_sky_ranking_matches_single_country_analysis(solar_tool):
+    ranking = solar_tool.run_impl("clear_sky_ranking", "sarah")["ranking"]
+    assert [row["country_code"] for row in ranking][0] == "ES"
+    intensities = [row["average_clear_sky_intensity"] for row in ranking]
+    assert intensities == sorted(intensities, reverse=True)
+    single = solar_tool.run_impl("clear_sky_patterns", "sarah", country_code="NO")
+    norway = next(row for row in ranking if row["country_code"] == "NO")
+    assert norway["clear_sky_days"] == sum(single["monthly_distribution"].values())
+    assert norway["clear_sky_threshold"] == single["clear_sky_metrics"]["clear_sky_threshold"]
+
+def test_source_comparison_aligns_on_common_hours(solar_tool):
+    solar_tool.merra_data = solar_tool.merra_data.iloc[48:].drop(columns=["SE"])
+    result = solar_tool.run_impl("source_comparison", "sarah", country_code="FR")
+    sarah = solar_tool.sarah_data.set_index("time")["FR"]
+    merra = solar_tool.merra_data.set_index("time")["FR"]
+    difference = (sarah - merra).dropna()
+    assert result["common_hours"] == len(difference)
+    assert result["metrics"]["bias"] == pytest.approx(difference.mean())
+    assert result["metrics"]["rmse"] == pytest.approx(np.sqrt((difference ** 2).mean()))
+    assert result["metrics"]["correlation"] == pytest.approx(sarah.corr(merra))
+    countries = [row["country_code"] for row in solar_tool.run_impl("source_comparison", "sarah")["countries"]]
+    assert sorted(countries) == ["DE", "ES", "FR", "NO"]
+
+def test_geographical_patterns_for_named_and_custom_regions(solar_tool):
+    result = solar_tool.run_impl("geographical_patterns", "sarah", regions=["nordics"], countries=["es", "FR"])
+    assert result["regions"]["nordics"]["countries"] == ["NO", "SE"]
+    assert result["regions"]["custom"]["average_output"] == pytest.approx(
+        solar_tool.sarah_data[["ES", "FR"]].mean(axis=1).mean()
+    )
+    assert result["highest_output_region"] == "custom"
+
+def test_profile_tensor_matches_hourly_masks(solar_tool):
+    data = solar_tool.sarah_data
+    times = pd.to_datetime(data["time"])
+    result = solar_tool.run_impl("country_analysis", "sarah", country_code="FR")
+    assert result["daily_cycle"]["12"] == pytest.approx(data["FR"][times.dt.hour == 12].mean())
+    assert result["seasonal_patterns"]["fall"] == pytest.approx(data["FR"][times.dt.month.isin([9, 10, 11])].mean())
+    assert result["overall_metrics"]["output_variability"] == pytest.approx(data["FR"].std())
+    window = result["optimal_generation_hours"]["best_8_hour_window"]
+    assert window["start_hour"] <= result["optimal_generation_hours"]["peak_hour"] <= window["end_hour"]
+
+    seasonal = solar_tool.run_impl("seasonal_efficiency", "sarah", region="nordics")
+    nordic = data[["NO", "SE"]].mean(axis=1)
+    assert seasonal["monthly_progression"]["7"] == pytest.approx(nordic[times.dt.month == 7].mean())
+
+def test_variability_for_country_and_region(solar_tool):
+    germany = solar_tool.run_impl("variability", "sarah", country_code="DE")
+    assert germany["rolling_std"]["24h"]["mean"] == pytest.approx(
+        solar_tool.sarah_data["DE"].rolling(24).std().mean()
+    )
+    iberia = solar_tool.run_impl("variability", "sarah", region="iberia")
+    assert iberia["region"] == "iberia" and iberia["mean"] == pytest.approx(solar_tool.sarah_data["ES"].mean())
+    ranked = solar_tool.run_impl("variability", "sarah")["countries"]
+    assert len(ranked) == 5
+
+def test_daylight_hours_leave_out_days_without_output(solar_tool):
+    data = solar_tool.sarah_data
+    times = pd.to_datetime(data["time"])
+    # Polar night: no output in Norway in December and January
+    data.loc[times.dt.month.isin([12, 1]), "NO"] = 0.0
+    result = solar_tool.run_impl("daylight_patterns", "sarah", country_code="NO")
+    lit_hours = (data["NO"] > 0).groupby(times.dt.date).sum()
+    lit_days = lit_hours[lit_hours > 0]
+    assert result["daylight_metrics"]["average_daylight_hours"] == pytest.approx(lit_days.mean())
+    assert result["daylight_metrics"]["min_daylight_hours"] == lit_days.min() > 0
+    winter = lit_hours[pd.to_datetime(lit_hours.index).month == 2]
+    assert result["seasonal_variation"]["winter"] == pytest.approx(winter.mean())
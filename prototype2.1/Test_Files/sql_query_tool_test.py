@@ -0,0 +1,49 @@
+import duckdb
+import pandas as pd
+import pytest
+from Tools.sql_query_tool import SQLQueryTool
+
+@pytest.fixture
+def sql_tool(tmp_path):
+    fuel = pd.DataFrame({"make": ["A", "A", "B", "C"], "co2": [200, 220, 180, 250]})
+    pd.DataFrame({"secret": [1]}).to_csv(tmp_path / "secret.csv", index=False)
+    duckdb.execute(f"COPY (SELECT 1 AS secret) TO '{tmp_path / 'secret.parquet'}' (FORMAT parquet)")
+    return SQLQueryTool({"fuel_data": fuel}, row_limit=2, timeout=0.5)
+
+def test_select_aggregates_and_caps_rows(sql_tool):
+    result = sql_tool.run_impl("SELECT make, AVG(co2) AS co2 FROM fuel_data GROUP BY make ORDER BY co2 DESC;")
+    assert result["columns"] == ["make", "co2"]
+    assert result["rows"] == [{"make": "C", "co2": 250.0}, {"make": "A", "co2": 210.0}]
+    assert result["truncated"] is True and result["row_count"] == 2
+    assert sql_tool.run_impl("SELECT * FROM fuel_data", max_rows=1)["row_count"] == 1
+    assert sql_tool.run_impl("SELECT * FROM fuel_data", max_rows=100)["row_count"] == 2
+
+@pytest.mark.parametrize("max_rows", [0, -1])
+def test_non_positive_max_rows_is_rejected(sql_tool, max_rows):
+    result = sql_tool.run_impl("SELECT * FROM fuel_data", max_rows=max_rows)
+    assert result["error"] == "max_rows must be a positive integer"
+
+@pytest.mark.parametrize("query", [
+    "DROP TABLE fuel_data",
+    "CREATE TABLE copy AS SELECT * FROM fuel_data",
+    "INSERT INTO fuel_data VALUES ('D', 100)",
+    "UPDATE fuel_data SET co2 = 0",
+    "DELETE FROM fuel_data",
+    "SET enable_external_access = true",
+    "ATTACH 'other.duckdb'",
+    "SELECT 1; DROP TABLE fuel_data",
+    "SELECT 1; SELECT 2",
+])
+def test_statements_other_than_a_single_select_are_rejected(sql_tool, query):
+    assert "error" in sql_tool.run_impl(query)
+    assert sql_tool.run_impl("SELECT COUNT(*) AS n FROM fuel_data")["rows"] == [{"n": 4}]
+
+@pytest.mark.parametrize("reader", ["read_csv", "read_csv_auto", "read_parquet"])
+def test_file_reading_table_functions_are_rejected(sql_tool, tmp_path, reader):
+    extension = "parquet" if reader == "read_parquet" else "csv"
+    result = sql_tool.run_impl(f"SELECT * FROM {reader}('{tmp_path / ('secret.' + extension)}')")
+    assert "disabled" in result["error"] and "rows" not in result
+
+def test_long_queries_are_interrupted(sql_tool):
+    result = sql_tool.run_impl("SELECT COUNT(*) FROM range(100000) a, range(100000) b, range(1000) c")
+    assert "time limit" in result["error"]
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Tools.summary_views import city_yearly_temperature, country_monthly_means, weather_country_daily
+
+def test_country_monthly_means_splits_onshore_and_offshore():
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2001-01-01", periods=24 * 60, freq="h")
+    data = pd.DataFrame({"time": times.strftime("%Y-%m-%d %H:%M:%S"),
+                         "DE_ON": rng.uniform(0, 1, len(times)), "DE_OFF": rng.uniform(0, 1, len(times))})
+    summary = country_monthly_means(data, "capacity_factor", type_separator="_")
+    assert list(summary.columns) == ["country", "type", "year", "month", "mean_capacity_factor", "max_capacity_factor"]
+    row = summary[(summary["type"] == "OFF") & (summary["month"] == 2)].iloc[0]
+    february = data["DE_OFF"][times.month == 2]
+    assert row["country"] == "DE"
+    assert row["mean_capacity_factor"] == pytest.approx(february.mean())
+    assert row["max_capacity_factor"] == pytest.approx(february.max())
+
+def test_weather_country_daily_aggregates_hours():
+    data = pd.DataFrame({
+        "country": ["FR"] * 4 + ["DE"] * 2,
+        "time": ["2020-01-01 00:00", "2020-01-01 12:00", "2020-01-02 00:00", "2020-01-02 12:00",
+                 "2020-01-01 00:00", "2020-01-01 12:00"],
+        "temperature_2m": [1.0, 5.0, 2.0, 4.0, -1.0, 3.0],
+        "precipitation": [0.5, 1.5, 0.0, 0.0, 2.0, 0.0],
+    })
+    summary = weather_country_daily(data).set_index(["country", "date"])
+    first_day = summary.loc[("FR", pd.Timestamp("2020-01-01").date())]
+    assert first_day["avg_temperature_2m"] == 3.0
+    assert first_day["max_temperature_2m"] == 5.0 and first_day["min_temperature_2m"] == 1.0
+    assert first_day["total_precipitation"] == 2.0
+    assert len(summary) == 3
+
+def test_city_yearly_temperature_counts_reported_months():
+    data = pd.DataFrame({
+        "dt": ["1900-01-01", "1900-02-01", "1900-03-01", "1901-01-01"],
+        "AverageTemperature": [1.0, np.nan, 3.0, 4.0],
+        "AverageTemperatureUncertainty": [0.1, 0.2, 0.3, 0.4],
+        "City": ["Oslo"] * 4, "Country": ["Norway"] * 4,
+        "Latitude": ["59.92N"] * 4, "Longitude": ["10.75E"] * 4,
+    })
+    summary = city_yearly_temperature(data)
+    first = summary[summary["year"] == 1900].iloc[0]
+    assert first["avg_temperature"] == 2.0 and first["months_reported"] == 2
+    assert first["country"] == "Norway" and first["latitude"] == "59.92N"
@@ -0,0 +1,31 @@
+import threading
+import pytest
+from Tools.tool_call_recorder import ToolCallRecorder, load_tool_calls, result_digest
+
+def country_detail(country_code):
+    if country_code == "XX":
+        raise ValueError("No data available for country code: XX")
+    return {"country_code": country_code, "capacity_factor": 0.3}
+
+def test_wrapped_calls_are_recorded(tmp_path):
+    recorder = ToolCallRecorder(str(tmp_path / "logs" / "tool_calls.jsonl"))
+    detail = recorder.wrap("detail", country_detail)
+    assert detail(country_code="DE") == {"country_code": "DE", "capacity_factor": 0.3}
+    with pytest.raises(ValueError):
+        detail(country_code="XX")
+
+    ok, failed = load_tool_calls(recorder.path)
+    assert ok["tool"] == "detail" and ok["arguments"] == {"country_code": "DE"}
+    assert ok["result_hash"] == result_digest({"capacity_factor": 0.3, "country_code": "DE"})
+    assert ok["error"] is None and ok["latency_ms"] >= 0
+    assert failed["result_hash"] is None and "XX" in failed["error"]
+
+def test_concurrent_calls_write_whole_lines(tmp_path):
+    recorder = ToolCallRecorder(str(tmp_path / "tool_calls.jsonl"))
+    detail = recorder.wrap("detail", country_detail)
+    threads = [threading.Thread(target=lambda: [detail(country_code="FR") for _ in range(50)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(list(load_tool_calls(recorder.path))) == 200
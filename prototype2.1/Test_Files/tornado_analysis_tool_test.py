@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Tools.tornado_analysis_tool import TornadoAnalysisTool
+from Tools.tornado_geometry import haversine, initial_bearing, direction_summary
+from Tools.tornado_cube import TornadoCube
+from Tools.tornado_density import rasterize_tracks
+from Tools.tornado_outbreaks import connected_components
+from Tools.tornado_time import UNKNOWN_MINUTE, parse_minutes_of_day
+
+@pytest.fixture
+def tornado_data():
+    rng = np.random.default_rng(0)
+    n = 500
+    slat = rng.uniform(30, 45, n)
+    slon = rng.uniform(-100, -85, n)
+    data = pd.DataFrame({
+        "yr": rng.integers(1990, 2000, n),
+        "mo": rng.integers(1, 13, n),
+        "dy": rng.integers(1, 29, n),
+        "time": [f"{h:02d}:{m:02d}:00" for h, m in zip(rng.integers(0, 24, n), rng.integers(0, 60, n))],
+        "st": rng.choice(["TX", "OK", "KS"], n),
+        "mag": rng.integers(0, 5, n),
+        "inj": rng.poisson(2, n),
+        "fat": rng.poisson(0.2, n),
+        "loss": rng.uniform(0, 1e6, n),
+        "slat": slat,
+        "slon": slon,
+        "elat": slat + rng.uniform(-0.2, 0.3, n),
+        "elon": slon + rng.uniform(-0.1, 0.4, n),
+        "len": rng.uniform(0.5, 30, n),
+        "wid": rng.uniform(10, 800, n),
+        "f1": rng.integers(0, 200, n),
+        "f2": rng.integers(0, 200, n),
+        "f3": rng.integers(0, 200, n),
+        "f4": rng.integers(0, 200, n),
+    })
+    # Tracks without a recorded end point
+    data.loc[:19, ["elat", "elon"]] = 0
+    return data
+
+def test_haversine_matches_known_distance():
+    # One degree of latitude is about 69 miles / 111 km
+    assert haversine(35.0, -97.0, 36.0, -97.0) == pytest.approx(69.09, abs=0.05)
+
+def test_initial_bearing_cardinal_directions():
+    bearings = initial_bearing([35, 35, 35, 35], [-97, -97, -97, -97], [36, 35, 34, 35], [-97, -96, -97, -98])
+    assert np.allclose(bearings, [0, 90, 180, 270], atol=0.5)
+
+def test_direction_summary_counts_sectors():
+    summary = direction_summary([10, 80, 100, 170, 260, 350, np.nan])
+    assert summary["direction_distribution"] == {"north": 2, "east": 2, "south": 1, "west": 1}
+    assert sum(summary["compass_distribution"].values()) == 6
+
+def test_movement_analysis_skips_tracks_without_end_point(tornado_data):
+    result = TornadoAnalysisTool(tornado_data).run_impl("movement_analysis")
+    assert sum(result["direction_analysis"]["direction_distribution"].values()) == len(tornado_data) - 20
+    assert 0 < result["movement_patterns"]["avg_displacement_miles"] < 40
+
+def test_cube_rollups_match_raw_data(tornado_data):
+    totals = TornadoCube.build(tornado_data).rollup(state="TX", year_range=(1992, 1995))
+    raw = tornado_data[(tornado_data["st"] == "TX") & tornado_data["yr"].between(1992, 1995)]
+    assert totals.count == len(raw)
+    assert totals.sum("loss") == pytest.approx(raw["loss"].sum())
+    assert totals.corr("mag", "inj") == pytest.approx(raw["mag"].corr(raw["inj"]))
+
+def test_missing_values_fall_back_to_raw_rows(tornado_data):
+    tornado_data.loc[3, "inj"] = np.nan
+    assert TornadoCube.build(tornado_data) is None
+    result = TornadoAnalysisTool(tornado_data).run_impl("state_comparison", state="OK")
+    assert result["state"]["total_injuries"] == int(tornado_data.loc[tornado_data["st"] == "OK", "inj"].sum())
+
+def test_radius_search_matches_brute_force(tornado_data):
+    tool = TornadoAnalysisTool(tornado_data)
+    result = tool.run_impl("radius_search", latitude=38.0, longitude=-92.0, radius_km=150, start_year=1995)
+    index = tool._track_index()
+    everything = np.arange(len(index.positions))
+    expected = (index.distance_km(everything, 38.0, -92.0) <= 150) & (index.years >= 1995)
+    assert result["tornado_count"] == int(expected.sum())
+    distances = [track["distance_km"] for track in result["tracks"]]
+    assert distances == sorted(distances)
+
+def test_nearest_tracks_returns_k_closest(tornado_data):
+    tool = TornadoAnalysisTool(tornado_data)
+    result = tool.run_impl("nearest_tracks", latitude=35.0, longitude=-97.0, k=3)
+    index = tool._track_index()
+    closest = np.sort(index.distance_km(np.arange(len(index.positions)), 35.0, -97.0))[:3]
+    assert [track["distance_km"] for track in result["tracks"]] == pytest.approx(closest, abs=0.01)
+
+def test_rasterize_tracks_counts_each_crossed_cell_once():
+    # An east-west track crossing three 1-degree cells, and a point track
+    cells, track_counts, path_km, starts = rasterize_tracks(
+        np.array([35.5, 40.5]), np.array([-99.5, -90.5]), np.array([35.5, 40.5]), np.array([-97.5, -90.5]),
+        np.array([180.0, 0.0]), cell_degrees=1.0
+    )
+    assert len(cells) == 4
+    assert sorted(track_counts) == [1, 1, 1, 1]
+    assert path_km.sum() == pytest.approx(180.0)
+    assert starts.sum() == 2
+
+def test_density_heatmap_is_cached_per_parameter_set(tornado_data):
+    tool = TornadoAnalysisTool(tornado_data)
+    first = tool.run_impl("density_heatmap", resolution_degrees=1.0, min_magnitude=2, k=3)
+    engine = tool._derived_data("density", None)
+    assert len(engine._grids) == 1
+    assert tool.run_impl("density_heatmap", resolution_degrees=1.0, min_magnitude=2, k=3) == first
+    assert len(first["top_cells"]) == 3
+    counts = [cell["track_count"] for cell in first["top_cells"]]
+    assert counts == sorted(counts, reverse=True)
+
+def test_connected_components_merges_chains():
+    labels = connected_components(6, np.array([0, 1, 4]), np.array([1, 2, 3]))
+    assert labels[0] == labels[1] == labels[2]
+    assert labels[3] == labels[4]
+    assert len(set(labels)) == 3
+
+def test_outbreak_detection_finds_same_day_cluster(tornado_data):
+    outbreak = tornado_data.iloc[:8].copy()
+    outbreak["yr"], outbreak["mo"], outbreak["dy"] = 2005, 5, 4
+    outbreak["time"] = [f"{hour}:30:00" for hour in range(12, 20)]
+    outbreak["slat"], outbreak["slon"], outbreak["st"] = np.linspace(35, 36, 8), -97.0, "OK"
+    data = pd.concat([tornado_data, outbreak], ignore_index=True)
+    data["date"] = [f"{y}-{m:02d}-{d:02d}" for y, m, d in zip(data["yr"], data["mo"], data["dy"])]
+
+    result = TornadoAnalysisTool(data).run_impl("outbreak_detection", window_hours=3, radius_km=100,
+                                                min_tornadoes=8, start_year=2005, end_year=2005)
+    largest = result["largest_outbreaks"][0]
+    assert largest["tornado_count"] >= 8
+    assert largest["start"].startswith("2005-05-04")
+    assert result["same_day_statistics"]["max_tornadoes_in_one_day"] >= 8
+
+def test_parse_minutes_of_day_marks_bad_times_unknown():
+    minutes = parse_minutes_of_day(pd.Series(["00:00:00", "13:45:10", "23:59:59", "25:00:00", "?", None]))
+    assert list(minutes) == [0, 825, 1439, UNKNOWN_MINUTE, UNKNOWN_MINUTE, UNKNOWN_MINUTE]
+
+def test_diurnal_distribution_matches_raw_counts(tornado_data):
+    tornado_data.loc[:4, "time"] = "unknown"
+    tool = TornadoAnalysisTool(tornado_data)
+    hourly = tool.run_impl("diurnal_distribution", state="TX")
+    quarter = tool.run_impl("diurnal_distribution", state="TX", bin_minutes=15)
+    known = tornado_data[(tornado_data["st"] == "TX") & (tornado_data["time"] != "unknown")]
+    assert hourly["tornadoes_with_known_time"] == quarter["tornadoes_with_known_time"] == len(known)
+    assert hourly["distribution"]["14:00"] == int((known["time"].str[:2] == "14").sum())
+    assert len(quarter["distribution"]) == 96
+    assert quarter["time_of_day"] == hourly["time_of_day"]
+    with pytest.raises(Exception):
+        tool.run_impl("diurnal_distribution", bin_minutes=7)
+
+def test_half_open_year_ranges(tornado_data):
+    tool = TornadoAnalysisTool(tornado_data)
+    since = tool.run_impl("diurnal_distribution", start_year=1995)
+    until = tool.run_impl("diurnal_distribution", end_year=1994)
+    assert since["tornadoes_with_known_time"] == int((tornado_data["yr"] >= 1995).sum())
+    assert until["tornadoes_with_known_time"] == int((tornado_data["yr"] <= 1994).sum())
+    cube = TornadoCube.build(tornado_data)
+    assert cube.rollup(year_range=(None, 1994)).count == until["tornadoes_with_known_time"]
+    assert cube.monthly_counts("TX", (1995, None)).sum() == int(
+        ((tornado_data["st"] == "TX") & (tornado_data["yr"] >= 1995)).sum()
+    )
+    tornado_data.loc[3, "inj"] = np.nan
+    raw = TornadoAnalysisTool(tornado_data).analyze_economic_impact("TX", (1995, None))
+    assert raw["total_loss"] == pytest.approx(
+        tornado_data.loc[(tornado_data["st"] == "TX") & (tornado_data["yr"] >= 1995), "loss"].sum()
+    )
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Tools.variability_metrics import VariabilityMetrics, rolling_std
+from Tools.wind_national_tool import WindNationalTool
+
+@pytest.fixture
+def wind_data():
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2015-01-01", periods=24 * 60, freq="h")
+    data = pd.DataFrame({
+        "DE": np.clip(0.3 + np.cumsum(rng.normal(0, 0.03, len(times))), 0, 1),
+        "FR": np.clip(0.25 + np.cumsum(rng.normal(0, 0.01, len(times))), 0, 1),
+        "ES": rng.uniform(0, 1, len(times)),
+    })
+    data.insert(0, "time", times.strftime("%Y-%m-%d %H:%M:%S"))
+    # Rows out of time order must not change the ramps
+    return data.sample(frac=1, random_state=0)
+
+def test_rolling_std_matches_pandas():
+    values = np.random.default_rng(1).normal(size=(500, 2))
+    expected = pd.DataFrame(values).rolling(24).std().to_numpy()[23:]
+    assert np.allclose(rolling_std(values, 24), expected)
+
+def test_variability_metrics_match_pandas(wind_data):
+    metrics = VariabilityMetrics.from_frame(wind_data, ["DE", "FR", "ES"])
+    ordered = wind_data.sort_values("time")["DE"].reset_index(drop=True)
+    summary = metrics.summary("DE")
+    assert summary["hourly_ramps"]["max_ramp_up"] == pytest.approx(ordered.diff().max())
+    assert summary["hourly_ramps"]["p95_absolute_ramp"] == pytest.approx(ordered.diff().abs().quantile(0.95))
+    assert summary["rolling_std"]["7d"]["mean"] == pytest.approx(ordered.rolling(168).std().mean())
+
+def test_wind_variability_ranks_most_consistent_first(wind_data):
+    tool = WindNationalTool(wind_data)
+    result = tool.run_impl("variability")
+    assert result["most_consistent"][0] == "FR" and result["most_variable"][0] == "ES"
+    assert tool.run_impl("variability", country="Germany")["country"] == "Germany"
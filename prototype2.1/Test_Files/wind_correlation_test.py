@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Tools.wind_correlation import CorrelationMatrix
+from Tools.wind_national_tool import WindNationalTool
+from Tools.on_offshore_wind_tool import OnOffshoreWindTool
+
+@pytest.fixture
+def wind_data():
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2015-01-01", periods=24 * 365, freq="h")
+    weather = rng.normal(size=len(times))
+    data = pd.DataFrame({
+        "DE": 0.3 + 0.1 * (weather + 0.3 * rng.normal(size=len(times))),
+        "NL": 0.3 + 0.1 * (weather + 0.5 * rng.normal(size=len(times))),
+        "FR": 0.3 + 0.1 * (0.5 * weather + rng.normal(size=len(times))),
+        "ES": 0.3 + 0.1 * rng.normal(size=len(times)),
+    })
+    data.insert(0, "time", times.strftime("%Y-%m-%d %H:%M:%S"))
+    return data
+
+def test_blockwise_matrix_matches_numpy(wind_data):
+    values = wind_data[["DE", "NL", "FR", "ES"]].to_numpy()
+    matrix = CorrelationMatrix(values, ["DE", "NL", "FR", "ES"], block_rows=1000)
+    assert np.allclose(matrix.correlation, np.corrcoef(values, rowvar=False), atol=1e-5)
+    assert np.allclose(matrix.covariance, np.cov(values, rowvar=False), rtol=1e-4)
+    pooled = matrix.smoothing_benefit()["pooled_std"]
+    assert pooled == pytest.approx(values.mean(axis=1).std(ddof=1), rel=1e-4)
+
+def test_wind_national_correlation_queries(wind_data):
+    tool = WindNationalTool(wind_data)
+    overall = tool.run_impl("correlation", top_n=2)
+    assert overall["most_correlated_pairs"][0]["countries"] == ["DE", "NL"]
+    assert "ES" in overall["least_correlated_pairs"][0]["countries"]
+    pair = tool.run_impl("correlation", country="Germany", comparison_country="France", season=3)
+    summer = pd.to_datetime(wind_data["time"]).dt.month.isin([6, 7, 8])
+    assert pair["correlation"] == pytest.approx(wind_data.loc[summer, "DE"].corr(wind_data.loc[summer, "FR"]), abs=1e-5)
+    assert pair["smoothing_benefit"]["variability_reduction"] > 0
+
+def test_onoffshore_correlation_between_installation_types(wind_data):
+    data = wind_data.rename(columns={"DE": "DE_ON", "NL": "DE_OFF", "FR": "FR_ON", "ES": "FR_OFF"})
+    result = OnOffshoreWindTool(data).run_impl("correlation", country_code="DE")
+    assert result["onshore_offshore"]["correlation"] == pytest.approx(data["DE_ON"].corr(data["DE_OFF"]), abs=1e-5)
+    onshore = OnOffshoreWindTool(data).run_impl("correlation", wind_type="ON")
+    assert onshore["most_correlated_pairs"][0]["installations"] == ["DE_ON", "FR_ON"]
+
+def test_gapped_columns_match_pairwise_complete_pandas(wind_data):
+    data = wind_data[["DE", "NL", "FR", "ES"]].copy()
+    rng = np.random.default_rng(1)
+    data.loc[rng.random(len(data)) < 0.2, "DE"] = np.nan
+    data.loc[rng.random(len(data)) < 0.1, "NL"] = np.nan
+    data.loc[:5000, "FR"] = np.nan
+    matrix = CorrelationMatrix(data.to_numpy(), list(data.columns), block_rows=1000)
+    assert np.allclose(matrix.correlation, data.corr().to_numpy(), atol=1e-5)
+    assert np.allclose(matrix.covariance, data.cov().to_numpy(), rtol=1e-4)
+    assert matrix.std == pytest.approx(data.std().to_numpy(), rel=1e-4)
+
+    data["ES"] = np.nan
+    data.loc[:1, "ES"] = [0.1, 0.2]
+    data.loc[:1, "DE"] = np.nan
+    sparse = CorrelationMatrix(data.to_numpy(), list(data.columns))
+    assert np.isnan(sparse.pair("DE", "ES")["correlation"])
+    pairs = sparse.ranked_pairs()
+    assert not ((pairs["first"] == "DE") & (pairs["second"] == "ES")).any()
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Tools.wind_national_tool import WindNationalTool
+from Tools.wind_statistics import WindStatistics
+
+@pytest.fixture
+def wind_data():
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2015-01-01", periods=24 * 365, freq="h")
+    data = pd.DataFrame({code: rng.beta(2, scale, len(times)) for code, scale in
+                         [("DE", 5), ("DK", 3), ("FR", 6), ("ES", 7), ("NL", 4)]})
+    data.insert(0, "time", times.strftime("%Y-%m-%d %H:%M:%S"))
+    return data
+
+def test_statistics_match_pandas(wind_data):
+    stats = WindStatistics(wind_data)
+    season = pd.to_datetime(wind_data["time"]).dt.month % 12 // 3 + 1
+    assert stats.top(2) == ["DK", "NL"]
+    assert stats.rank("FR") == 4
+    assert stats.seasonal(3)["DE"] == pytest.approx(wind_data.loc[season == 3, "DE"].mean())
+    summary = stats.summary("ES")
+    assert summary["std"] == pytest.approx(wind_data["ES"].std())
+    assert summary["percentiles"]["p95"] == pytest.approx(wind_data["ES"].quantile(0.95))
+    curve = list(summary["duration_curve"].values())
+    assert curve == sorted(curve, reverse=True)
+
+def test_wind_tool_uses_store_without_mutating_data(wind_data):
+    tool = WindNationalTool(wind_data)
+    comparison = tool.run_impl("country_comparison", country="France")
+    assert comparison["ranking"] == 4 and comparison["total_countries"] == 5
+    seasons = tool.run_impl("seasonal_pattern")["results"]
+    assert set(seasons) == {1, 2, 3, 4} and set(seasons[1]) == {"DE", "DK", "FR", "ES", "NL"}
+    assert tool.run_impl("country_statistics", country="Netherlands")["rank"] == 2
+    assert list(wind_data.columns) == ["time", "DE", "DK", "FR", "ES", "NL"]
@@ -1,7 +1,10 @@
 # main.py
+import functools
 import json
+import logging
+import os
 import pandas as pd
-from groq import Groq  
+from Tools.llm_client import LLMClient
 from Configurations.api import API_KEY
 from Tools.pandas_ai_router import PandasAIRouter
 from Tools.fuel_efficiency_tool import FuelConsumptionTool
@@ -17,11 +20,19 @@ from Tools.future_longterm_wind_tool import FutureLongtermWindTool
 from Tools.tornado_analysis_tool import TornadoAnalysisTool
 from Tools.solar_analysis_tool import SolarAnalysisTool
 from Tools.landcover_tool import LandCoverTool
+from Tools.answer_cache import AnswerCache, is_error_result
+from Tools.dataset_version import combined_version
+from Tools.plan_executor import PlanExecutor, PlanError
+from Tools.tool_call_recorder import ToolCallRecorder
+from Tools.sql_query_tool import SQLQueryTool
 
 
+logger = logging.getLogger(__name__)
+
 # Constants
 MODEL = 'llama3-groq-70b-8192-tool-use-preview'
-client = Groq(api_key=API_KEY)
+PLANNER_MODE = os.getenv("PLANNER_MODE", "0") == "1"  # Plan all tool calls up front and run them as a DAG
+client = LLMClient.from_env(api_key=API_KEY)
 
 # Load your weather data into a DataFrame
 fuel_data = pd.read_csv('Datasets/fuel_consumption_canada.csv')
@@ -60,8 +71,17 @@ datasets = {
     "land_cover_data":land_cover_data    
 }
 
-# Initialize the PandasAI router with all datasets
-pandas_ai_router = PandasAIRouter(datasets)
+# Cache of final answers to repeated questions, invalidated when any dataset changes
+answer_cache = AnswerCache(combined_version(datasets))
+
+# Initialize the PandasAI router with all datasets; generated code runs in sandboxed worker processes
+pandas_ai_router = PandasAIRouter(datasets, sandbox_workers=int(os.getenv("PANDASAI_SANDBOX_WORKERS", 2)))
+
+# Read-only SQL over the same datasets and the router's summary tables, answered without another model
+sql_query_tool = SQLQueryTool(
+    datasets,
+    views={name: functools.partial(pandas_ai_router.get_dataset, name) for name in pandas_ai_router.summary_views}
+)
 
 # Initialize the tools
 fuel_consumption_tool = FuelConsumptionTool(fuel_data)
@@ -85,6 +105,10 @@ tools = [
         "type": "function",
         "function": pandas_ai_router.get_function_definition()
     },
+    {
+        "type": "function",
+        "function": sql_query_tool.get_function_definition()
+    },
     {
         "type": "function",
         "function": {
@@ -166,6 +190,7 @@ tools = [
 # Update the available_functions dictionary
 available_functions = {
     pandas_ai_router.get_name(): pandas_ai_router.run_impl,
+    sql_query_tool.get_name(): sql_query_tool.run_impl,
     fuel_consumption_tool.get_name(): fuel_consumption_tool.run_impl,
     "average_co2_by_make": fuel_consumption_tool.average_co2_emissions_by_make,
     "highest_co2_emissions": fuel_consumption_tool.cars_with_highest_co2_emissions,
@@ -185,296 +210,521 @@ available_functions = {
     "analyze_land_cover_data": land_cover_tool.run_impl,    
 }
 
+# Executes planner-mode tool calls, running independent steps in parallel
+plan_executor = PlanExecutor(available_functions)
+
+
+def enable_tool_call_recording(path):
+    """Record every tool call (name, arguments, latency, result hash) to a JSONL file for offline replay."""
+    recorder = ToolCallRecorder(path)
+    for name, function in list(available_functions.items()):
+        # Unwrap first so enabling twice doesn't record each call twice
+        function = getattr(function, "__wrapped__", function)
+        available_functions[name] = recorder.wrap(name, function)
+    return recorder
+
+
+if os.getenv("TOOL_CALL_LOG"):
+    enable_tool_call_recording(os.getenv("TOOL_CALL_LOG"))
+
+
+# System prompt shared by every conversation (CLI and server sessions)
+SYSTEM_CONTENT = (
+    "You are a data analysis assistant for the year 2024. You have access to several specialized tools and datasets. "
+    "Your job is to route queries to the most appropriate tool or use PandasAI for complex analyses.\n\n"
+
+    "1. SPECIALIZED TOOLS AND THEIR FUNCTIONS:\n\n"
+    
+    "a) Extreme Weather Tool (get_regions_with_extreme_weather):\n"
+    "- Identifies regions with specific weather events\n"
+    "- Event types: 'heatwave' (>35°C), 'heavy_rainfall' (>50mm), 'high_humidity' (>90%), 'strong_winds' (>20m/s), 'uv_warning' (>8), 'soil_analysis'\n"
+    "- Example queries:\n"
+    "  * 'Which regions have temperatures above 35°C?'\n"
+    "  * 'Are there any areas with heavy rainfall?'\n\n"
+    
+    "b) Fuel Consumption Tool (get_most_fuel_efficient_cars):\n"
+    "- Finds the most fuel-efficient vehicles for a given year\n"
+    "- Parameters: year (required), fuel_type (optional)\n"
+    "- Example queries:\n"
+    "  * 'What was the most fuel-efficient car in 2010?'\n"
+    "  * 'Show me the most efficient gasoline cars from 2015'\n\n"
+    
+    "c) Temperature Analysis Tool:\n"
+    "- Analyzes temperature trends across cities and countries\n"
+    "- Example queries:\n"
+    "  * 'What's the temperature trend in Paris over time?'\n"
+    "  * 'Compare temperatures between London and New York'\n\n"
+    
+
+    "e) Wind National Analysis Tool (analyze_national_wind_power):\n"
+    "- Analyzes national wind power data and capacity factors\n"
+    "- Provides seven types of analysis:\n"
+    "  1. Top Performers Analysis: Identifies countries with highest capacity factors\n"
+    "  2. Seasonal Pattern Analysis: Shows wind power patterns across seasons\n"
+    "  3. Country Comparison: Compares specific country's performance against others\n"
+    "  4. Regional Pattern: Mean and seasonal capacity factor of a region (eu27, nordics, baltics, benelux, "
+    "iberia, british_isles, balkans, northern/central/southern_europe) or a custom list of countries\n"
+    "  5. Variability: hourly ramp rates (mean, max, percentiles) and 3h/24h/7d rolling variability of a "
+    "country, or all countries ranked from most to least consistent\n"
+    "  6. Country Statistics: mean, std, percentiles, seasonal means, rank and duration curve of one country\n"
+    "  7. Correlation: correlation between two countries (country + comparison_country), a country's most "
+    "and least correlated partners, or the most/least correlated pairs and the smoothing benefit of pooling; "
+    "optionally for one season\n"
+    "- Example queries:\n"
+    "  * 'Show me the top 5 countries with highest wind power capacity'\n"
+    "  * 'What are the seasonal wind power patterns in Europe?'\n"
+    "  * 'Compare Germany's wind power performance with other countries'\n"
+    "  * 'Show wind power patterns for summer season'\n"
+    "  * 'Which countries have the best wind power performance?'\n"
+    "  * 'What is the average wind capacity factor of the Nordic countries?' (use regional_pattern with "
+    "region='nordics')\n"
+    "  * 'Which countries have the most consistent wind power output?' (use variability)\n"
+    "  * 'What are the hourly wind ramp rates in Germany?' (use variability with country='Germany')\n"
+    "  * 'Show the capacity factor duration curve for Spain' (use country_statistics with country='Spain')\n"
+    "  * 'What's the correlation between German and French wind power output?' (use correlation with "
+    "country='Germany', comparison_country='France')\n\n"
+    
+    "f) Onshore/Offshore Wind Analysis Tool (analyze_onoffshore_wind_power):\n"
+    "- Analyzes onshore and offshore wind power data separately\n"
+    "- Provides six types of analysis:\n"
+    "  1. Distribution Analysis: Shows distribution of onshore vs offshore installations\n"
+    "  2. Efficiency Comparison: Compares efficiency between onshore and offshore\n"
+    "  3. Top Producers: Lists top performing countries for each type\n"
+    "  4. Country Detail: Detailed analysis for specific countries\n"
+    "  5. Regional Summary: Onshore and offshore capacity factors of a region or a custom list of countries\n"
+    "  6. Correlation: onshore vs offshore correlation of a country, or the most/least correlated "
+    "installations (optionally one wind_type or season) and the smoothing benefit of pooling them\n"
+    "- Example queries:\n"
+    "  * 'Compare efficiency between onshore and offshore wind power'\n"
+    "  * 'Show me the top offshore wind power producers'\n"
+    "  * 'What's the distribution of onshore vs offshore installations?'\n"
+    "  * 'Give me details about Germany's onshore and offshore capacity'\n"
+    "  * 'Find correlation between onshore and offshore performance in Germany' (use correlation with "
+    "country_code='DE')\n\n"
+
+    "g) Future Long-term Wind Analysis Tool (analyze_future_longterm_wind):\n"
+    "- Analyzes long-term future wind power projections\n"
+    "- Provides four types of analysis:\n"
+    "  1. Trend Analysis: Shows overall trends and top performing countries\n"
+    "  2. Country Projection: Detailed future projections for specific countries\n"
+    "  3. Comparative Analysis: Compares projections between countries\n"
+    "  4. Peak Performance: Analyzes peak capacity periods\n"
+    "- Example queries:\n"
+    "  * 'What are the projected wind power trends for the future?'\n"
+    "  * 'Show me Germany's future wind power projections'\n"
+    "  * 'Compare future wind power between France and Spain'\n"
+    "  * 'Which countries are expected to have peak performance?'\n\n"
+
+    "h) Tornado Analysis Tool (analyze_tornado_data):\n"
+    "- Analyzes historical tornado data and patterns\n"
+    "- Provides multiple types of analysis:\n"
+    "  1. Severity Impact: Analyzes relationship between magnitude and impacts\n"
+    "  2. Path Characteristics: Analyzes tornado paths and movements\n"
+    "  3. Temporal Patterns: Shows patterns across time scales\n"
+    "  4. State Comparison: Compares tornado characteristics between states\n"
+    "  5. Economic Impact: Analyzes loss patterns and trends\n"
+    "  6. F-scale Distribution: Analyzes tornado intensity distributions\n"
+    "  7. Spatial Searches: radius_search (tracks within radius_km of latitude/longitude), bbox_search "
+    "(tracks crossing a latitude/longitude box) and nearest_tracks (k closest tracks), with optional "
+    "start_year/end_year; use the place's coordinates for questions about a city or area\n"
+    "  8. Density Heatmap: grid cells with the most tornado tracks and path length, with optional "
+    "resolution_degrees, min_magnitude, state and start_year/end_year filters\n"
+    "  9. Outbreak Detection: groups of min_tornadoes+ tornadoes within window_hours and radius_km of each "
+    "other, their sizes and worst events per state/year, plus how often several tornadoes occur on the same day\n"
+    "  10. Diurnal Distribution: tornado counts per time-of-day slot of bin_minutes (default 60), the peak "
+    "slot and morning/afternoon/evening/night totals, with optional state and start_year/end_year filters\n"
+    "- Example queries for tool functions:\n"
+    "  * 'Show me the severity impact analysis for Texas'\n"
+    "  * 'Compare tornado characteristics between Oklahoma and Kansas'\n"
+    "  * 'What are the temporal patterns of tornadoes in Florida?'\n"
+    "  * 'Analyze the economic impact of tornadoes in Illinois'\n"
+    "  * 'Show me the F-scale distribution for all tornadoes'\n"
+    "  * 'Tornadoes within 50 km of Oklahoma City since 2000' → radius_search with latitude=35.47, "
+    "longitude=-97.52, radius_km=50, start_year=2000\n"
+    "  * 'Where are EF3+ tornado paths most concentrated?' → density_heatmap with min_magnitude=3\n"
+    "  * 'Calculate the probability of multiple tornadoes occurring on the same day' → outbreak_detection\n"
+    "  * 'What were the largest tornado outbreaks in Alabama?' → outbreak_detection with state='AL'\n"
+    "  * 'At what time of day are Kansas tornadoes most common, in 15-minute steps?' → diurnal_distribution "
+    "with state='KS', bin_minutes=15\n"
+
+    "h) Solar Analysis Tool (analyze_solar_data):\n"
+    "- Analyzes solar power data using two specialized datasets:\n"
+    "  * SARAH: Specialized for solar energy applications\n"
+    "  * MERRA: Broader environmental context\n"
+    "- Provides nine types of analysis:\n"
+    "  1. Daylight Patterns: Analyzes daylight hours, sunrise/sunset times, and seasonal variations\n"
+    "  2. Geographical Patterns: Compares Northern, Central, and Southern European regions, or the given "
+    "regions (eu27, nordics, iberia, ...) and a custom list of countries\n"
+    "  3. Clear Sky Patterns: Analyzes optimal solar conditions and their distribution\n"
+    "  4. Country Analysis: Detailed country-specific solar patterns\n"
+    "  5. Regional Comparison: Compares two specific countries\n"
+    "  6. Seasonal Efficiency: Analyzes seasonal performance and variations\n"
+    "  7. Clear Sky Ranking: Clear-sky thresholds, days and intensity of every country in one ranked table\n"
+    "  8. Source Comparison: SARAH vs MERRA bias, RMSE, correlation and disagreement windows, for all "
+    "countries or one country_code (uses both datasets)\n"
+    "  9. Variability: hourly ramp rates and 3h/24h/7d rolling variability of a country or region, or all "
+    "countries ranked\n"
+    "- Example queries:\n"
+    "  * 'Analyze daylight patterns for Germany using SARAH data'\n"
+    "  * 'Compare solar potential between Spain and France using MERRA data' (use regional_comparison)\n"
+    "  * 'Show geographical patterns across Europe using SARAH data' (use geographical_patterns)\n"
+    "  * 'Compare Northern vs Southern Europe solar potential' (use geographical_patterns)\n"
+    "  * 'Average SARAH solar output of the EU-27 vs the Nordics' (use geographical_patterns with "
+    "regions=['eu27', 'nordics'])\n"
+    "  * 'What are the clear sky patterns in Italy? (Please specify SARAH or MERRA)'\n"
+    "  * 'Give me a detailed country analysis for France using SARAH data'\n"
+    "  * 'Which countries have the strongest clear-sky days in the SARAH data?' (use clear_sky_ranking)\n"
+    "  * 'Calculate solar variability metrics across different timescales for Spain using SARAH data' "
+    "(use variability with country_code='ES')\n"
+    "  * 'Identify periods where SARAH and MERRA significantly disagree for Spain' (use source_comparison "
+    "with country_code='ES')\n"
+    "  * 'Analyze seasonal efficiency in Southern Europe (Please specify dataset)'\n\n"
+    "  * 'What are the optimal generation hours in Spain? (Please specify dataset)'\n"
+    "  * 'Seasonal solar efficiency of the Nordics using SARAH data' (use seasonal_efficiency with "
+    "region='nordics'; country_analysis also accepts region)\n"
+    "  * 'Compare solar potential between Northern and Southern Europe'\n\n"
+    "NOTE: If the user doesn't specify whether to use SARAH or MERRA data, ask for clarification "
+    "(except for source_comparison, which always uses both).\n"
+    "SARAH is preferred for solar energy applications, while MERRA provides broader environmental context.\n\n"
+
+
+    "i) Land Cover Tool (analyze_land_cover_data):\n"
+    "- Analyzes historical and recent land cover data globally.\n"
+    "- Functions include:\n"
+    "  1. Artificial Surfaces Analysis: Retrieves coverage area of artificial surfaces (e.g., urban areas).\n"
+    "  2. Shrub Cover Trends: Analyzes shrub or forest cover changes over time or across regions.\n"
+    "  3. Agricultural Expansion: Identifies shifts in agricultural land use by year and country.\n"
+    "  4. Regional Land Cover Comparison: Compares land cover categories between countries/regions.\n"
+    "- Example queries:\n"
+    "  * 'What is the area of artificial surfaces in Bolivia in 2000?'\n"
+    "  * 'Show forest or shrub cover trends in Brazil between 1990 and 2020.'\n"
+    "  * 'Compare land use between India and China in 2015.'\n"
+    "  * 'What is the percentage of agricultural land in the United States in 2023?'\n\n"
+
+    "j) Fuel Efficiency Tool (get_most_fuel_efficient_cars):\n"
+    "- Analyzes vehicle fuel consumption and emissions data in Canada.\n"
+    "- Functions include:\n"
+    "  1. Most Fuel-Efficient Cars: Identifies vehicles with the lowest combined fuel consumption for a given year.\n"
+    "  2. CO2 Emissions by Make: Calculates the average CO2 emissions for each car make.\n"
+    "  3. Top CO2 Emitters: Lists the top 5 cars with the highest CO2 emissions.\n"
+    "  4. Average Engine Size by Vehicle Class: Provides the average engine size for different vehicle classes.\n"
+    "  5. Fuel Efficiency by Class: Shows the average combined fuel efficiency for different vehicle classes.\n"
+    "- Example queries:\n"
+    "  * 'What was the most fuel-efficient car in 2015?'\n"
+    "  * 'Show me the average CO2 emissions by car make.'\n"
+    "  * 'Which cars had the highest CO2 emissions in 2020?'\n"
+    "  * 'What's the average engine size for SUVs?'\n"
+    "  * 'Compare the average fuel efficiency of trucks and sedans.'\n\n"
+
+
+    "The tool can analyze:\n"
+    "- Average capacity factors by country\n"
+    "- Seasonal variations (Spring=1, Summer=2, Fall=3, Winter=4)\n"
+    "- Country rankings and comparisons\n"
+    "- Performance relative to overall average\n\n"
+
+    "2. PANDASAI ROUTER (query_dataset):\n"
+    "Use this for ANY query that doesn't exactly match the predefined tools' capabilities. "
+    "Available datasets:\n\n"
+    
+    "a) weather_data:\n"
+    "- Contains: temperature, humidity, precipitation, wind, pressure, visibility, UV index, soil conditions\n"
+    "- Use for: Complex weather analysis, correlations, patterns, comparisons\n"
+    "- Example queries:\n"
+    "  * 'What's the correlation between humidity and rainfall?'\n"
+    "  * 'Find the least humid regions in summer'\n"
+    "  * 'Compare wind speeds between different countries'\n\n"
+    
+    "b) fuel_data:\n"
+    "- Contains: vehicle make, model, year, fuel consumption metrics\n"
+    "- Use for: Complex vehicle efficiency analysis, comparisons, trends, least fuel efficient car\n"
+    "- Example queries:\n"
+    "  * 'Which SUV was the least efficient in 2010?'\n"
+    "  * 'Compare fuel efficiency between manufacturers'\n"
+    "  * 'Show fuel consumption trends for trucks'\n\n"
+    
+    "c) city_data, country_data, global_data:\n"
+    "- Contains: Historical temperature data at different geographical levels\n"
+    "- Use for: Complex temperature analysis, historical trends, geographical comparisons\n"
+    "- Example queries:\n"
+    "  * 'Which city had the highest average temperature?'\n"
+    "  * 'Compare temperature variations between continents'\n\n"
+
+    "d) wind_national_data:\n"
+    "- Contains: National wind power capacity factors, hourly measurements, country-specific data\n"
+    "- Use for: Complex wind power analysis, correlations, patterns, comparisons\n"
+    "- Example queries:\n"
+    "  * 'Show hourly wind power variations for Denmark'\n"
+    "  * 'Compare wind power performance between neighboring countries'\n"
+    "  * 'Calculate average wind power output during peak hours'\n\n"
+
+    "e) onoffshore_wind_data:\n"
+    "- Contains: Separate onshore and offshore wind power data by country\n"
+    "- Use for: Complex analysis comparing onshore/offshore performance\n"
+    "- Example queries:\n"
+    "  * 'Compare hourly variations in onshore vs offshore output'\n"
+    "  * 'Analyze peak performance times for different installation types'\n\n"
+
+    "f) future_longterm_wind_data:\n"
+    "- Contains: Long-term wind power projections by country\n"
+    "- Use for: Complex analysis of future wind power trends\n"
+    "- Example queries:\n"
+    "  * 'Calculate the growth rate of wind power capacity'\n"
+    "  * 'Find periods of projected peak performance'\n"
+    "  * 'Project the quarter 3 power output for france next year'\n"
+    "  * 'Analyze patterns by quarters in future 2 year projections for germany'\n\n"
+
+    "g) tornado_data:\n"
+    "- Contains: Detailed tornado event data including paths, damage, and characteristics\n"
+    "- Use for: Complex analysis beyond predefined functions\n"
+    "- Example queries for PandasAI (complex analysis):\n"
+    "  * 'What's the relationship between soil moisture and tornado formation?'\n"
+    "  * 'Find clusters of tornado occurrences near geographical boundaries'\n"
+    "  * 'Analyze the correlation between tornado width and population density'\n"
+    "  * 'What weather conditions preceded the most destructive tornadoes?'\n"
+    "  * 'Find patterns in tornado behavior during El Niño years'\n"
+    "  * 'Calculate the statistical significance of tornado path orientations'\n"
+    "  * 'Identify areas with unusual tornado timing patterns'\n\n"
+
+    "h) solar_sarah_data and solar_merra_data:\n"
+    "- Contains: Solar power data from two different methodologies\n"
+    "- Use for: Complex analysis beyond predefined functions\n"
+    "- Example queries for PandasAI:\n"
+    "  * 'Calculate the correlation between latitude and peak solar hours'\n"
+    "  * 'Compare SARAH and MERRA predictions for specific regions'\n"
+    "  * 'Find statistical anomalies between the two datasets'\n"
+    "  * 'Calculate confidence intervals for solar predictions'\n"
+    "  * 'Analyze the impact of seasonal changes on prediction accuracy'\n"
+    "  * 'Find optimal solar installation locations using both datasets'\n\n"
+
+    "a) land_cover_data:\n"
+    "- Contains: Land use data by category (forest, agriculture, artificial surfaces, etc.), country, year.\n"
+    "- Use for: Complex land cover analysis, correlations, trends, and anomalies.\n"
+    "- Example queries:\n"
+    "  * 'Analyze land use change in Southeast Asia over the last decade.'\n"
+    "  * 'Identify correlations between population density and urban land expansion.'\n"
+    "  * 'Find regions with the highest deforestation rates.'\n\n"
+
+    "b) fuel_data:\n"
+    "- Contains: vehicle make, model, year, fuel consumption metrics.\n"
+    "- Use for: Complex vehicle efficiency analysis, comparisons, trends, and correlations.\n"
+    "- Example queries:\n"
+    "  * 'Which SUV was the least efficient in 2010?'\n"
+    "  * 'Compare fuel efficiency between manufacturers.'\n"
+    "  * 'what is the model name which has the most fuel efficiency in 1999'\n\n"
+
+    "PRE-AGGREGATED SUMMARY TABLES (also queried with query_dataset):\n"
+    "- city_yearly_temperature (from city_data), weather_country_daily (from weather_data), "
+    "wind_national_monthly, onoffshore_wind_monthly, solar_sarah_monthly, solar_merra_monthly\n"
+    "- Prefer these over the raw tables for yearly, monthly or daily aggregate questions; "
+    "they hold thousands of rows instead of millions and answer much faster\n\n"
+
+    "SQL QUERIES (sql_query):\n"
+    "- Runs one read-only SELECT (DuckDB SQL) over every dataset and summary table listed above\n"
+    "- Prefer it over query_dataset for aggregates that are a single SQL statement: averages, counts, "
+    "sums, top-N rankings, group-bys and filters\n"
+    "- Use query_dataset when the analysis needs multiple steps, reshaping or statistics SQL can't express\n"
+    "- Example: 'Average CO2 emissions per make in 2015' → sql_query with "
+    "SELECT \"Make\", AVG(\"CO2 emissions (g/km)\") FROM fuel_data WHERE \"Model year\" = 2015 GROUP BY 1 ORDER BY 2 DESC\n\n"
+
+    "ROUTING LOGIC:\n"
+    "1. IF the query EXACTLY matches a predefined tool's capability → Use that tool\n"
+    "2. IF the query requires complex analysis or doesn't match predefined functions → Use PandasAI router with appropriate dataset\n"
+    "3. IF unsure → Default to PandasAI router with the most relevant dataset\n\n"
+
+    "ROUTING LOGIC FOR WIND POWER QUERIES:\n"
+    "1. Use analyze_national_wind_power when:\n"
+    "   - Requesting top performing countries in wind power\n"
+    "   - Analyzing seasonal patterns\n"
+    "   - Comparing specific country performances\n"
+    "   - Need capacity factor analysis\n\n"
+    "2. Use PandasAI with wind_data when:\n"
+    "   - Need complex correlations between countries\n"
+    "   - Require custom time period analysis\n"
+    "   - Want detailed statistical analysis\n"
+    "   - Need hourly pattern analysis\n"
+    "   Example queries for PandasAI:\n"
+    "   * 'What's the correlation between German and French wind power output?'\n"
+    "   * 'Show the hourly wind power variation for Denmark'\n"
+    "   * 'Calculate the standard deviation of wind power output for each country'\n"
+    "   * 'Find periods where multiple countries had peak performance'\n"
+    "   * 'Analyze wind power trends during specific hours of the day'\n\n"
+
+    "ROUTING LOGIC FOR TORNADO ANALYSIS QUERIES:\n"
+    "1. Use analyze_tornado_data when:\n"
+    "   - Requesting tornado frequency analysis\n"
+    "   - Need detailed analysis of tornado data\n"
+    "   - Asking about tornadoes near a place or inside an area (spatial searches)\n"
+    "   - Asking about outbreaks or multiple tornadoes on the same day (outbreak_detection)\n\n"
+
+    "For EVERY response:\n"
+    "1. Identify the most appropriate tool/dataset based on the query\n"
+    "2. Call the function with correct parameters\n"
+    "3. Provide clear results with context\n"
+    "4. If using PandasAI, specify which dataset you're using and why\n\n"
+
+    "Examples of routing:\n"
+    "- 'What's the most fuel-efficient car in 2020?' → Use fuel_consumption_tool (exact match)\n"
+    "- 'Which SUV had worst efficiency in 2015?' → Use PandasAI with fuel_data (complex query)\n"
+    "- 'Show regions above 35°C' → Use extreme_weather_tool (exact match)\n"
+    "- 'How does temperature correlate with humidity?' → Use PandasAI with weather_data (complex analysis)\n"
+)
+
+def new_conversation():
+    """Start a new message history seeded with the system prompt."""
+    return [
+        {
+            "role": "system",
+            "content": SYSTEM_CONTENT
+        }
+    ]
+
 
-# Function to handle the LLM conversation
-def run_conversation():
-    # Update the system message content to include wind national tool capabilities
-    system_content = (
-        "You are a data analysis assistant for the year 2024. You have access to several specialized tools and datasets. "
-        "Your job is to route queries to the most appropriate tool or use PandasAI for complex analyses.\n\n"
-
-        "1. SPECIALIZED TOOLS AND THEIR FUNCTIONS:\n\n"
-        
-        "a) Extreme Weather Tool (get_regions_with_extreme_weather):\n"
-        "- Identifies regions with specific weather events\n"
-        "- Event types: 'heatwave' (>35°C), 'heavy_rainfall' (>50mm), 'high_humidity' (>90%), 'strong_winds' (>20m/s), 'uv_warning' (>8), 'soil_analysis'\n"
-        "- Example queries:\n"
-        "  * 'Which regions have temperatures above 35°C?'\n"
-        "  * 'Are there any areas with heavy rainfall?'\n\n"
-        
-        "b) Fuel Consumption Tool (get_most_fuel_efficient_cars):\n"
-        "- Finds the most fuel-efficient vehicles for a given year\n"
-        "- Parameters: year (required), fuel_type (optional)\n"
-        "- Example queries:\n"
-        "  * 'What was the most fuel-efficient car in 2010?'\n"
-        "  * 'Show me the most efficient gasoline cars from 2015'\n\n"
-        
-        "c) Temperature Analysis Tool:\n"
-        "- Analyzes temperature trends across cities and countries\n"
-        "- Example queries:\n"
-        "  * 'What's the temperature trend in Paris over time?'\n"
-        "  * 'Compare temperatures between London and New York'\n\n"
-        
-
-        "e) Wind National Analysis Tool (analyze_national_wind_power):\n"
-        "- Analyzes national wind power data and capacity factors\n"
-        "- Provides three types of analysis:\n"
-        "  1. Top Performers Analysis: Identifies countries with highest capacity factors\n"
-        "  2. Seasonal Pattern Analysis: Shows wind power patterns across seasons\n"
-        "  3. Country Comparison: Compares specific country's performance against others\n"
-        "- Example queries:\n"
-        "  * 'Show me the top 5 countries with highest wind power capacity'\n"
-        "  * 'What are the seasonal wind power patterns in Europe?'\n"
-        "  * 'Compare Germany's wind power performance with other countries'\n"
-        "  * 'Show wind power patterns for summer season'\n"
-        "  * 'Which countries have the best wind power performance?'\n\n"
-        
-        "f) Onshore/Offshore Wind Analysis Tool (analyze_onoffshore_wind_power):\n"
-        "- Analyzes onshore and offshore wind power data separately\n"
-        "- Provides four types of analysis:\n"
-        "  1. Distribution Analysis: Shows distribution of onshore vs offshore installations\n"
-        "  2. Efficiency Comparison: Compares efficiency between onshore and offshore\n"
-        "  3. Top Producers: Lists top performing countries for each type\n"
-        "  4. Country Detail: Detailed analysis for specific countries\n"
-        "- Example queries:\n"
-        "  * 'Compare efficiency between onshore and offshore wind power'\n"
-        "  * 'Show me the top offshore wind power producers'\n"
-        "  * 'What's the distribution of onshore vs offshore installations?'\n"
-        "  * 'Give me details about Germany's onshore and offshore capacity'\n\n"
-
-        "g) Future Long-term Wind Analysis Tool (analyze_future_longterm_wind):\n"
-        "- Analyzes long-term future wind power projections\n"
-        "- Provides four types of analysis:\n"
-        "  1. Trend Analysis: Shows overall trends and top performing countries\n"
-        "  2. Country Projection: Detailed future projections for specific countries\n"
-        "  3. Comparative Analysis: Compares projections between countries\n"
-        "  4. Peak Performance: Analyzes peak capacity periods\n"
-        "- Example queries:\n"
-        "  * 'What are the projected wind power trends for the future?'\n"
-        "  * 'Show me Germany's future wind power projections'\n"
-        "  * 'Compare future wind power between France and Spain'\n"
-        "  * 'Which countries are expected to have peak performance?'\n\n"
-
-        "h) Tornado Analysis Tool (analyze_tornado_data):\n"
-        "- Analyzes historical tornado data and patterns\n"
-        "- Provides multiple types of analysis:\n"
-        "  1. Severity Impact: Analyzes relationship between magnitude and impacts\n"
-        "  2. Path Characteristics: Analyzes tornado paths and movements\n"
-        "  3. Temporal Patterns: Shows patterns across time scales\n"
-        "  4. State Comparison: Compares tornado characteristics between states\n"
-        "  5. Economic Impact: Analyzes loss patterns and trends\n"
-        "  6. F-scale Distribution: Analyzes tornado intensity distributions\n"
-        "- Example queries for tool functions:\n"
-        "  * 'Show me the severity impact analysis for Texas'\n"
-        "  * 'Compare tornado characteristics between Oklahoma and Kansas'\n"
-        "  * 'What are the temporal patterns of tornadoes in Florida?'\n"
-        "  * 'Analyze the economic impact of tornadoes in Illinois'\n"
-        "  * 'Show me the F-scale distribution for all tornadoes'\n"
-
-        "h) Solar Analysis Tool (analyze_solar_data):\n"
-        "- Analyzes solar power data using two specialized datasets:\n"
-        "  * SARAH: Specialized for solar energy applications\n"
-        "  * MERRA: Broader environmental context\n"
-        "- Provides six types of analysis:\n"
-        "  1. Daylight Patterns: Analyzes daylight hours, sunrise/sunset times, and seasonal variations\n"
-        "  2. Geographical Patterns: Compares Northern, Central, and Southern European regions\n"
-        "  3. Clear Sky Patterns: Analyzes optimal solar conditions and their distribution\n"
-        "  4. Country Analysis: Detailed country-specific solar patterns\n"
-        "  5. Regional Comparison: Compares two specific countries\n"
-        "  6. Seasonal Efficiency: Analyzes seasonal performance and variations\n"
-        "- Example queries:\n"
-        "  * 'Analyze daylight patterns for Germany using SARAH data'\n"
-        "  * 'Compare solar potential between Spain and France using MERRA data' (use regional_comparison)\n"
-        "  * 'Show geographical patterns across Europe using SARAH data' (use geographical_patterns)\n"
-        "  * 'Compare Northern vs Southern Europe solar potential' (use geographical_patterns)\n"
-        "  * 'What are the clear sky patterns in Italy? (Please specify SARAH or MERRA)'\n"
-        "  * 'Give me a detailed country analysis for France using SARAH data'\n"
-        "  * 'Analyze seasonal efficiency in Southern Europe (Please specify dataset)'\n\n"
-        "  * 'What are the optimal generation hours in Spain? (Please specify dataset)'\n"
-        "  * 'Compare solar potential between Northern and Southern Europe'\n\n"
-        "NOTE: If the user doesn't specify whether to use SARAH or MERRA data, ask for clarification.\n"
-        "SARAH is preferred for solar energy applications, while MERRA provides broader environmental context.\n\n"
-
-
-        "i) Land Cover Tool (analyze_land_cover_data):\n"
-        "- Analyzes historical and recent land cover data globally.\n"
-        "- Functions include:\n"
-        "  1. Artificial Surfaces Analysis: Retrieves coverage area of artificial surfaces (e.g., urban areas).\n"
-        "  2. Shrub Cover Trends: Analyzes shrub or forest cover changes over time or across regions.\n"
-        "  3. Agricultural Expansion: Identifies shifts in agricultural land use by year and country.\n"
-        "  4. Regional Land Cover Comparison: Compares land cover categories between countries/regions.\n"
-        "- Example queries:\n"
-        "  * 'What is the area of artificial surfaces in Bolivia in 2000?'\n"
-        "  * 'Show forest or shrub cover trends in Brazil between 1990 and 2020.'\n"
-        "  * 'Compare land use between India and China in 2015.'\n"
-        "  * 'What is the percentage of agricultural land in the United States in 2023?'\n\n"
-
-        "j) Fuel Efficiency Tool (get_most_fuel_efficient_cars):\n"
-        "- Analyzes vehicle fuel consumption and emissions data in Canada.\n"
-        "- Functions include:\n"
-        "  1. Most Fuel-Efficient Cars: Identifies vehicles with the lowest combined fuel consumption for a given year.\n"
-        "  2. CO2 Emissions by Make: Calculates the average CO2 emissions for each car make.\n"
-        "  3. Top CO2 Emitters: Lists the top 5 cars with the highest CO2 emissions.\n"
-        "  4. Average Engine Size by Vehicle Class: Provides the average engine size for different vehicle classes.\n"
-        "  5. Fuel Efficiency by Class: Shows the average combined fuel efficiency for different vehicle classes.\n"
-        "- Example queries:\n"
-        "  * 'What was the most fuel-efficient car in 2015?'\n"
-        "  * 'Show me the average CO2 emissions by car make.'\n"
-        "  * 'Which cars had the highest CO2 emissions in 2020?'\n"
-        "  * 'What's the average engine size for SUVs?'\n"
-        "  * 'Compare the average fuel efficiency of trucks and sedans.'\n\n"
-
-
-        "The tool can analyze:\n"
-        "- Average capacity factors by country\n"
-        "- Seasonal variations (Spring=1, Summer=2, Fall=3, Winter=4)\n"
-        "- Country rankings and comparisons\n"
-        "- Performance relative to overall average\n\n"
-
-        "2. PANDASAI ROUTER (query_dataset):\n"
-        "Use this for ANY query that doesn't exactly match the predefined tools' capabilities. "
-        "Available datasets:\n\n"
-        
-        "a) weather_data:\n"
-        "- Contains: temperature, humidity, precipitation, wind, pressure, visibility, UV index, soil conditions\n"
-        "- Use for: Complex weather analysis, correlations, patterns, comparisons\n"
-        "- Example queries:\n"
-        "  * 'What's the correlation between humidity and rainfall?'\n"
-        "  * 'Find the least humid regions in summer'\n"
-        "  * 'Compare wind speeds between different countries'\n\n"
-        
-        "b) fuel_data:\n"
-        "- Contains: vehicle make, model, year, fuel consumption metrics\n"
-        "- Use for: Complex vehicle efficiency analysis, comparisons, trends, least fuel efficient car\n"
-        "- Example queries:\n"
-        "  * 'Which SUV was the least efficient in 2010?'\n"
-        "  * 'Compare fuel efficiency between manufacturers'\n"
-        "  * 'Show fuel consumption trends for trucks'\n\n"
-        
-        "c) city_data, country_data, global_data:\n"
-        "- Contains: Historical temperature data at different geographical levels\n"
-        "- Use for: Complex temperature analysis, historical trends, geographical comparisons\n"
-        "- Example queries:\n"
-        "  * 'Which city had the highest average temperature?'\n"
-        "  * 'Compare temperature variations between continents'\n\n"
-
-        "d) wind_national_data:\n"
-        "- Contains: National wind power capacity factors, hourly measurements, country-specific data\n"
-        "- Use for: Complex wind power analysis, correlations, patterns, comparisons\n"
-        "- Example queries:\n"
-        "  * 'What's the correlation between German and French wind power output?'\n"
-        "  * 'Show hourly wind power variations for Denmark'\n"
-        "  * 'Which countries have the most consistent wind power output?'\n"
-        "  * 'Compare wind power performance between neighboring countries'\n"
-        "  * 'Calculate average wind power output during peak hours'\n\n"
-
-        "e) onoffshore_wind_data:\n"
-        "- Contains: Separate onshore and offshore wind power data by country\n"
-        "- Use for: Complex analysis comparing onshore/offshore performance\n"
-        "- Example queries:\n"
-        "  * 'Compare hourly variations in onshore vs offshore output'\n"
-        "  * 'Find correlation between onshore and offshore performance'\n"
-        "  * 'Analyze peak performance times for different installation types'\n\n"
-
-        "f) future_longterm_wind_data:\n"
-        "- Contains: Long-term wind power projections by country\n"
-        "- Use for: Complex analysis of future wind power trends\n"
-        "- Example queries:\n"
-        "  * 'Calculate the growth rate of wind power capacity'\n"
-        "  * 'Find periods of projected peak performance'\n"
-        "  * 'Project the quarter 3 power output for france next year'\n"
-        "  * 'Analyze patterns by quarters in future 2 year projections for germany'\n\n"
-
-        "g) tornado_data:\n"
-        "- Contains: Detailed tornado event data including paths, damage, and characteristics\n"
-        "- Use for: Complex analysis beyond predefined functions\n"
-        "- Example queries for PandasAI (complex analysis):\n"
-        "  * 'What's the relationship between soil moisture and tornado formation?'\n"
-        "  * 'Find clusters of tornado occurrences near geographical boundaries'\n"
-        "  * 'Calculate the probability of multiple tornadoes occurring on the same day'\n"
-        "  * 'Analyze the correlation between tornado width and population density'\n"
-        "  * 'What weather conditions preceded the most destructive tornadoes?'\n"
-        "  * 'Find patterns in tornado behavior during El Niño years'\n"
-        "  * 'Calculate the statistical significance of tornado path orientations'\n"
-        "  * 'Identify areas with unusual tornado timing patterns'\n\n"
-
-        "h) solar_sarah_data and solar_merra_data:\n"
-        "- Contains: Solar power data from two different methodologies\n"
-        "- Use for: Complex analysis beyond predefined functions\n"
-        "- Example queries for PandasAI:\n"
-        "  * 'Calculate the correlation between latitude and peak solar hours'\n"
-        "  * 'Compare SARAH and MERRA predictions for specific regions'\n"
-        "  * 'Find statistical anomalies between the two datasets'\n"
-        "  * 'Calculate confidence intervals for solar predictions'\n"
-        "  * 'Analyze the impact of seasonal changes on prediction accuracy'\n"
-        "  * 'Identify periods where SARAH and MERRA significantly disagree'\n"
-        "  * 'Calculate solar variability metrics across different timescales'\n"
-        "  * 'Find optimal solar installation locations using both datasets'\n\n"
-
-        "a) land_cover_data:\n"
-        "- Contains: Land use data by category (forest, agriculture, artificial surfaces, etc.), country, year.\n"
-        "- Use for: Complex land cover analysis, correlations, trends, and anomalies.\n"
-        "- Example queries:\n"
-        "  * 'Analyze land use change in Southeast Asia over the last decade.'\n"
-        "  * 'Identify correlations between population density and urban land expansion.'\n"
-        "  * 'Find regions with the highest deforestation rates.'\n\n"
-
-        "b) fuel_data:\n"
-        "- Contains: vehicle make, model, year, fuel consumption metrics.\n"
-        "- Use for: Complex vehicle efficiency analysis, comparisons, trends, and correlations.\n"
-        "- Example queries:\n"
-        "  * 'Which SUV was the least efficient in 2010?'\n"
-        "  * 'Compare fuel efficiency between manufacturers.'\n"
-        "  * 'what is the model name which has the most fuel efficiency in 1999'\n\n"
-
-        "ROUTING LOGIC:\n"
-        "1. IF the query EXACTLY matches a predefined tool's capability → Use that tool\n"
-        "2. IF the query requires complex analysis or doesn't match predefined functions → Use PandasAI router with appropriate dataset\n"
-        "3. IF unsure → Default to PandasAI router with the most relevant dataset\n\n"
-
-        "ROUTING LOGIC FOR WIND POWER QUERIES:\n"
-        "1. Use analyze_national_wind_power when:\n"
-        "   - Requesting top performing countries in wind power\n"
-        "   - Analyzing seasonal patterns\n"
-        "   - Comparing specific country performances\n"
-        "   - Need capacity factor analysis\n\n"
-        "2. Use PandasAI with wind_data when:\n"
-        "   - Need complex correlations between countries\n"
-        "   - Require custom time period analysis\n"
-        "   - Want detailed statistical analysis\n"
-        "   - Need hourly pattern analysis\n"
-        "   Example queries for PandasAI:\n"
-        "   * 'What's the correlation between German and French wind power output?'\n"
-        "   * 'Show the hourly wind power variation for Denmark'\n"
-        "   * 'Calculate the standard deviation of wind power output for each country'\n"
-        "   * 'Find periods where multiple countries had peak performance'\n"
-        "   * 'Analyze wind power trends during specific hours of the day'\n\n"
-
-        "ROUTING LOGIC FOR TORNADO ANALYSIS QUERIES:\n"
-        "1. Use analyze_tornado_data when:\n"
-        "   - Requesting tornado frequency analysis\n"
-        "   - Need detailed analysis of tornado data\n\n"
-
-        "For EVERY response:\n"
-        "1. Identify the most appropriate tool/dataset based on the query\n"
-        "2. Call the function with correct parameters\n"
-        "3. Provide clear results with context\n"
-        "4. If using PandasAI, specify which dataset you're using and why\n\n"
-
-        "Examples of routing:\n"
-        "- 'What's the most fuel-efficient car in 2020?' → Use fuel_consumption_tool (exact match)\n"
-        "- 'Which SUV had worst efficiency in 2015?' → Use PandasAI with fuel_data (complex query)\n"
-        "- 'Show regions above 35°C' → Use extreme_weather_tool (exact match)\n"
-        "- 'How does temperature correlate with humidity?' → Use PandasAI with weather_data (complex analysis)\n"
+def process_user_message(messages, user_input, planner=PLANNER_MODE):
+    """Run one conversation turn on the given message history and return the assistant's reply."""
+    messages.append({
+        "role": "user",
+        "content": user_input
+    })
+
+    # Repeated standalone questions are answered from the cache without any LLM call
+    cached = answer_cache.get(user_input)
+    if cached:
+        messages.append({"role": "assistant", "content": cached["answer"]})
+        return cached["answer"]
+
+    if planner:
+        answer, recorded_calls = run_planned_turn(messages)
+    else:
+        answer, recorded_calls = run_tool_turn(messages)
+
+    answer_cache.put(user_input, answer, recorded_calls)
+    return answer
+
+
+def run_tool_turn(messages):
+    """Let the model pick tool calls, run them and return (answer, recorded tool calls)."""
+    # Call the LLM API to get the assistant's response
+    response = client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        tools=tools,
+        tool_choice="auto",
+        max_tokens=4096
     )
 
-    # Update the messages list with the new system content
-    messages = [
-        {
-            "role": "system",
-            "content": system_content
+    response_message = response.choices[0].message
+    messages.append(response_message)  # Append the assistant's response to the messages
+    # Print the messages for debugging
+    # print("\n[DEBUG] Conversation Messages:")
+    # for msg in messages:
+    #     print(msg)
+
+    tool_calls = response_message.tool_calls
+    logger.debug("Tool calls: %s", tool_calls)
+
+    if not tool_calls:
+        # No tool call; just return the assistant's response
+        return response_message.content, []
+
+    recorded_calls = []
+    for tool_call in tool_calls:
+        function_name = tool_call.function.name
+        function_to_call = available_functions[function_name]
+        function_args = json.loads(tool_call.function.arguments)
+
+        # Call the function with the provided arguments
+        function_response = function_to_call(**function_args)
+        recorded_calls.append({"name": function_name, "arguments": function_args,
+                               "failed": is_error_result(function_response)})
+
+        # Serialize the function response to a JSON string
+        tool_response_message = {
+            "tool_call_id": tool_call.id,
+            "role": "tool",
+            "name": function_name,
+            "content": json.dumps(function_response),
         }
+        messages.append(tool_response_message)
+
+    return final_completion(messages), recorded_calls
+
+
+def run_planned_turn(messages):
+    """
+    Ask the model for a whole plan of tool calls, execute it as a DAG and answer
+    with a single final completion (two LLM round-trips however many steps).
+    """
+    planner_message = {"role": "system", "content": plan_executor.get_instructions(tools)}
+    response = client.chat.completions.create(
+        model=MODEL,
+        messages=messages + [planner_message],
+        response_format={"type": "json_object"},
+        max_tokens=2048
+    )
+
+    try:
+        plan = plan_executor.parse_plan(response.choices[0].message.content)
+    except PlanError as e:
+        logger.debug("Invalid plan (%s), falling back to single-round tool calls", e)
+        return run_tool_turn(messages)
+
+    logger.debug("Plan: %s", plan["steps"])
+
+    if not plan["steps"]:
+        answer = plan["reply"] or final_completion(messages)
+        if plan["reply"]:
+            messages.append({"role": "assistant", "content": answer})
+        return answer, []
+
+    outcomes = plan_executor.execute(plan["steps"])
+
+    # Record the executed plan as regular tool calls so the history stays valid for the model
+    messages.append({
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [
+            {
+                "id": step_id,
+                "type": "function",
+                "function": {"name": outcome["tool"], "arguments": json.dumps(outcome["arguments"])}
+            }
+            for step_id, outcome in outcomes.items()
+        ]
+    })
+    for step_id, outcome in outcomes.items():
+        messages.append({
+            "tool_call_id": step_id,
+            "role": "tool",
+            "name": outcome["tool"],
+            "content": json.dumps(outcome["result"]),
+        })
+
+    recorded_calls = [
+        {"name": outcome["tool"], "arguments": outcome["arguments"], "failed": is_error_result(outcome["result"])}
+        for outcome in outcomes.values()
     ]
+    return final_completion(messages), recorded_calls
+
+
+def final_completion(messages):
+    """Send the conversation with tool responses back to the model and return its answer."""
+    second_response = client.chat.completions.create(
+        model=MODEL,
+        messages=messages
+    )
+    second_response_message = second_response.choices[0].message
+    messages.append(second_response_message)
+
+    return second_response_message.content
+
+
+# Function to handle the LLM conversation
+def run_conversation(record_path=None):
+    if record_path:
+        enable_tool_call_recording(record_path)
+
+    messages = new_conversation()
 
     while True:
         user_input = input("User: ")
@@ -482,65 +732,9 @@ def run_conversation():
             print("Exiting the conversation.")
             break
 
-        messages.append({
-            "role": "user",
-            "content": user_input
-        })
-
-        # Call the LLM API to get the assistant's response
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=messages,
-            tools=tools,
-            tool_choice="auto",
-            max_tokens=4096
-        )
-
-        response_message = response.choices[0].message
-        messages.append(response_message)  # Append the assistant's response to the messages
-        # Print the messages for debugging
-        # print("\n[DEBUG] Conversation Messages:")
-        # for msg in messages:
-        #     print(msg)
-
-        tool_calls = response_message.tool_calls
-        print("\n[DEBUG] Tool Calls:")
-        print(tool_calls)
-
-
-        if tool_calls:
-            for tool_call in tool_calls:
-                function_name = tool_call.function.name
-                function_to_call = available_functions[function_name]
-                function_args = json.loads(tool_call.function.arguments)
-
-                # Call the function with the provided arguments
-                function_response = function_to_call(**function_args)
-
-                # Serialize the function response to a JSON string
-                tool_response_message = {
-                    "tool_call_id": tool_call.id,
-                    "role": "tool",
-                    "name": function_name,
-                    "content": json.dumps(function_response),
-                }
-                messages.append(tool_response_message)
-
-            # Send the updated conversation with tool response back to the model
-            second_response = client.chat.completions.create(
-                model=MODEL,
-                messages=messages
-            )
-            second_response_message = second_response.choices[0].message
-            messages.append(second_response_message)
-
-            print("Assistant:", second_response_message.content)
-        else:
-            # No tool call; just print the assistant's response
-            print("Assistant:", response_message.content)
+        print("Assistant:", process_user_message(messages, user_input))
 
 
 if __name__ == "__main__":
     print("Start chatting with the assistant (type 'exit' or 'quit' to stop):")
     run_conversation()
-
@@ -0,0 +1,197 @@
+# projectfiles_server.py
+#
+# Multi-session asyncio server for the data analysis assistant. All sessions share
+# the datasets and tool instances loaded once by projectfiles_main; each session
+# keeps its own message history.
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web, WSMsgType
+
+from projectfiles_main import new_conversation, process_user_message
+
+
+class ServerBusyError(Exception):
+    """Raised when admission control rejects a request."""
+
+
+class Session:
+    """A single user's conversation state."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.messages = new_conversation()
+        self.lock = asyncio.Lock()  # One turn at a time per session
+        self.last_active = time.monotonic()
+
+
+class ConversationServer:
+    """Serves many concurrent conversations from one process."""
+
+    def __init__(self, max_workers: int = 8, max_queued: int = 32, max_sessions: int = 500,
+                 session_ttl: float = 3600.0):
+        """
+        Initialize the server.
+
+        Args:
+            max_workers: Number of turns processed concurrently in the executor
+            max_queued: Number of turns allowed to wait for a worker before rejecting new ones
+            max_sessions: Maximum number of live sessions
+            session_ttl: Seconds of inactivity after which a session is dropped
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="conversation")
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.sessions = {}
+        self._slots = asyncio.Semaphore(max_workers)
+        self._waiting = 0
+
+    def create_session(self) -> Session:
+        """Create a new session, evicting idle ones first if the server is full."""
+        if len(self.sessions) >= self.max_sessions:
+            self.expire_sessions()
+        if len(self.sessions) >= self.max_sessions:
+            raise ServerBusyError("Too many active sessions")
+        session = Session(uuid.uuid4().hex)
+        self.sessions[session.session_id] = session
+        return session
+
+    def expire_sessions(self):
+        """Drop sessions that have been idle longer than the TTL."""
+        now = time.monotonic()
+        for session_id, session in list(self.sessions.items()):
+            if now - session.last_active > self.session_ttl and not session.lock.locked():
+                del self.sessions[session_id]
+
+    async def handle_turn(self, session: Session, user_input: str) -> str:
+        """Run one conversation turn in the executor, subject to admission control."""
+        if self._waiting >= self.max_workers + self.max_queued:
+            raise ServerBusyError("Server is at capacity, please retry shortly")
+
+        self._waiting += 1
+        try:
+            async with session.lock, self._slots:
+                session.last_active = time.monotonic()
+                loop = asyncio.get_running_loop()
+                start = len(session.messages)
+                # LLM calls and tool work block, so they run off the event loop
+                try:
+                    reply = await loop.run_in_executor(
+                        self.executor, process_user_message, session.messages, user_input
+                    )
+                except Exception:
+                    # A failed turn can leave its user message and unanswered tool calls in the
+                    # history, which the API would reject on every later turn of the session
+                    del session.messages[start:]
+                    raise
+                session.last_active = time.monotonic()
+                return reply
+        finally:
+            self._waiting -= 1
+
+    # HTTP handlers
+
+    async def post_session(self, request: web.Request) -> web.Response:
+        try:
+            session = self.create_session()
+        except ServerBusyError as e:
+            return web.json_response({"error": str(e)}, status=503)
+        return web.json_response({"session_id": session.session_id}, status=201)
+
+    async def delete_session(self, request: web.Request) -> web.Response:
+        self.sessions.pop(request.match_info["session_id"], None)
+        return web.Response(status=204)
+
+    async def post_message(self, request: web.Request) -> web.Response:
+        session = self.sessions.get(request.match_info["session_id"])
+        if session is None:
+            return web.json_response({"error": "Unknown session"}, status=404)
+
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            return web.json_response({"error": "Request body must be valid JSON"}, status=400)
+        if not isinstance(body, dict):
+            return web.json_response({"error": "Request body must be a JSON object"}, status=400)
+
+        content = body.get("content")
+        if not content or not isinstance(content, str):
+            return web.json_response({"error": "Field 'content' is required"}, status=400)
+
+        try:
+            reply = await self.handle_turn(session, content)
+        except ServerBusyError as e:
+            return web.json_response({"error": str(e)}, status=503)
+        except Exception as e:
+            return web.json_response({"error": f"Error when running conversation: {e}"}, status=500)
+        return web.json_response({"session_id": session.session_id, "reply": reply})
+
+    async def websocket(self, request: web.Request) -> web.WebSocketResponse:
+        """Each text frame is a user message; each reply is sent back as a JSON frame."""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        session = self.sessions.get(request.query.get("session_id", ""))
+        if session is None:
+            try:
+                session = self.create_session()
+            except ServerBusyError as e:
+                await ws.send_json({"error": str(e)})
+                await ws.close()
+                return ws
+        await ws.send_json({"session_id": session.session_id})
+
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            try:
+                reply = await self.handle_turn(session, msg.data)
+                await ws.send_json({"reply": reply})
+            except Exception as e:
+                await ws.send_json({"error": str(e)})
+        return ws
+
+    async def _expire_loop(self, app: web.Application):
+        while True:
+            await asyncio.sleep(60)
+            self.expire_sessions()
+
+    async def _on_startup(self, app: web.Application):
+        app["expire_task"] = asyncio.create_task(self._expire_loop(app))
+
+    async def _on_cleanup(self, app: web.Application):
+        app["expire_task"].cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.post("/sessions", self.post_session),
+            web.delete("/sessions/{session_id}", self.delete_session),
+            web.post("/sessions/{session_id}/messages", self.post_message),
+            web.get("/ws", self.websocket),
+        ])
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the data analysis assistant over HTTP/WebSocket.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent conversation turns")
+    parser.add_argument("--max-queued", type=int, default=32, help="Turns allowed to wait before rejecting")
+    parser.add_argument("--max-sessions", type=int, default=500)
+    parser.add_argument("--session-ttl", type=float, default=3600.0, help="Idle seconds before a session expires")
+    args = parser.parse_args()
+
+    server = ConversationServer(args.workers, args.max_queued, args.max_sessions, args.session_ttl)
+    web.run_app(server.build_app(), host=args.host, port=args.port)
@@ -0,0 +1,182 @@
+# tools/answer_cache.py
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import List, Optional
+
+DEFAULT_CACHE_PATH = os.path.join("Cache", "answer_cache.sqlite3")
+
+# Entity names canonicalized to a single token so differently worded questions share a key
+COUNTRY_ALIASES = {
+    "albania": "AL", "austria": "AT", "belgium": "BE", "bosnia and herzegovina": "BA",
+    "bulgaria": "BG", "switzerland": "CH", "cyprus": "CY", "czech republic": "CZ", "czechia": "CZ",
+    "germany": "DE", "denmark": "DK", "estonia": "EE", "greece": "GR", "spain": "ES",
+    "finland": "FI", "france": "FR", "croatia": "HR", "hungary": "HU", "ireland": "IE",
+    "italy": "IT", "lithuania": "LT", "luxembourg": "LU", "latvia": "LV", "moldova": "MD",
+    "montenegro": "ME", "macedonia": "MK", "north macedonia": "MK", "malta": "MT",
+    "netherlands": "NL", "holland": "NL", "norway": "NO", "poland": "PL", "portugal": "PT",
+    "romania": "RO", "serbia": "RS", "sweden": "SE", "slovenia": "SI", "slovakia": "SK",
+    "united kingdom": "GB", "great britain": "GB", "britain": "GB", "uk": "GB",
+    "united states": "US", "usa": "US", "america": "US", "canada": "CA", "china": "CN",
+    "india": "IN", "brazil": "BR", "bolivia": "BO", "japan": "JP", "australia": "AU",
+}
+
+US_STATE_ALIASES = {
+    "alabama": "AL", "alaska": "AK", "arizona": "AZ", "arkansas": "AR", "california": "CA",
+    "colorado": "CO", "connecticut": "CT", "delaware": "DE", "florida": "FL", "georgia": "GA",
+    "hawaii": "HI", "idaho": "ID", "illinois": "IL", "indiana": "IN", "iowa": "IA",
+    "kansas": "KS", "kentucky": "KY", "louisiana": "LA", "maine": "ME", "maryland": "MD",
+    "massachusetts": "MA", "michigan": "MI", "minnesota": "MN", "mississippi": "MS",
+    "missouri": "MO", "montana": "MT", "nebraska": "NE", "nevada": "NV", "new hampshire": "NH",
+    "new jersey": "NJ", "new mexico": "NM", "new york": "NY", "north carolina": "NC",
+    "north dakota": "ND", "ohio": "OH", "oklahoma": "OK", "oregon": "OR", "pennsylvania": "PA",
+    "rhode island": "RI", "south carolina": "SC", "south dakota": "SD", "tennessee": "TN",
+    "texas": "TX", "utah": "UT", "vermont": "VT", "virginia": "VA", "washington": "WA",
+    "west virginia": "WV", "wisconsin": "WI", "wyoming": "WY",
+}
+
+# Filler words that do not change the meaning of a question
+FILLER_WORDS = {"please", "the", "a", "an", "me", "can", "could", "would", "you", "tell", "show", "give",
+                "what", "which", "is", "was", "are", "were"}
+
+# Words that make a question depend on earlier turns, so its answer can't be reused elsewhere
+FOLLOW_UP_WORDS = {"it", "its", "that", "those", "these", "them", "they", "this", "same", "also",
+                   "previous", "above", "again", "instead", "there", "other", "else"}
+
+MIN_CACHEABLE_WORDS = 4
+
+
+def _build_entity_pattern():
+    entities = {}
+    for name, code in COUNTRY_ALIASES.items():
+        entities[name] = f"country_{code.lower()}"
+    for name, code in US_STATE_ALIASES.items():
+        # "georgia" and "washington" are ambiguous; the state reading wins only if no country claims the name
+        entities.setdefault(name, f"state_{code.lower()}")
+    # Longest names first so "west virginia" is matched before "virginia"
+    names = sorted(entities, key=len, reverse=True)
+    pattern = re.compile(r"\b(" + "|".join(re.escape(name) for name in names) + r")\b")
+    return pattern, entities
+
+
+_ENTITY_PATTERN, _ENTITY_TOKENS = _build_entity_pattern()
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a natural-language question into a cache key.
+
+    Lowercases, strips accents and punctuation, collapses whitespace, drops filler
+    words and replaces country/state names with canonical tokens, so
+    "Compare Germany's wind power!" and "compare germany wind power" share a key.
+    """
+    text = unicodedata.normalize("NFKD", question).encode("ascii", "ignore").decode().lower()
+    text = re.sub(r"'s\b", "", text)
+    text = re.sub(r"[^a-z0-9.\s]|(?<!\d)\.|\.(?!\d)", " ", text)
+    text = " ".join(text.split())
+    text = _ENTITY_PATTERN.sub(lambda match: _ENTITY_TOKENS[match.group(1)], text)
+    return " ".join(word for word in text.split() if word not in FILLER_WORDS)
+
+
+def is_standalone_question(question: str) -> bool:
+    """Check whether a question can be answered without the rest of the conversation."""
+    if question.strip().lower().startswith(("and ", "what about", "how about")):
+        return False
+    words = normalize_question(question).split()
+    if len(words) < MIN_CACHEABLE_WORDS:
+        return False
+    return not any(word in FOLLOW_UP_WORDS for word in words)
+
+
+def is_error_result(result) -> bool:
+    """Tools report failures (bad arguments, rejected queries, ...) as a dict with an 'error' key."""
+    return isinstance(result, dict) and "error" in result
+
+
+class AnswerCache:
+    """
+    Persistent cache of final answers to standalone questions.
+
+    Entries are keyed on the normalized question and tagged with the dataset
+    version they were computed from; entries from any other version are ignored
+    and purged, so reloading changed datasets invalidates them.
+    """
+
+    def __init__(self, dataset_version: str, path: str = DEFAULT_CACHE_PATH, max_entries: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            dataset_version: Version string of the loaded datasets (see dataset_version.combined_version)
+            path: SQLite file used to persist the cache across restarts
+            max_entries: Oldest entries beyond this count are evicted
+        """
+        self.dataset_version = dataset_version
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "question_key TEXT PRIMARY KEY, dataset_version TEXT, question TEXT, "
+                "tool_calls TEXT, answer TEXT, hits INTEGER DEFAULT 0, created REAL)"
+            )
+            self._conn.execute("DELETE FROM answers WHERE dataset_version != ?", (dataset_version,))
+
+    def get(self, question: str) -> Optional[dict]:
+        """Return the cached {'answer', 'tool_calls'} for a question, or None."""
+        if not is_standalone_question(question):
+            return None
+
+        key = normalize_question(question)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT tool_calls, answer FROM answers WHERE question_key = ? AND dataset_version = ?",
+                (key, self.dataset_version),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE answers SET hits = hits + 1 WHERE question_key = ?", (key,))
+
+        return {"tool_calls": json.loads(row[0]), "answer": row[1]}
+
+    def put(self, question: str, answer: str, tool_calls: List[dict]):
+        """
+        Store the final answer and the tool calls that produced it.
+
+        Only standalone questions answered with at least one tool call are stored;
+        chit-chat and clarifying replies are not worth reusing. Turns in which a tool
+        call failed (marked "failed": True) are not stored either, so an apology for
+        the failure isn't replayed to later askers.
+        """
+        if not answer or not tool_calls or not is_standalone_question(question):
+            return
+        if any(call.get("failed") for call in tool_calls):
+            return
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (question_key, dataset_version, question, tool_calls, answer, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_question(question), self.dataset_version, question,
+                 json.dumps(tool_calls), answer, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM answers WHERE question_key NOT IN "
+                "(SELECT question_key FROM answers ORDER BY created DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM answers")
@@ -0,0 +1,261 @@
+# tools/code_cache.py
+
+import ast
+import builtins
+import collections
+import math
+import os
+import re
+import sqlite3
+import statistics
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from Tools.answer_cache import normalize_question
+
+DEFAULT_CODE_CACHE_PATH = os.path.join("Cache", "generated_code.sqlite3")
+
+# Modules generated code may import when re-executed from the cache
+ALLOWED_IMPORTS = {"pandas", "numpy", "math", "statistics", "datetime", "re", "collections", "json"}
+
+# Modules generated code sees without importing them: name -> module
+PRELOADED_MODULES = {"pd": "pandas", "np": "numpy"}
+
+# Analysis API reachable as module.attribute; anything else on a module (pd.io,
+# pd.read_csv, np.load, statistics.sys, ...) is rejected
+MODULE_API = {
+    "pandas": {"DataFrame", "Series", "Index", "MultiIndex", "DatetimeIndex", "PeriodIndex", "IntervalIndex",
+               "Categorical", "Timestamp", "Timedelta", "Period", "Interval", "NaT", "NA", "Grouper",
+               "to_datetime", "to_numeric", "to_timedelta", "date_range", "period_range", "timedelta_range",
+               "interval_range", "concat", "merge", "merge_asof", "pivot", "pivot_table", "crosstab", "melt",
+               "wide_to_long", "get_dummies", "cut", "qcut", "factorize", "unique", "isna", "isnull", "notna",
+               "notnull"},
+    "numpy": {"array", "asarray", "arange", "linspace", "zeros", "ones", "full", "empty", "nan", "inf", "pi", "e",
+              "newaxis", "where", "select", "clip", "round", "abs", "absolute", "sign", "sqrt", "exp", "log",
+              "log10", "log2", "log1p", "power", "sin", "cos", "tan", "arcsin", "arccos", "arctan", "arctan2",
+              "radians", "degrees", "deg2rad", "rad2deg", "floor", "ceil", "sum", "nansum", "mean", "nanmean",
+              "median", "nanmedian", "std", "nanstd", "var", "nanvar", "min", "max", "nanmin", "nanmax",
+              "minimum", "maximum", "fmin", "fmax", "argmin", "argmax", "nanargmin", "nanargmax", "percentile",
+              "nanpercentile", "quantile", "nanquantile", "cumsum", "cumprod", "diff", "prod", "average",
+              "corrcoef", "cov", "polyfit", "histogram", "bincount", "digitize", "unique", "sort", "argsort",
+              "isnan", "isfinite", "isin", "any", "all", "count_nonzero", "concatenate", "stack", "vstack",
+              "hstack", "column_stack", "reshape", "ravel", "transpose", "dot", "matmul", "int32", "int64",
+              "float32", "float64", "bool_", "datetime64", "timedelta64"},
+    "math": {name for name in dir(math) if not name.startswith("_")},
+    "statistics": set(statistics.__all__),
+    "datetime": {"datetime", "date", "time", "timedelta", "timezone"},
+    "re": set(re.__all__) - {"purge", "template"},
+    "collections": set(collections.__all__),
+    "json": {"dumps", "loads"},
+}
+
+# Attributes rejected on any object: file and interpreter access, expression
+# evaluation, plotting, and frame/generator internals that lead back to module globals
+BLOCKED_ATTRIBUTES = {"io", "os", "sys", "eval", "plot", "style", "savefig", "tofile", "dump", "load", "save",
+                      "gi_frame", "gi_code", "cr_frame", "cr_code", "ag_frame", "ag_code", "tb_frame", "tb_next",
+                      "f_back", "f_globals", "f_locals", "f_builtins", "f_code"}
+
+# to_* conversions that return data; every other read_*/to_* reads or writes files
+ALLOWED_CONVERSIONS = {"to_datetime", "to_numeric", "to_timedelta", "to_dict", "to_list", "to_numpy", "to_frame",
+                       "to_period", "to_timestamp", "to_pydatetime", "to_records", "to_series", "to_flat_index"}
+
+# Renderers that write to a file when given a target, so they may only be called without one
+RENDERERS = {"to_string", "to_json", "to_markdown", "to_html", "to_latex"}
+
+# query() arguments that change how, or with which names, the expression is evaluated
+BLOCKED_QUERY_KEYWORDS = {"engine", "parser", "local_dict", "global_dict", "resolvers", "level"}
+
+# Builtins that give access to the filesystem, the interpreter or arbitrary attributes
+BLOCKED_BUILTINS = {"open", "exec", "eval", "compile", "input", "breakpoint", "help", "exit", "quit",
+                    "globals", "locals", "vars", "getattr", "setattr", "delattr", "memoryview"}
+
+# Maximum number of rows returned when cached code produces a DataFrame
+MAX_RESULT_ROWS = 100
+
+
+class UnsafeCodeError(ValueError):
+    """Raised when cached code uses constructs the sandbox does not allow."""
+
+
+def _restricted_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level != 0 or name not in ALLOWED_IMPORTS:
+        raise ImportError(f"Import of '{name}' is not allowed in cached code")
+    return builtins.__import__(name, globals, locals, fromlist, level)
+
+
+SAFE_BUILTINS = {name: value for name, value in vars(builtins).items() if name not in BLOCKED_BUILTINS}
+SAFE_BUILTINS["__import__"] = _restricted_import
+
+
+def _module_names(tree: ast.AST) -> Dict[str, str]:
+    """Names bound to modules in the code (imports plus PRELOADED_MODULES): name -> module."""
+    modules = dict(PRELOADED_MODULES)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.name not in ALLOWED_IMPORTS:
+                    raise UnsafeCodeError(f"Import of '{alias.name}' is not allowed")
+                modules[alias.asname or alias.name] = alias.name
+        elif isinstance(node, ast.ImportFrom):
+            if node.level or node.module not in ALLOWED_IMPORTS:
+                raise UnsafeCodeError(f"Import of '{node.module}' is not allowed")
+            for alias in node.names:
+                if alias.name not in MODULE_API[node.module]:
+                    raise UnsafeCodeError(f"Import of '{node.module}.{alias.name}' is not allowed")
+    return modules
+
+
+def _check_attribute(name: str, call: Optional[ast.Call]):
+    """Reject attributes outside the analysis API; call is the call the attribute is the target of, if any."""
+    if name.startswith("_") or name in BLOCKED_ATTRIBUTES:
+        raise UnsafeCodeError(f"Access to '{name}' is not allowed")
+    if name in RENDERERS:
+        if call is None or call.args or any(k.arg in (None, "buf", "path_or_buf") for k in call.keywords):
+            raise UnsafeCodeError(f"'{name}' may only be called without an output target")
+    elif name.startswith(("read_", "to_")) and name not in ALLOWED_CONVERSIONS:
+        raise UnsafeCodeError(f"Access to '{name}' is not allowed")
+
+
+def _check_query(call: ast.Call, modules: Dict[str, str]):
+    """A query() expression is evaluated by pandas, so it is validated like the code around it."""
+    if any(k.arg in BLOCKED_QUERY_KEYWORDS or k.arg is None for k in call.keywords):
+        raise UnsafeCodeError("query() may not set its engine or evaluation namespace")
+    if not call.args or not isinstance(call.args[0], ast.Constant) or not isinstance(call.args[0].value, str):
+        raise UnsafeCodeError("query() expressions must be string literals")
+    # Backquoted column names aren't Python; '@name' refers to a variable of the code
+    expression = re.sub(r"`[^`]*`", "_column", call.args[0].value).replace("@", "")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError:
+        raise UnsafeCodeError("query() expression could not be validated")
+    _check_tree(tree, modules)
+
+
+def _check_tree(tree: ast.AST, modules: Dict[str, str]):
+    calls = {id(node.func): node for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    module_attributes = {id(node.value) for node in ast.walk(tree)
+                         if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if node.id.startswith("__"):
+                raise UnsafeCodeError(f"Access to '{node.id}' is not allowed")
+            # Modules can't be passed around or rebound, so every use of one is checked below
+            if node.id in modules and id(node) not in module_attributes:
+                raise UnsafeCodeError(f"Module '{node.id}' may only be used as {node.id}.<function>")
+        elif isinstance(node, ast.Attribute):
+            _check_attribute(node.attr, calls.get(id(node)))
+            if isinstance(node.value, ast.Name) and node.value.id in modules:
+                module = modules[node.value.id]
+                if node.attr not in MODULE_API[module]:
+                    raise UnsafeCodeError(f"'{module}.{node.attr}' is not allowed")
+            if node.attr == "query":
+                if id(node) not in calls:
+                    raise UnsafeCodeError("query() may only be called directly")
+                _check_query(calls[id(node)], modules)
+
+
+def validate_generated_code(code: str):
+    """
+    Reject code that reaches beyond the analysis API.
+
+    Imports are limited to ALLOWED_IMPORTS, modules may only be used as
+    module.<function in MODULE_API>, and file readers/writers, expression
+    evaluation and private or dunder attributes are rejected on any object.
+    """
+    tree = ast.parse(code)
+    _check_tree(tree, _module_names(tree))
+    return tree
+
+
+def execute_generated_code(code: str, df: pd.DataFrame):
+    """
+    Re-execute PandasAI-generated code against a DataFrame without any LLM call.
+
+    The code runs with a restricted set of builtins and imports, sees the data as
+    ``dfs[0]`` (as PandasAI provides it) and must assign ``result = {"type": ..., "value": ...}``.
+    """
+    tree = validate_generated_code(code)
+    # A shallow copy keeps column additions made by the code out of the shared dataset
+    namespace = {"__builtins__": SAFE_BUILTINS, "dfs": [df.copy(deep=False)], "pd": pd, "np": np}
+    exec(compile(tree, "<cached-pandasai-code>", "exec"), namespace)
+
+    result = namespace.get("result")
+    if not isinstance(result, dict) or "value" not in result:
+        raise ValueError("Cached code did not produce a result")
+
+    return to_plain_result(result["value"])
+
+
+def to_plain_result(value):
+    """Convert an analysis result into plain, JSON- and pickle-friendly Python values."""
+    # PandasAI wraps DataFrame results in its own SmartDataframe type
+    if not isinstance(value, (pd.DataFrame, pd.Series)):
+        value = getattr(value, "dataframe", value)
+    if isinstance(value, pd.DataFrame):
+        return value.head(MAX_RESULT_ROWS).to_dict(orient="records")
+    if isinstance(value, pd.Series):
+        return value.head(MAX_RESULT_ROWS).to_dict()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class GeneratedCodeCache:
+    """
+    Persistent store of PandasAI-generated code per (dataset, normalized question).
+
+    Each entry records the schema hash of the dataset it was generated for, so code
+    is only reused while the dataset's columns and dtypes are unchanged.
+    """
+
+    def __init__(self, path: str = DEFAULT_CODE_CACHE_PATH):
+        """Initialize with the SQLite file used to persist generated code."""
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS generated_code ("
+                "dataset TEXT, question_key TEXT, schema_hash TEXT, code TEXT, hits INTEGER DEFAULT 0, "
+                "created REAL, PRIMARY KEY (dataset, question_key))"
+            )
+
+    def get(self, dataset_name: str, question: str, schema_hash: str) -> Optional[str]:
+        """Return cached code for a question, or None if absent or generated for another schema."""
+        key = normalize_question(question)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT code FROM generated_code WHERE dataset = ? AND question_key = ? AND schema_hash = ?",
+                (dataset_name, key, schema_hash),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE generated_code SET hits = hits + 1 WHERE dataset = ? AND question_key = ?",
+                (dataset_name, key),
+            )
+        return row[0]
+
+    def put(self, dataset_name: str, question: str, schema_hash: str, code: str):
+        """Store the code PandasAI generated for a question."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO generated_code (dataset, question_key, schema_hash, code, created) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (dataset_name, normalize_question(question), schema_hash, code, time.time()),
+            )
+
+    def delete(self, dataset_name: str, question: str):
+        """Drop the entry for a question, e.g. after its code failed to re-execute."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM generated_code WHERE dataset = ? AND question_key = ?",
+                (dataset_name, normalize_question(question)),
+            )
@@ -0,0 +1,83 @@
+# tools/dataset_version.py
+
+import hashlib
+import threading
+from typing import Callable, Dict, Hashable
+
+import numpy as np
+import pandas as pd
+
+# Number of evenly spaced rows hashed per fingerprint
+SAMPLE_ROWS = 1024
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Return a cheap version string for a DataFrame.
+
+    Hashes the shape, column names, dtypes and an evenly spaced sample of rows
+    (always including the first and last), so a reloaded or edited dataset gets
+    a new version without hashing millions of rows.
+    """
+    digest = hashlib.sha1()
+    digest.update(repr(df.shape).encode())
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+
+    if len(df):
+        positions = np.unique(np.linspace(0, len(df) - 1, num=min(len(df), SAMPLE_ROWS)).astype(int))
+        sample_hash = pd.util.hash_pandas_object(df.iloc[positions], index=False).values
+        digest.update(sample_hash.tobytes())
+
+    return digest.hexdigest()[:16]
+
+
+def schema_fingerprint(df: pd.DataFrame) -> str:
+    """Return a version string covering only the column names and dtypes of a DataFrame."""
+    schema = repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()])
+    return hashlib.sha1(schema.encode()).hexdigest()[:16]
+
+
+def combined_version(datasets: Dict[str, pd.DataFrame]) -> str:
+    """Return one version string covering every dataset in a name -> DataFrame dict."""
+    digest = hashlib.sha1()
+    for name in sorted(datasets):
+        digest.update(f"{name}:{dataset_fingerprint(datasets[name])};".encode())
+    return digest.hexdigest()[:16]
+
+
+class DerivedCache:
+    """
+    Structures precomputed from DataFrames (tables, indexes, statistics), kept per
+    DataFrame and dropped when its fingerprint changes.
+
+    The fingerprint is only recomputed when a DataFrame's shape differs from the
+    last call, so lookups on unchanged data cost a dict access.
+    """
+
+    def __init__(self):
+        self._entries = {}  # id(df) -> (shape, version, {name: structure})
+        # Re-entrant: a builder may look up other structures of the same cache
+        self._lock = threading.RLock()
+
+    def _entry(self, df: pd.DataFrame):
+        shape, version, structures = self._entries.get(id(df), (None, None, {}))
+        if shape != df.shape:
+            new_version = dataset_fingerprint(df)
+            if new_version != version:
+                structures = {}
+            shape, version = df.shape, new_version
+            self._entries[id(df)] = (shape, version, structures)
+        return version, structures
+
+    def version(self, df: pd.DataFrame) -> str:
+        """Current version string of df."""
+        with self._lock:
+            return self._entry(df)[0]
+
+    def get(self, df: pd.DataFrame, name: Hashable, build: Callable[[pd.DataFrame], object]):
+        """Return the structure called name built from df, building it on first use."""
+        with self._lock:
+            _, structures = self._entry(df)
+            if name not in structures:
+                structures[name] = build(df)
+            return structures[name]
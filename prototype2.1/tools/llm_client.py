@@ -0,0 +1,132 @@
+# tools/llm_client.py
+
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Optional
+
+import httpx
+
+DEFAULT_LOCAL_BASE_URL = "http://localhost:8000/v1"
+
+# HTTP status codes worth retrying: timeouts, conflicts, rate limits and transient server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMClient:
+    """
+    Shared chat-completion client used by every conversation loop.
+
+    Wraps either the Groq SDK or any OpenAI-compatible server (e.g. a local
+    stand-in for offline load tests) behind one pooled HTTP client, with request
+    timeouts, bounded retries with jittered exponential backoff and a limit on
+    the number of in-flight requests. It exposes ``client.chat.completions.create``
+    so it can be dropped in wherever a ``Groq`` client was used.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, backend: str = "groq", base_url: Optional[str] = None,
+                 model: Optional[str] = None, timeout: float = 60.0, connect_timeout: float = 10.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 max_concurrency: int = 8, max_connections: int = 20):
+        """
+        Initialize the client.
+
+        Args:
+            api_key: API key for the backend (optional for local servers)
+            backend: 'groq' or 'local' (any OpenAI-compatible endpoint)
+            base_url: Endpoint URL, required to reach a non-default server
+            model: If set, overrides the model requested by callers
+            timeout: Per-request timeout in seconds
+            connect_timeout: Timeout for establishing a connection
+            max_retries: Number of retries after the first attempt
+            backoff_base: Base delay in seconds for exponential backoff
+            backoff_max: Upper bound on a single backoff delay
+            max_concurrency: Maximum number of requests in flight at once
+            max_connections: Size of the HTTP connection pool
+        """
+        self.backend = backend
+        self.model = model
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+        self.http_client = httpx.Client(
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+        )
+
+        # Retries are handled here, so the SDKs' own retry loops are disabled
+        if backend == "groq":
+            from groq import Groq
+            self._client = Groq(api_key=api_key, base_url=base_url, http_client=self.http_client,
+                                timeout=timeout, max_retries=0)
+        elif backend == "local":
+            from openai import OpenAI
+            self._client = OpenAI(api_key=api_key or "local", base_url=base_url or DEFAULT_LOCAL_BASE_URL,
+                                  http_client=self.http_client, timeout=timeout, max_retries=0)
+        else:
+            raise ValueError(f"Unknown LLM backend: {backend}")
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create_chat_completion))
+
+    @classmethod
+    def from_env(cls, api_key: Optional[str] = None) -> "LLMClient":
+        """
+        Build a client from LLM_* environment variables.
+
+        LLM_BACKEND selects 'groq' (default) or 'local'; LLM_BASE_URL, LLM_MODEL,
+        LLM_API_KEY, LLM_TIMEOUT, LLM_MAX_RETRIES and LLM_MAX_CONCURRENCY tune it.
+        """
+        return cls(
+            api_key=os.getenv("LLM_API_KEY") or api_key,
+            backend=os.getenv("LLM_BACKEND", "groq"),
+            base_url=os.getenv("LLM_BASE_URL"),
+            model=os.getenv("LLM_MODEL"),
+            timeout=float(os.getenv("LLM_TIMEOUT", 60.0)),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", 3)),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 8)),
+        )
+
+    def create_chat_completion(self, **kwargs):
+        """Create a chat completion, retrying transient failures with backoff."""
+        if self.model:
+            kwargs["model"] = self.model
+
+        attempt = 0
+        while True:
+            try:
+                with self._semaphore:
+                    return self._client.chat.completions.create(**kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                time.sleep(self._backoff_delay(attempt, e))
+                attempt += 1
+
+    def close(self):
+        """Close the pooled HTTP connections."""
+        self.http_client.close()
+
+    def _is_retryable(self, error: Exception) -> bool:
+        """Check whether an error is transient and worth retrying."""
+        if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+            return True
+        # Both SDKs name their connection/timeout errors the same way
+        if type(error).__name__ in ("APIConnectionError", "APITimeoutError"):
+            return True
+        return getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when the server sends it."""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
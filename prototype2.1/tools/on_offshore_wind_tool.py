@@ -1,5 +1,10 @@
-from typing import Dict
+from typing import Dict, List
 from Base_Tool.base_tool import SingleMessageTool
+from Tools.dataset_version import DerivedCache
+from Tools.region_registry import RegionRegistry, country_column_map
+from Tools.wind_correlation import CorrelationMatrix
+from Tools.wind_statistics import season_numbers
+import numpy as np
 import pandas as pd
 
 class OnOffshoreWindTool(SingleMessageTool):
@@ -8,6 +13,7 @@ class OnOffshoreWindTool(SingleMessageTool):
     def __init__(self, onoffshore_data):
         """Initialize with onshore/offshore wind power data."""
         self.onoffshore_data = onoffshore_data
+        self._derived = DerivedCache()
 
     def get_name(self) -> str:
         return "analyze_onoffshore_wind_power"
@@ -19,10 +25,15 @@ class OnOffshoreWindTool(SingleMessageTool):
     def get_params_definition(self) -> Dict[str, dict]:
         return {
             "analysis_type": {
-                "description": "Type of analysis: 'distribution', 'efficiency_comparison', 'top_producers', or 'country_detail'",
+                "description": ("Type of analysis: 'distribution', 'efficiency_comparison', 'top_producers', "
+                                "'country_detail', or 'regional_summary' (onshore and offshore capacity factors "
+                                "of a region or custom country group), or 'correlation' (onshore vs offshore "
+                                "correlation of a country, or the most and least correlated installations and the "
+                                "smoothing benefit of pooling them)"),
                 "type": "string",
                 "required": True,
-                "enum": ["distribution", "efficiency_comparison", "top_producers", "country_detail"]
+                "enum": ["distribution", "efficiency_comparison", "top_producers", "country_detail",
+                         "regional_summary", "correlation"]
             },
             "country_code": {
                 "description": "Country ISO code for specific analysis (e.g., 'DE', 'FR')",
@@ -39,10 +50,28 @@ class OnOffshoreWindTool(SingleMessageTool):
                 "description": "Number of top countries to return",
                 "type": "integer",
                 "required": False
+            },
+            "season": {
+                "description": "Season number (1-4, winter first) to restrict correlation to one season",
+                "type": "integer",
+                "required": False
+            },
+            "region": {
+                "description": ("Region for regional_summary: 'eu27', 'nordics', 'baltics', 'benelux', 'iberia', "
+                                "'british_isles', 'balkans', 'northern_europe', 'central_europe' or 'southern_europe'"),
+                "type": "string",
+                "required": False
+            },
+            "countries": {
+                "description": "Country ISO codes forming a custom region for regional_summary",
+                "type": "array",
+                "items": {"type": "string"},
+                "required": False
             }
         }
 
-    def run_impl(self, analysis_type: str, country_code: str = None, wind_type: str = None, top_n: int = 5):
+    def run_impl(self, analysis_type: str, country_code: str = None, wind_type: str = None, top_n: int = 5,
+                 region: str = None, countries: List[str] = None, season: int = None):
         """Implement the tool logic."""
         try:
             if analysis_type == "distribution":
@@ -55,11 +84,38 @@ class OnOffshoreWindTool(SingleMessageTool):
                 if not country_code:
                     raise ValueError("Country code is required for country detail analysis")
                 return self.get_country_detail(country_code)
+            elif analysis_type == "regional_summary":
+                if not region and not countries:
+                    raise ValueError("A region or a list of countries is required for regional analysis")
+                return self.summarize_region(region or countries)
+            elif analysis_type == "correlation":
+                if season and season not in [1, 2, 3, 4]:
+                    raise ValueError("Season must be between 1 and 4")
+                return self.analyze_correlation(country_code, wind_type, season, top_n or 5)
             else:
                 raise ValueError(f"Unknown analysis type: {analysis_type}")
         except Exception as e:
             raise Exception(f"Error in onshore/offshore wind analysis: {str(e)}")
 
+    def _regions(self, wind_type: str) -> RegionRegistry:
+        """Region groupings over the onshore ('ON') or offshore ('OFF') columns."""
+        return self._derived.get(
+            self.onoffshore_data, ("regions", wind_type),
+            lambda data: RegionRegistry(data, country_column_map(data, f"_{wind_type}"))
+        )
+
+    def _correlation(self, season: int = None) -> CorrelationMatrix:
+        """Correlation matrix over every onshore and offshore column, for all hours or one season."""
+        def build(data: pd.DataFrame) -> CorrelationMatrix:
+            columns = list(country_column_map(data).values())
+            values = data[columns].to_numpy(dtype=float)
+            if season:
+                seasons = self._derived.get(data, "seasons", lambda frame: season_numbers(frame['time']))
+                values = values[seasons == season]
+            return CorrelationMatrix(values, columns)
+
+        return self._derived.get(self.onoffshore_data, ("correlation", season), build)
+
     def analyze_distribution(self):
         """Analyze the distribution of onshore vs offshore wind power across countries."""
         try:
@@ -206,4 +262,71 @@ class OnOffshoreWindTool(SingleMessageTool):
             
             return result
         except Exception as e:
-            raise Exception(f"Error getting country detail: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Error getting country detail: {str(e)}")
+
+    def summarize_region(self, region):
+        """Onshore and offshore capacity factors of a region."""
+        try:
+            result = {
+                "analysis": "regional_summary",
+                "region": region if isinstance(region, str) else "custom"
+            }
+            if isinstance(region, str) and region.lower() not in self._regions("ON").regions:
+                raise ValueError(f"Unknown region: {region}")
+            for wind_type, label in (("ON", "onshore"), ("OFF", "offshore")):
+                registry = self._regions(wind_type)
+                try:
+                    series = registry.series(region)
+                except ValueError:
+                    # No member of the region has installations of this type
+                    result[f"{label}_countries"] = []
+                    continue
+                result[f"{label}_countries"] = registry.members(region)
+                result[f"{label}_capacity_factor"] = float(np.nanmean(series))
+
+            if "onshore_capacity_factor" not in result and "offshore_capacity_factor" not in result:
+                raise ValueError(f"No onshore or offshore data available for region: {region}")
+            if "onshore_capacity_factor" in result and "offshore_capacity_factor" in result:
+                result["capacity_factor_difference"] = float(
+                    result["offshore_capacity_factor"] - result["onshore_capacity_factor"]
+                )
+            return result
+        except Exception as e:
+            raise Exception(f"Error summarizing region: {str(e)}")
+
+    def analyze_correlation(self, country_code: str = None, wind_type: str = None,
+                            season: int = None, top_n: int = 5):
+        """Correlation of output between onshore and offshore installations."""
+        try:
+            matrix = self._correlation(season)
+            result = {"analysis": "correlation", "season": season}
+            if country_code:
+                onshore_col, offshore_col = f"{country_code}_ON", f"{country_code}_OFF"
+                if onshore_col not in matrix.columns or offshore_col not in matrix.columns:
+                    raise ValueError(f"Country {country_code} needs both onshore and offshore data for correlation")
+                return {
+                    **result,
+                    "country_code": country_code,
+                    "onshore_offshore": matrix.pair(onshore_col, offshore_col),
+                    "smoothing_benefit": matrix.smoothing_benefit([onshore_col, offshore_col])
+                }
+
+            names = [name for name in matrix.names if not wind_type or name.endswith(f"_{wind_type}")]
+            pairs = matrix.ranked_pairs(names)
+
+            def pair_list(rows: pd.DataFrame):
+                return [
+                    {"installations": [row["first"], row["second"]], "correlation": float(row["correlation"])}
+                    for row in rows.to_dict("records")
+                ]
+
+            return {
+                **result,
+                "wind_type": wind_type,
+                "most_correlated_pairs": pair_list(pairs.head(top_n)),
+                "least_correlated_pairs": pair_list(pairs.tail(top_n)[::-1]),
+                "average_correlation": float(pairs["correlation"].mean()),
+                "smoothing_benefit": matrix.smoothing_benefit(names)
+            }
+        except Exception as e:
+            raise Exception(f"Error analyzing correlation: {str(e)}")
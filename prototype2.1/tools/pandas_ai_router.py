@@ -1,25 +1,48 @@
 from typing import Dict
 from Base_Tool.base_tool import SingleMessageTool
+from Tools.dataset_version import dataset_fingerprint, schema_fingerprint
+from Tools.code_cache import (GeneratedCodeCache, DEFAULT_CODE_CACHE_PATH, UnsafeCodeError, execute_generated_code,
+                              to_plain_result, validate_generated_code)
+from Tools.sandbox_pool import SandboxPool, SandboxError
+from Tools.summary_views import SUMMARY_VIEWS
 from pandasai import SmartDataframe
 from dotenv import load_dotenv
 import os
+import threading
 
 load_dotenv()
 
 PANDASAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
+
+def _answer_in_worker(router, dataset_name: str, question: str):
+    """Entry point for query_dataset work executed inside a sandbox worker."""
+    return router.answer_question(dataset_name, question)
+
+
 class PandasAIRouter(SingleMessageTool):
     """General purpose tool that can answer detailed questions about any dataset using PandasAI."""
 
-    def __init__(self, datasets_dict):
+    def __init__(self, datasets_dict, code_cache_path: str = DEFAULT_CODE_CACHE_PATH,
+                 summary_views: bool = True, sandbox_workers: int = 0, sandbox_cpu_seconds: int = 60,
+                 sandbox_memory_mb: int = 2048, sandbox_timeout: float = 120.0):
         """
         Initialize with a dictionary of datasets.
         
         Args:
             datasets_dict: Dictionary mapping dataset names to their pandas DataFrames
                          e.g., {"weather_data": weather_df, "fuel_data": fuel_df}
+            code_cache_path: SQLite file for reusing generated code across questions
+                             and restarts (None disables the cache)
+            summary_views: Also expose pre-aggregated summary tables (see summary_views.py)
+            sandbox_workers: If > 0, questions run in this many pre-forked worker processes
+                             so generated code can't freeze or exhaust the main process
+            sandbox_cpu_seconds: CPU-time budget per question in a worker
+            sandbox_memory_mb: Memory a worker may allocate on top of the shared datasets
+            sandbox_timeout: Wall-clock timeout per question in a worker
         """
         self.datasets = datasets_dict
+        self.code_cache = GeneratedCodeCache(code_cache_path) if code_cache_path else None
         self.dataset_descriptions = {
             "weather_data": "Hourly weather statistics dataset containing measurements of temperature, humidity, precipitation, wind, pressure, visibility, UV index, and soil conditions for different countries.",
             "fuel_data": "Dataset containing fuel consumption information for vehicles in Canada, including model year, make, model, and various fuel consumption metrics.",
@@ -29,9 +52,58 @@ class PandasAIRouter(SingleMessageTool):
             # Add descriptions for other datasets as needed
         }
 
+        # Pre-aggregated views over the raw datasets: name -> (source dataset, builder)
+        self.summary_views = {}
+        self._materialized_views = {}  # name -> (source version, DataFrame)
+        self._views_lock = threading.Lock()
+        if summary_views:
+            for name, (source, builder, description) in SUMMARY_VIEWS.items():
+                if source in self.datasets:
+                    self.register_summary_view(name, source, builder, description)
+
+        # Warm SmartDataframes, built lazily once per dataset: name -> (dataset version, SmartDataframe)
+        self._smart_dataframes = {}
+        self._dataset_locks = {name: threading.Lock() for name in self.get_dataset_names()}
+
+        self.sandbox_pool = None
+        if sandbox_workers > 0:
+            # Materialize the views before forking so every worker shares them
+            for name in self.summary_views:
+                self.get_dataset(name)
+            self.sandbox_pool = SandboxPool(self._prepare_worker, sandbox_workers, sandbox_cpu_seconds,
+                                            sandbox_memory_mb, sandbox_timeout)
+
     def get_name(self) -> str:
         return "query_dataset"
 
+    def register_summary_view(self, name: str, source: str, builder, description: str):
+        """
+        Expose a pre-aggregated table built from a raw dataset.
+
+        The view is materialized on first use and rebuilt only when the source
+        dataset's version changes; its description steers the model towards it.
+        """
+        self.summary_views[name] = (source, builder)
+        self.dataset_descriptions[name] = description
+
+    def get_dataset_names(self):
+        """Names of every queryable dataset, raw datasets first."""
+        return list(self.datasets) + [name for name in self.summary_views if name not in self.datasets]
+
+    def get_dataset(self, dataset_name: str):
+        """Return a raw dataset or a (possibly freshly materialized) summary view."""
+        if dataset_name in self.datasets:
+            return self.datasets[dataset_name]
+
+        source, builder = self.summary_views[dataset_name]
+        with self._views_lock:
+            source_version = dataset_fingerprint(self.datasets[source])
+            cached = self._materialized_views.get(dataset_name)
+            if cached is None or cached[0] != source_version:
+                cached = (source_version, builder(self.datasets[source]))
+                self._materialized_views[dataset_name] = cached
+        return cached[1]
+
     def get_description(self) -> str:
         return (
             "Use this tool for analyzing any dataset when the query doesn't fit the predefined functions. "
@@ -42,7 +114,7 @@ class PandasAIRouter(SingleMessageTool):
     def get_params_definition(self) -> Dict[str, dict]:
         return {
             "dataset_name": {
-                "description": "Name of the dataset to query: " + ", ".join(self.datasets.keys()),
+                "description": "Name of the dataset to query: " + ", ".join(self.get_dataset_names()),
                 "type": "string",
                 "required": True
             },
@@ -55,32 +127,127 @@ class PandasAIRouter(SingleMessageTool):
 
     def run_impl(self, dataset_name: str, question: str):
         try:
-            if dataset_name not in self.datasets:
+            if dataset_name not in self.get_dataset_names():
                 return {
-                    "error": f"Dataset '{dataset_name}' not found. Available datasets: {', '.join(self.datasets.keys())}",
+                    "error": f"Dataset '{dataset_name}' not found. Available datasets: {', '.join(self.get_dataset_names())}",
                     "note": "Please specify a valid dataset name"
                 }
 
-            # Append instruction for text-only response
-            enhanced_question = (
-                f"{question} "
-                "Provide the answer in detailed text format only, without any graphs or visualizations. "
-                "Include specific numbers and statistics where relevant."
-            )
-
-            df = SmartDataframe(
-                self.datasets[dataset_name],
-                name=dataset_name,
-                description=self.dataset_descriptions.get(dataset_name, "Dataset for analysis")
-            )
-            
-            response = df.chat(enhanced_question)
-            return {
-                "answer": response,
-                "note": f"Analysis based on {dataset_name}"
-            }
+            if self.sandbox_pool:
+                return self.sandbox_pool.run(_answer_in_worker, dataset_name, question)
+            return self.answer_question(dataset_name, question)
         except Exception as e:
             return {
                 "error": str(e),
                 "note": f"Failed to analyze {dataset_name}"
-            } 
\ No newline at end of file
+            }
+
+    def answer_question(self, dataset_name: str, question: str):
+        """Answer a question about a dataset, from the code cache or with PandasAI."""
+        # Recurring questions re-run previously generated code locally, without any LLM call
+        cached_answer = self._answer_from_code_cache(dataset_name, question)
+        if cached_answer is not None:
+            return cached_answer
+
+        # Append instruction for text-only response
+        enhanced_question = (
+            f"{question} "
+            "Provide the answer in detailed text format only, without any graphs or visualizations. "
+            "Include specific numbers and statistics where relevant."
+        )
+
+        # SmartDataframe is not safe to share between threads, so questions on one dataset are serialized
+        with self._dataset_locks.setdefault(dataset_name, threading.Lock()):
+            df = self._get_smart_dataframe(dataset_name)
+            self._start_new_conversation(df)
+            response = df.chat(enhanced_question)
+            generated_code = getattr(df, "last_code_executed", None)
+
+        if self.code_cache and generated_code and not self._is_failed_response(response):
+            self._cache_generated_code(dataset_name, question, generated_code)
+        return {
+            "answer": to_plain_result(response),
+            "note": f"Analysis based on {dataset_name}"
+        }
+
+    def _prepare_worker(self):
+        """
+        Runs once in each forked sandbox worker.
+
+        Locks, SQLite connections and warm SmartDataframes (with their HTTP clients)
+        inherited from the parent are not safe to use after a fork, so the worker
+        gets fresh ones; the datasets themselves are shared copy-on-write.
+        """
+        self.sandbox_pool = None
+        self._views_lock = threading.Lock()
+        self._dataset_locks = {name: threading.Lock() for name in self.get_dataset_names()}
+        self._smart_dataframes = {}
+        if self.code_cache:
+            self.code_cache = GeneratedCodeCache(self.code_cache.path)
+        return self
+
+    def _cache_generated_code(self, dataset_name: str, question: str, code: str):
+        """Persist generated code for reuse, unless it reaches beyond the analysis API."""
+        try:
+            validate_generated_code(code)
+        except (UnsafeCodeError, SyntaxError):
+            return
+        self.code_cache.put(dataset_name, question, schema_fingerprint(self.get_dataset(dataset_name)), code)
+
+    def _answer_from_code_cache(self, dataset_name: str, question: str):
+        """Re-execute cached code for a recurring question; returns None on a miss or failure."""
+        if not self.code_cache:
+            return None
+
+        data = self.get_dataset(dataset_name)
+        code = self.code_cache.get(dataset_name, question, schema_fingerprint(data))
+        if code is None:
+            return None
+
+        try:
+            answer = execute_generated_code(code, data)
+        except Exception:
+            # Stale or unsafe code is dropped and regenerated by PandasAI
+            self.code_cache.delete(dataset_name, question)
+            return None
+
+        return {
+            "answer": answer,
+            "note": f"Analysis based on {dataset_name} (re-executed cached analysis code)"
+        }
+
+    def _is_failed_response(self, response) -> bool:
+        """PandasAI reports failures as a plain-text apology instead of raising."""
+        return isinstance(response, str) and response.startswith("Unfortunately")
+
+    def _start_new_conversation(self, df: SmartDataframe):
+        """
+        Forget the questions asked earlier through a warm SmartDataframe.
+
+        Each SmartDataframe keeps its agent's conversation memory in its prompts, and
+        the warm one is shared by every session, so each question starts a new conversation.
+        """
+        agent = getattr(df, "_agent", None)
+        if agent is not None:
+            agent.start_new_conversation()
+
+    def _get_smart_dataframe(self, dataset_name: str) -> SmartDataframe:
+        """
+        Return the warm SmartDataframe for a dataset, building it on first use.
+
+        Must be called with the dataset's lock held. The SmartDataframe is rebuilt
+        only when the dataset's version changes (e.g. after the data is reloaded).
+        """
+        data = self.get_dataset(dataset_name)
+        version = dataset_fingerprint(data)
+        cached = self._smart_dataframes.get(dataset_name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        df = SmartDataframe(
+            data,
+            name=dataset_name,
+            description=self.dataset_descriptions.get(dataset_name, "Dataset for analysis")
+        )
+        self._smart_dataframes[dataset_name] = (version, df)
+        return df
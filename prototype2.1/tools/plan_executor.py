@@ -0,0 +1,191 @@
+# tools/plan_executor.py
+
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List
+
+# Argument strings of the form "$s1.results.0.country" are replaced by values from earlier steps
+REFERENCE_PATTERN = re.compile(r"^\$([A-Za-z_]\w*)((?:\.[\w-]+)*)$")
+
+PLANNER_INSTRUCTIONS = (
+    "PLANNING MODE: Do not answer directly. Reply ONLY with a JSON object describing the tool calls "
+    "needed to answer the user's last message, in this format:\n"
+    '{{"steps": [{{"id": "s1", "tool": "<tool name>", "arguments": {{...}}, "depends_on": []}}]}}\n'
+    "Rules:\n"
+    "- Use at most {max_steps} steps and only the tools listed below.\n"
+    "- Steps without dependencies run in parallel, so list independent calls as separate steps.\n"
+    "- To pass a value from an earlier step, set the argument to \"$<step id>.<path>\" "
+    "(e.g. \"$s1.results.0.country\") and list that step in depends_on.\n"
+    "- If no tool is needed, reply with {{\"steps\": [], \"reply\": \"<your answer>\"}}.\n\n"
+    "Available tools:\n{catalog}"
+)
+
+
+class PlanError(ValueError):
+    """Raised when the planner's output is not a valid plan."""
+
+
+class PlanExecutor:
+    """
+    Executes a plan of tool calls as a dependency graph.
+
+    The planner LLM returns all the tool invocations for a question in one
+    response; independent steps run in parallel and results are fed into
+    dependent steps through "$<step id>.<path>" references.
+    """
+
+    def __init__(self, available_functions: Dict[str, Callable], max_workers: int = 4, max_steps: int = 8):
+        """
+        Initialize with the tool name -> callable mapping used by the conversation loop.
+
+        Args:
+            available_functions: Dictionary mapping tool names to callables
+            max_workers: Maximum number of steps executed concurrently
+            max_steps: Maximum number of steps accepted in one plan
+        """
+        self.available_functions = available_functions
+        self.max_workers = max_workers
+        self.max_steps = max_steps
+
+    def get_instructions(self, tools: List[dict]) -> str:
+        """Build the planner system prompt from the tools list given to the LLM."""
+        catalog = "\n".join(json.dumps(tool["function"], ensure_ascii=False) for tool in tools)
+        return PLANNER_INSTRUCTIONS.format(max_steps=self.max_steps, catalog=catalog)
+
+    def parse_plan(self, content: str) -> dict:
+        """Parse and validate the planner's JSON reply."""
+        try:
+            plan = json.loads(content)
+        except (TypeError, json.JSONDecodeError) as e:
+            raise PlanError(f"Planner did not return valid JSON: {e}")
+
+        steps = plan.get("steps", []) if isinstance(plan, dict) else None
+        if not isinstance(steps, list):
+            raise PlanError("Plan must contain a 'steps' list")
+        if len(steps) > self.max_steps:
+            raise PlanError(f"Plan has {len(steps)} steps, the limit is {self.max_steps}")
+
+        step_ids = set()
+        for step in steps:
+            if not isinstance(step, dict) or not isinstance(step.get("id"), str) or not step["id"] \
+                    or not isinstance(step.get("tool"), str):
+                raise PlanError(f"Invalid step: {step}")
+            if step["id"] in step_ids:
+                raise PlanError(f"Duplicate step id: {step['id']}")
+            if step["tool"] not in self.available_functions:
+                raise PlanError(f"Unknown tool: {step['tool']}")
+            step_ids.add(step["id"])
+            step.setdefault("arguments", {})
+            step.setdefault("depends_on", [])
+            if not isinstance(step["arguments"], dict):
+                raise PlanError(f"Step {step['id']} arguments must be an object")
+            if not isinstance(step["depends_on"], list) or not all(isinstance(dep, str) for dep in step["depends_on"]):
+                raise PlanError(f"Step {step['id']} depends_on must be a list of step ids")
+
+        for step in steps:
+            # A referenced step is a dependency even when the planner forgot to list it
+            referenced = self._references(step["arguments"])
+            unknown = (set(step["depends_on"]) | referenced) - step_ids
+            if unknown:
+                raise PlanError(f"Step {step['id']} depends on unknown steps: {', '.join(sorted(unknown))}")
+            step["depends_on"] += sorted(referenced - set(step["depends_on"]))
+
+        self._check_acyclic(steps)
+        return {"steps": steps, "reply": plan.get("reply")}
+
+    def execute(self, steps: List[dict]) -> Dict[str, dict]:
+        """
+        Run every step once its dependencies have finished.
+
+        Returns a dictionary mapping step ids to {'tool', 'arguments', 'result'}; failed
+        steps carry {'error': ...} as their result and their dependents are skipped.
+        """
+        outcomes = {}
+        pending = {step["id"]: step for step in steps}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for step_id, step in list(pending.items()):
+                    if not all(dep in outcomes for dep in step["depends_on"]):
+                        continue
+                    del pending[step_id]
+
+                    failed = [dep for dep in step["depends_on"] if "error" in outcomes[dep]["result"]]
+                    if failed:
+                        outcomes[step_id] = {
+                            "tool": step["tool"],
+                            "arguments": step["arguments"],
+                            "result": {"error": f"Skipped because step {failed[0]} failed"},
+                        }
+                        continue
+
+                    try:
+                        arguments = self._resolve_references(step["arguments"], outcomes)
+                    except PlanError as e:
+                        outcomes[step_id] = {"tool": step["tool"], "arguments": step["arguments"],
+                                             "result": {"error": str(e)}}
+                        continue
+                    future = executor.submit(self.available_functions[step["tool"]], **arguments)
+                    running[future] = (step, arguments)
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step, arguments = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"error": f"Error when running tool: {e}"}
+                    if not isinstance(result, dict):
+                        result = {"result": result}
+                    outcomes[step["id"]] = {"tool": step["tool"], "arguments": arguments, "result": result}
+
+        return outcomes
+
+    def _references(self, value) -> set:
+        """Ids of the steps referenced by "$<step id>.<path>" strings in an argument value."""
+        if isinstance(value, dict):
+            return set().union(*(self._references(item) for item in value.values()))
+        if isinstance(value, list):
+            return set().union(*(self._references(item) for item in value))
+        match = REFERENCE_PATTERN.match(value) if isinstance(value, str) else None
+        return {match.group(1)} if match else set()
+
+    def _resolve_references(self, value, outcomes: Dict[str, dict]):
+        """Replace "$<step id>.<path>" strings with values from finished steps."""
+        if isinstance(value, dict):
+            return {key: self._resolve_references(item, outcomes) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._resolve_references(item, outcomes) for item in value]
+        if not isinstance(value, str):
+            return value
+
+        match = REFERENCE_PATTERN.match(value)
+        if not match or match.group(1) not in outcomes:
+            return value
+
+        resolved = outcomes[match.group(1)]["result"]
+        for key in filter(None, match.group(2).split(".")):
+            if isinstance(resolved, list) and key.lstrip("-").isdigit() and -len(resolved) <= int(key) < len(resolved):
+                resolved = resolved[int(key)]
+            elif isinstance(resolved, dict) and key in resolved:
+                resolved = resolved[key]
+            else:
+                raise PlanError(f"Cannot resolve reference {value}")
+        return resolved
+
+    def _check_acyclic(self, steps: List[dict]):
+        """Reject plans whose dependencies form a cycle (Kahn's algorithm)."""
+        remaining = {step["id"]: set(step["depends_on"]) for step in steps}
+        while remaining:
+            ready = [step_id for step_id, deps in remaining.items() if not deps]
+            if not ready:
+                raise PlanError(f"Plan has a dependency cycle between: {', '.join(sorted(remaining))}")
+            for step_id in ready:
+                del remaining[step_id]
+            for deps in remaining.values():
+                deps.difference_update(ready)
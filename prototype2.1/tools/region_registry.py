@@ -0,0 +1,118 @@
+# tools/region_registry.py
+
+import threading
+from typing import Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+EU27 = ("AT", "BE", "BG", "HR", "CY", "CZ", "DK", "EE", "FI", "FR", "DE", "EL", "HU", "IE",
+        "IT", "LV", "LT", "LU", "MT", "NL", "PL", "PT", "RO", "SK", "SI", "ES", "SE")
+
+# Built-in region name -> member country codes
+REGIONS = {
+    "eu27": EU27,
+    "nordics": ("DK", "FI", "IS", "NO", "SE"),
+    "baltics": ("EE", "LV", "LT"),
+    "benelux": ("BE", "NL", "LU"),
+    "iberia": ("ES", "PT"),
+    "british_isles": ("GB", "IE"),
+    "balkans": ("AL", "BA", "BG", "EL", "HR", "ME", "MK", "RO", "RS", "SI"),
+    # The groups geographical_patterns has always compared
+    "northern_europe": ("NO", "SE", "FI", "DK"),
+    "central_europe": ("DE", "FR", "PL", "CZ"),
+    "southern_europe": ("ES", "IT", "GR", "PT"),
+}
+
+# Countries that datasets code differently (Eurostat EL/UK vs ISO GR/GB)
+CODE_ALIASES = {"GR": "EL", "EL": "GR", "GB": "UK", "UK": "GB"}
+
+# Columns of the hourly country matrices that aren't countries
+NON_COUNTRY_COLUMNS = ("time", "datetime", "season")
+
+Region = Union[str, Iterable[str]]
+
+
+def country_column_map(data: pd.DataFrame, suffix: str = "") -> Dict[str, str]:
+    """Country code -> column for the numeric country columns of data (optionally only those ending in suffix)."""
+    return {
+        col[:len(col) - len(suffix)] if suffix else col: col
+        for col in data.select_dtypes(include="number").columns
+        if col not in NON_COUNTRY_COLUMNS and col.endswith(suffix)
+    }
+
+
+class RegionRegistry:
+    """
+    Named country groups over an hourly time x country matrix, with each group's
+    (optionally weighted) mean series computed once and cached.
+
+    A region is a built-in or defined name, or an ad-hoc list of country codes.
+    Members missing from the data are skipped; GR/EL and GB/UK resolve to
+    whichever spelling the data uses.
+    """
+
+    def __init__(self, data: pd.DataFrame, columns: Dict[str, str] = None):
+        """
+        Args:
+            data: Hourly DataFrame with one column per country
+            columns: Country code -> column name (default: every numeric country column)
+        """
+        self.data = data
+        self.columns = columns if columns is not None else country_column_map(data)
+        self.regions = dict(REGIONS)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def define(self, name: str, members: Iterable[str]):
+        """Register (or replace) a named region."""
+        with self._lock:
+            self.regions[name.lower()] = tuple(members)
+            self._series = {key: series for key, series in self._series.items() if key[0] != name.lower()}
+
+    def resolve(self, region: Region) -> Tuple[str, List[str]]:
+        """(cache key, member codes present in the data) of a region name or code list."""
+        if isinstance(region, str):
+            key = region.lower()
+            if key not in self.regions:
+                raise ValueError(f"Unknown region: {region}. Known regions: {', '.join(sorted(self.regions))}")
+            codes = self.regions[key]
+        else:
+            codes = tuple(code.upper() for code in region)
+            key = "custom:" + ",".join(sorted(codes))
+
+        members = []
+        for code in codes:
+            if code in self.columns:
+                members.append(code)
+            elif CODE_ALIASES.get(code) in self.columns:
+                members.append(CODE_ALIASES[code])
+        if not members:
+            raise ValueError(f"None of the countries of region {region} are in the data")
+        return key, members
+
+    def series(self, region: Region, weights: Dict[str, float] = None) -> np.ndarray:
+        """Hourly mean of the region's members, weighted by weights (code -> weight, default equal)."""
+        key, members = self.resolve(region)
+        cache_key = (key, tuple(sorted(weights.items())) if weights else None)
+        with self._lock:
+            if cache_key in self._series:
+                return self._series[cache_key]
+
+        values = self.data[[self.columns[code] for code in members]].to_numpy(dtype=float)
+        if weights:
+            member_weights = np.array([weights.get(code, weights.get(CODE_ALIASES.get(code), 0.0)) for code in members])
+        else:
+            member_weights = np.ones(len(members))
+        known = ~np.isnan(values)
+        # Weighted mean over the members with a value in each hour
+        with np.errstate(invalid='ignore', divide='ignore'):
+            series = (np.where(known, values, 0.0) @ member_weights) / (known @ member_weights)
+
+        with self._lock:
+            self._series[cache_key] = series
+        return series
+
+    def members(self, region: Region) -> List[str]:
+        """Member codes of a region that are present in the data."""
+        return self.resolve(region)[1]
@@ -0,0 +1,151 @@
+# tools/sandbox_pool.py
+
+import multiprocessing
+import os
+import resource
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+
+class SandboxError(RuntimeError):
+    """Raised when sandboxed work times out, exceeds its limits or kills its worker."""
+
+
+# Per-worker state, set by the pool initializer inside each forked worker
+_worker_state = {}
+
+
+def _address_space_bytes() -> int:
+    """Current virtual memory size of this process (Linux)."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _init_worker(setup: Callable, memory_mb: int):
+    # The worker inherits the parent's address space (including the datasets), so
+    # the memory budget is granted on top of what is already mapped after the fork
+    if memory_mb:
+        limit = _address_space_bytes() + memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    _worker_state["context"] = setup() if setup else None
+
+
+def _run_limited(function: Callable, cpu_seconds: int, args: tuple):
+    # RLIMIT_CPU counts the whole life of the process, so the soft limit is moved
+    # forward before every task; exceeding it kills the worker with SIGXCPU
+    if cpu_seconds:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = int(usage.ru_utime + usage.ru_stime) + 1
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        resource.setrlimit(resource.RLIMIT_CPU, (used + cpu_seconds, hard))
+    return function(_worker_state["context"], *args)
+
+
+def _noop(context):
+    return os.getpid()
+
+
+class SandboxPool:
+    """
+    Pool of pre-forked worker processes with CPU time and memory limits.
+
+    Workers are forked from the parent after the datasets are loaded, so they
+    already hold them (copy-on-write). Each task gets its own CPU-time budget and
+    a wall-clock timeout; the pool is recycled whenever a task times out, runs
+    out of memory or kills its worker, so one bad task can't wedge the next ones.
+    """
+
+    def __init__(self, setup: Callable = None, workers: int = 2, cpu_seconds: int = 60,
+                 memory_mb: int = 2048, timeout: float = 120.0):
+        """
+        Initialize and pre-fork the workers.
+
+        Args:
+            setup: Called once in every worker; its return value is passed as the
+                   first argument to every task run in that worker
+            workers: Number of worker processes
+            cpu_seconds: CPU-time budget per task (0 disables the limit)
+            memory_mb: Extra address space a worker may allocate (0 disables the limit)
+            timeout: Wall-clock timeout per task in seconds
+        """
+        self.setup = setup
+        self.workers = workers
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        # Pools torn down on purpose; tasks they break were not at fault and are retried
+        self._retired = weakref.WeakSet()
+        self._executor = self._start()
+
+    def run(self, function: Callable, *args):
+        """Run function(context, *args) in a worker and return its result."""
+        try:
+            return self._run_once(function, args)
+        except BrokenProcessPool:
+            # Another task's timeout or memory error restarted the pool under this one
+            pass
+        try:
+            return self._run_once(function, args)
+        except BrokenProcessPool:
+            raise SandboxError("The sandbox was restarted while the analysis was running, please retry")
+
+    def _run_once(self, function: Callable, args: tuple):
+        """Run a task on the current pool; raises BrokenProcessPool only if another task recycled it."""
+        with self._lock:
+            # Waits for a restart in progress to finish
+            executor = self._executor
+        try:
+            try:
+                future = executor.submit(_run_limited, function, self.cpu_seconds, args)
+            except RuntimeError:
+                # The pool was shut down by a restart between picking it and submitting
+                if executor not in self._retired:
+                    raise
+                raise BrokenProcessPool("Sandbox pool was restarted")
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self._recycle(executor)
+            raise SandboxError(f"Analysis exceeded the {self.timeout:.0f}s time limit")
+        except BrokenProcessPool:
+            if executor in self._retired:
+                raise
+            self._recycle(executor)
+            raise SandboxError("Analysis worker was terminated (CPU time or memory limit exceeded)")
+        except MemoryError:
+            self._recycle(executor)
+            raise SandboxError(f"Analysis exceeded the {self.memory_mb} MB memory limit")
+
+    def shutdown(self):
+        """Stop every worker."""
+        self._terminate(self._executor)
+
+    def _start(self) -> ProcessPoolExecutor:
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(self.setup, self.memory_mb),
+        )
+        # Fork every worker now rather than on the first question
+        for future in [executor.submit(_run_limited, _noop, 0, ()) for _ in range(self.workers)]:
+            future.result()
+        return executor
+
+    def _recycle(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            # Another thread may already have replaced the pool
+            if self._executor is broken:
+                self._retired.add(broken)
+                self._terminate(broken)
+                self._executor = self._start()
+
+    def _terminate(self, executor: ProcessPoolExecutor):
+        # A hung task can't be cancelled, so its worker processes are killed outright
+        for process in list((executor._processes or {}).values()):
+            if process.is_alive():
+                process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
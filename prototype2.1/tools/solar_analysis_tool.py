@@ -1,5 +1,11 @@
-from typing import Dict
+from typing import Callable, Dict, List
 from Base_Tool.base_tool import SingleMessageTool
+from Tools.dataset_version import DerivedCache
+from Tools.region_registry import RegionRegistry
+from Tools.solar_comparison import SourceComparison
+from Tools.variability_metrics import VariabilityMetrics
+from Tools.solar_profile import ProfileTensor, best_window
+from Tools.solar_daily import SEASON_MONTHS, ClearSkyDays, SolarDailyTable, country_columns, minutes_to_clock
 import pandas as pd
 import numpy as np
 
@@ -10,6 +16,7 @@ class SolarAnalysisTool(SingleMessageTool):
         """Initialize with both SARAH and MERRA solar data."""
         self.sarah_data = sarah_data
         self.merra_data = merra_data
+        self._derived = DerivedCache()
 
     def get_name(self) -> str:
         return "analyze_solar_data"
@@ -23,16 +30,22 @@ class SolarAnalysisTool(SingleMessageTool):
             "analysis_type": {
                 "description": ("Type of analysis: 'daylight_patterns', 'geographical_patterns', "
                               "'clear_sky_patterns', 'country_analysis', 'regional_comparison', "
-                              "'seasonal_efficiency'"),
+                              "'seasonal_efficiency', 'clear_sky_ranking' (clear-sky statistics of every "
+                              "country in one ranked table), 'source_comparison' (SARAH vs MERRA bias, RMSE, "
+                              "correlation and disagreement windows; uses both datasets), 'variability' (hourly "
+                              "ramp rates and 3h/24h/7d rolling variability of a country or region, or all "
+                              "countries ranked)"),
                 "type": "string",
                 "required": True,
                 "enum": [
                     "daylight_patterns", "geographical_patterns", "clear_sky_patterns",
-                    "country_analysis", "regional_comparison", "seasonal_efficiency"
+                    "country_analysis", "regional_comparison", "seasonal_efficiency",
+                    "clear_sky_ranking", "source_comparison", "variability"
                 ]
             },
             "data_source": {
-                "description": "Source dataset to use: 'sarah' (solar-specific) or 'merra' (environmental context)",
+                "description": ("Source dataset to use: 'sarah' (solar-specific) or 'merra' (environmental context); "
+                                "ignored by source_comparison"),
                 "type": "string",
                 "required": True,
                 "enum": ["sarah", "merra"]
@@ -46,11 +59,33 @@ class SolarAnalysisTool(SingleMessageTool):
                 "description": "Second country ISO code for comparison",
                 "type": "string",
                 "required": False
+            },
+            "region": {
+                "description": ("Region to analyze instead of a country in country_analysis, seasonal_efficiency "
+                                "and variability, "
+                                "e.g. 'eu27', 'nordics', 'iberia', 'southern_europe'"),
+                "type": "string",
+                "required": False
+            },
+            "regions": {
+                "description": ("Regions for geographical_patterns, e.g. ['eu27', 'nordics', 'iberia', 'baltics', "
+                                "'benelux', 'british_isles', 'balkans'] (default: northern, central and "
+                                "southern Europe)"),
+                "type": "array",
+                "items": {"type": "string"},
+                "required": False
+            },
+            "countries": {
+                "description": "Country ISO codes forming a custom region for geographical_patterns",
+                "type": "array",
+                "items": {"type": "string"},
+                "required": False
             }
         }
 
-    def run_impl(self, analysis_type: str, data_source: str, country_code: str = None, 
-                 comparison_country: str = None):
+    def run_impl(self, analysis_type: str, data_source: str, country_code: str = None,
+                 comparison_country: str = None, region: str = None, regions: List[str] = None,
+                 countries: List[str] = None):
         """Implement the tool logic."""
         try:
             # Select the appropriate dataset
@@ -59,119 +94,185 @@ class SolarAnalysisTool(SingleMessageTool):
             if analysis_type == "daylight_patterns":
                 return self.analyze_daylight_patterns(data, country_code)
             elif analysis_type == "geographical_patterns":
-                return self.analyze_geographical_patterns(data)
+                return self.analyze_geographical_patterns(data, regions, countries)
             elif analysis_type == "clear_sky_patterns":
                 return self.analyze_clear_sky_patterns(data, country_code)
             elif analysis_type == "country_analysis":
-                if not country_code:
+                if not country_code and not region:
                     raise ValueError("Country code is required for country analysis")
-                return self.analyze_country(data, country_code)
+                return self.analyze_country(data, country_code, region)
             elif analysis_type == "regional_comparison":
                 if not country_code or not comparison_country:
                     raise ValueError("Both country codes are required for comparison")
                 return self.compare_regions(data, country_code, comparison_country)
             elif analysis_type == "seasonal_efficiency":
-                return self.analyze_seasonal_efficiency(data, country_code)
+                return self.analyze_seasonal_efficiency(data, country_code, region)
+            elif analysis_type == "clear_sky_ranking":
+                return self.rank_clear_sky(data)
+            elif analysis_type == "source_comparison":
+                return self.compare_sources(country_code)
+            elif analysis_type == "variability":
+                return self.analyze_variability(data, country_code, region)
             else:
                 raise ValueError(f"Unknown analysis type: {analysis_type}")
         except Exception as e:
             raise Exception(f"Error in solar analysis: {str(e)}")
 
+    def _derived_data(self, data: pd.DataFrame, name, build: Callable[[pd.DataFrame], object]):
+        """Return a structure precomputed from one solar dataset, rebuilt only when that data changes."""
+        return self._derived.get(data, name, build)
+
+    def _times(self, data: pd.DataFrame) -> pd.Series:
+        """The parsed 'time' column, without adding it to the shared DataFrame."""
+        return self._derived_data(data, "times", lambda frame: pd.to_datetime(frame['time']))
+
+    def _months(self, data: pd.DataFrame) -> np.ndarray:
+        """Calendar month of every hourly row."""
+        return self._derived_data(data, "months", lambda frame: self._times(frame).dt.month.to_numpy())
+
+    def _regions(self, data: pd.DataFrame) -> RegionRegistry:
+        """Region groupings of a solar dataset, with their mean series cached (see region_registry.py)."""
+        return self._derived_data(data, "regions", RegionRegistry)
+
+    def _profile(self, data: pd.DataFrame, country_code: str = None, region: str = None):
+        """
+        (ProfileTensor, column) for a country, a region, or the cross-country mean
+        when neither is given (see solar_profile.py).
+        """
+        def hourly(frame: pd.DataFrame):
+            return self._months(frame), self._times(frame).dt.hour.to_numpy()
+
+        if region:
+            registry = self._regions(data)
+            key, _ = registry.resolve(region)
+            return self._derived_data(
+                data, ("profile", key),
+                lambda frame: ProfileTensor(registry.series(region)[:, None], *hourly(frame), [key])
+            ), key
+
+        def build(frame: pd.DataFrame) -> ProfileTensor:
+            countries = country_columns(frame)
+            values = frame[countries].to_numpy(dtype=float)
+            return ProfileTensor(np.column_stack([values, np.nanmean(values, axis=1)]), *hourly(frame),
+                                 countries + [SolarDailyTable.MEAN])
+
+        return self._derived_data(data, "profile", build), country_code or SolarDailyTable.MEAN
+
+    def _variability(self, data: pd.DataFrame, region: str = None) -> VariabilityMetrics:
+        """Ramp and rolling-variability metrics of every country, or of one region's series."""
+        if region:
+            registry = self._regions(data)
+            key, _ = registry.resolve(region)
+            order = np.argsort(self._times(data).to_numpy(), kind='stable')
+            return self._derived_data(
+                data, ("variability", key),
+                lambda frame: VariabilityMetrics(registry.series(region)[order][:, None], [key])
+            )
+        return self._derived_data(
+            data, "variability", lambda frame: VariabilityMetrics.from_frame(frame, country_columns(frame))
+        )
+
+    def _daily(self, data: pd.DataFrame) -> SolarDailyTable:
+        """Per-day, per-country aggregates of an hourly solar matrix (see solar_daily.py)."""
+        return self._derived_data(data, "daily", SolarDailyTable)
+
+    def _clear_sky(self, data: pd.DataFrame) -> ClearSkyDays:
+        """Clear-sky classification of every country of a solar dataset."""
+        return self._derived_data(data, "clear_sky", lambda frame: ClearSkyDays(self._daily(frame)))
+
+    def _comparison(self) -> SourceComparison:
+        """SARAH vs MERRA statistics, rebuilt when either dataset changes."""
+        merra_version = self._derived.version(self.merra_data)
+        return self._derived_data(self.sarah_data, ("source_comparison", merra_version),
+                                  lambda sarah: SourceComparison(sarah, self.merra_data))
+
     def analyze_daylight_patterns(self, data: pd.DataFrame, country_code: str = None):
         """Analyze daylight hours and solar intensity patterns."""
         try:
-            data['datetime'] = pd.to_datetime(data['time'])
-            if country_code:
-                if country_code not in data.columns:
-                    raise ValueError(f"No data available for country code: {country_code}")
-                solar_data = data[country_code]
-            else:
-                solar_data = data.drop(['time', 'datetime'], axis=1).mean(axis=1)
-            
-            # Calculate daylight hours (any period with non-zero solar radiation)
-            daily_daylight = solar_data[solar_data > 0].groupby(data['datetime'].dt.date).count()
-            
-            # Calculate seasonal daylight averages
+            daily = self._daily(data)
+            col = daily.column(country_code)
+
+            # First and last hour with output, in minutes since midnight, on days with any output
+            first_light = daily.first_light[:, col]
+            last_light = daily.last_light[:, col]
+            lit = ~np.isnan(first_light)
+
+            # Daylight hours per day (hours with non-zero solar output); days without any
+            # output (polar night) are left out, as in the hourly groupby this replaces
+            daylight = daily.daylight_hours[lit, col]
             seasonal_daylight = {
-                "summer": float(solar_data[data['datetime'].dt.month.isin([6,7,8])].groupby(data['datetime'].dt.date).count().mean()),
-                "winter": float(solar_data[data['datetime'].dt.month.isin([12,1,2])].groupby(data['datetime'].dt.date).count().mean())
+                season: float(daylight[daily.month_mask(SEASON_MONTHS[season])[lit]].mean())
+                for season in ("summer", "winter")
             }
-            
-            # Calculate sunrise and sunset times
-            daily_first_light = data[solar_data > 0].groupby(data['datetime'].dt.date)['datetime'].min()
-            daily_last_light = data[solar_data > 0].groupby(data['datetime'].dt.date)['datetime'].max()
-            
-            # Convert times to minutes for averaging
-            avg_sunrise_minutes = daily_first_light.dt.hour * 60 + daily_first_light.dt.minute
-            avg_sunset_minutes = daily_last_light.dt.hour * 60 + daily_last_light.dt.minute
-            
-            # Calculate average times
-            avg_sunrise = pd.Timestamp('today').replace(
-                hour=int(avg_sunrise_minutes.mean() // 60),
-                minute=int(avg_sunrise_minutes.mean() % 60)
-            ).time()
-            
-            avg_sunset = pd.Timestamp('today').replace(
-                hour=int(avg_sunset_minutes.mean() // 60),
-                minute=int(avg_sunset_minutes.mean() % 60)
-            ).time()
-            
+
             return {
                 "analysis": "daylight_patterns",
                 "daylight_metrics": {
-                    "average_daylight_hours": float(daily_daylight.mean()),
-                    "max_daylight_hours": float(daily_daylight.max()),
-                    "min_daylight_hours": float(daily_daylight.min())
+                    "average_daylight_hours": float(daylight.mean()),
+                    "max_daylight_hours": float(daylight.max()),
+                    "min_daylight_hours": float(daylight.min())
                 },
                 "timing_metrics": {
-                    "average_sunrise": str(avg_sunrise),
-                    "average_sunset": str(avg_sunset),
-                    "earliest_sunrise": str(daily_first_light.min().time()),
-                    "latest_sunset": str(daily_last_light.max().time())
+                    "average_sunrise": minutes_to_clock(first_light[lit].mean()),
+                    "average_sunset": minutes_to_clock(last_light[lit].mean()),
+                    "earliest_sunrise": minutes_to_clock(first_light[lit].min()),
+                    "latest_sunset": minutes_to_clock(last_light[lit].max())
                 },
                 "seasonal_variation": seasonal_daylight
             }
         except Exception as e:
             raise Exception(f"Error analyzing daylight patterns: {str(e)}")
 
-    def analyze_geographical_patterns(self, data: pd.DataFrame):
+    def analyze_geographical_patterns(self, data: pd.DataFrame, regions: List[str] = None,
+                                      countries: List[str] = None):
         """Analyze solar patterns based on geographical location."""
         try:
-            data['datetime'] = pd.to_datetime(data['time'])
-            
-            # Define geographical groups
-            northern_countries = ['NO', 'SE', 'FI', 'DK']
-            central_countries = ['DE', 'FR', 'PL', 'CZ']
-            southern_countries = ['ES', 'IT', 'GR', 'PT']
-            
-            # Calculate regional averages
-            north_data = data[northern_countries].mean(axis=1)
-            central_data = data[central_countries].mean(axis=1)
-            south_data = data[southern_countries].mean(axis=1)
-            
-            return {
-                "analysis": "geographical_patterns",
-                "regional_averages": {
-                    "northern_europe": float(north_data.mean()),
-                    "central_europe": float(central_data.mean()),
-                    "southern_europe": float(south_data.mean())
-                },
-                "seasonal_patterns": {
-                    "summer": {
-                        "northern": float(north_data[data['datetime'].dt.month.isin([6,7,8])].mean()),
-                        "central": float(central_data[data['datetime'].dt.month.isin([6,7,8])].mean()),
-                        "southern": float(south_data[data['datetime'].dt.month.isin([6,7,8])].mean())
+            registry = self._regions(data)
+            months = self._months(data)
+            summer = np.isin(months, SEASON_MONTHS["summer"])
+            winter = np.isin(months, SEASON_MONTHS["winter"])
+
+            if not regions and not countries:
+                north, central, south = (
+                    registry.series(region) for region in ("northern_europe", "central_europe", "southern_europe")
+                )
+                return {
+                    "analysis": "geographical_patterns",
+                    "regional_averages": {
+                        "northern_europe": float(np.nanmean(north)),
+                        "central_europe": float(np.nanmean(central)),
+                        "southern_europe": float(np.nanmean(south))
+                    },
+                    "seasonal_patterns": {
+                        season: {
+                            "northern": float(np.nanmean(north[mask])),
+                            "central": float(np.nanmean(central[mask])),
+                            "southern": float(np.nanmean(south[mask]))
+                        }
+                        for season, mask in (("summer", summer), ("winter", winter))
                     },
-                    "winter": {
-                        "northern": float(north_data[data['datetime'].dt.month.isin([12,1,2])].mean()),
-                        "central": float(central_data[data['datetime'].dt.month.isin([12,1,2])].mean()),
-                        "southern": float(south_data[data['datetime'].dt.month.isin([12,1,2])].mean())
+                    "latitude_effect": {
+                        "north_south_difference": float(np.nanmean(south) - np.nanmean(north)),
+                        "relative_efficiency": float(np.nanmean(south) / np.nanmean(north))
                     }
-                },
-                "latitude_effect": {
-                    "north_south_difference": float(south_data.mean() - north_data.mean()),
-                    "relative_efficiency": float(south_data.mean() / north_data.mean())
                 }
+
+            selected = [(region, region) for region in regions or []]
+            if countries:
+                selected.append(("custom", countries))
+            results = {}
+            for name, region in selected:
+                series = registry.series(region)
+                results[name] = {
+                    "countries": registry.members(region),
+                    "average_output": float(np.nanmean(series)),
+                    "summer_average": float(np.nanmean(series[summer])),
+                    "winter_average": float(np.nanmean(series[winter]))
+                }
+            return {
+                "analysis": "geographical_patterns",
+                "regions": results,
+                "highest_output_region": max(results, key=lambda name: results[name]["average_output"])
             }
         except Exception as e:
             raise Exception(f"Error analyzing geographical patterns: {str(e)}")
@@ -179,87 +280,116 @@ class SolarAnalysisTool(SingleMessageTool):
     def analyze_clear_sky_patterns(self, data: pd.DataFrame, country_code: str = None):
         """Analyze patterns suggesting clear sky vs cloudy conditions."""
         try:
-            data['datetime'] = pd.to_datetime(data['time'])
-            if country_code:
-                if country_code not in data.columns:
-                    raise ValueError(f"No data available for country code: {country_code}")
-                solar_data = data[country_code]
-            else:
-                solar_data = data.drop(['time', 'datetime'], axis=1).mean(axis=1)
-            
-            # Calculate daily maximum solar radiation
-            daily_max = solar_data.groupby(data['datetime'].dt.date).max()
-            
-            # Define clear sky threshold (90th percentile of daily maximums)
-            clear_sky_threshold = daily_max.quantile(0.9)
-            
-            # Identify clear sky periods
-            clear_sky_days = daily_max[daily_max >= clear_sky_threshold]
-            
-            # Convert index to datetime series for analysis
-            clear_sky_dates = pd.Series(clear_sky_days.index)
-            
-            # Calculate monthly and seasonal distributions
-            monthly_dist = {}
-            for month in range(1, 13):
-                monthly_count = sum(pd.to_datetime(date).month == month for date in clear_sky_dates)
-                monthly_dist[str(month)] = int(monthly_count)
-            
-            # Calculate seasonal distributions
-            summer_days = sum(pd.to_datetime(date).month in [6,7,8] for date in clear_sky_dates)
-            winter_days = sum(pd.to_datetime(date).month in [12,1,2] for date in clear_sky_dates)
-            
+            # Clear sky days: daily maximum at or above the 90th percentile of daily maximums
+            clear_sky = self._clear_sky(data)
             return {
                 "analysis": "clear_sky_patterns",
-                "clear_sky_metrics": {
-                    "clear_sky_threshold": float(clear_sky_threshold),
-                    "clear_sky_days_percentage": float(len(clear_sky_days) / len(daily_max)),
-                    "average_clear_sky_intensity": float(clear_sky_days.mean())
-                },
-                "monthly_distribution": monthly_dist,
-                "seasonal_patterns": {
-                    "summer_clear_days": float(summer_days / len(clear_sky_dates)) if len(clear_sky_dates) > 0 else 0.0,
-                    "winter_clear_days": float(winter_days / len(clear_sky_dates)) if len(clear_sky_dates) > 0 else 0.0
-                }
+                **clear_sky.summary(clear_sky.daily.column(country_code))
             }
         except Exception as e:
             raise Exception(f"Error analyzing clear sky patterns: {str(e)}")
-        
-    def analyze_country(self, data: pd.DataFrame, country_code: str):
-        """Analyze solar patterns for a specific country."""
+
+    def rank_clear_sky(self, data: pd.DataFrame):
+        """Rank all countries by the intensity of their clear-sky days."""
         try:
-            if country_code not in data.columns:
-                raise ValueError(f"No data available for country code: {country_code}")
-            
-            data['datetime'] = pd.to_datetime(data['time'])
-            country_data = data[country_code]
-            
-            # Calculate seasonal averages
-            seasonal_data = {
-                "winter": float(country_data[data['datetime'].dt.month.isin([12,1,2])].mean()),
-                "spring": float(country_data[data['datetime'].dt.month.isin([3,4,5])].mean()),
-                "summer": float(country_data[data['datetime'].dt.month.isin([6,7,8])].mean()),
-                "fall": float(country_data[data['datetime'].dt.month.isin([9,10,11])].mean())
+            ranking = self._clear_sky(data).ranking()
+            return {
+                "analysis": "clear_sky_ranking",
+                "ranking": [
+                    {
+                        "rank": rank,
+                        "country_code": row["country"],
+                        "clear_sky_threshold": float(row["clear_sky_threshold"]),
+                        "clear_sky_days": int(row["clear_sky_days"]),
+                        "average_clear_sky_intensity": float(row["average_clear_sky_intensity"]),
+                        "summer_share": float(row["summer_share"]),
+                        "winter_share": float(row["winter_share"]),
+                        "peak_month": int(row["peak_month"])
+                    }
+                    for rank, row in enumerate(ranking.to_dict("records"), 1)
+                ]
             }
-            
+        except Exception as e:
+            raise Exception(f"Error ranking clear sky patterns: {str(e)}")
+
+    def compare_sources(self, country_code: str = None):
+        """Compare SARAH and MERRA over their common hours, for all countries or one in detail."""
+        try:
+            comparison = self._comparison()
+            if country_code:
+                col = comparison.column(country_code)
+                return {
+                    "analysis": "source_comparison",
+                    "country_code": country_code,
+                    "common_hours": comparison.hours,
+                    "metrics": {
+                        "sarah_mean": float(comparison.sarah_mean[col]),
+                        "merra_mean": float(comparison.merra_mean[col]),
+                        "bias": float(comparison.bias[col]),
+                        "mean_absolute_error": float(comparison.mae[col]),
+                        "rmse": float(comparison.rmse[col]),
+                        "correlation": float(comparison.correlation[col])
+                    },
+                    "monthly_bias": {
+                        str(month): float(comparison.monthly_bias[month, col]) for month in range(1, 13)
+                        if not np.isnan(comparison.monthly_bias[month, col])
+                    },
+                    "disagreement_windows": comparison.disagreement_windows(country_code)
+                }
+
+            table = comparison.table()
+            return {
+                "analysis": "source_comparison",
+                "common_hours": comparison.hours,
+                "overall": {
+                    "mean_bias": float(table["bias"].mean()),
+                    "mean_rmse": float(table["rmse"].mean()),
+                    "mean_correlation": float(table["correlation"].mean())
+                },
+                "countries": [
+                    {
+                        "country_code": row["country"],
+                        "bias": float(row["bias"]),
+                        "rmse": float(row["rmse"]),
+                        "correlation": float(row["correlation"])
+                    }
+                    for row in table.to_dict("records")
+                ],
+                "largest_disagreement": {
+                    country: comparison.disagreement_windows(country, limit=1)
+                    for country in table["country"].head(3)
+                }
+            }
+        except Exception as e:
+            raise Exception(f"Error comparing SARAH and MERRA: {str(e)}")
+
+    def analyze_country(self, data: pd.DataFrame, country_code: str, region: str = None):
+        """Analyze solar patterns for a specific country (or region)."""
+        try:
+            profile, column = self._profile(data, country_code, region)
+            overall = profile.stats(column)
+            daily_cycle = pd.Series(profile.daily_cycle(column))
+            ranked_hours = daily_cycle.nlargest(8)
+
             return {
                 "analysis": "country_analysis",
                 "country_code": country_code,
+                **({"region": region} if region else {}),
                 "overall_metrics": {
-                    "average_solar_output": float(country_data.mean()),
-                    "maximum_output": float(country_data.max()),
-                    "minimum_output": float(country_data.min()),
-                    "output_variability": float(country_data.std())
+                    "average_solar_output": overall["mean"],
+                    "maximum_output": overall["max"],
+                    "minimum_output": overall["min"],
+                    "output_variability": overall["std"]
                 },
-                "seasonal_patterns": seasonal_data,
-                "daily_cycle": {
-                    str(hour): float(country_data[data['datetime'].dt.hour == hour].mean())
-                    for hour in range(24)
+                "seasonal_patterns": {
+                    season: profile.stats(column, months)["mean"] for season, months in SEASON_MONTHS.items()
                 },
+                "daily_cycle": {str(hour): float(value) for hour, value in daily_cycle.items()},
                 "optimal_generation_hours": {
-                    "start_hour": int(country_data.groupby(data['datetime'].dt.hour).mean().nlargest(8).index[0]),
-                    "peak_hour": int(country_data.groupby(data['datetime'].dt.hour).mean().idxmax()),
-                    "end_hour": int(country_data.groupby(data['datetime'].dt.hour).mean().nlargest(8).index[-1])
+                    "start_hour": int(ranked_hours.index[0]),
+                    "peak_hour": int(daily_cycle.idxmax()),
+                    "end_hour": int(ranked_hours.index[-1]),
+                    "best_8_hour_window": best_window(daily_cycle.to_numpy())
                 }
             }
         except Exception as e:
@@ -272,9 +402,7 @@ class SolarAnalysisTool(SingleMessageTool):
                 raise ValueError(f"No data available for country code: {country1}")
             if country2 not in data.columns:
                 raise ValueError(f"No data available for country code: {country2}")
-            
-            data['datetime'] = pd.to_datetime(data['time'])
-            
+
             # Calculate metrics for both countries
             metrics1 = self._calculate_country_metrics(data, country1)
             metrics2 = self._calculate_country_metrics(data, country2)
@@ -306,66 +434,78 @@ class SolarAnalysisTool(SingleMessageTool):
         except Exception as e:
             raise Exception(f"Error comparing regions: {str(e)}")
 
-    def analyze_seasonal_efficiency(self, data: pd.DataFrame, country_code: str = None):
+    def analyze_seasonal_efficiency(self, data: pd.DataFrame, country_code: str = None, region: str = None):
         """Analyze seasonal solar efficiency patterns."""
         try:
-            data['datetime'] = pd.to_datetime(data['time'])
-            
-            if country_code:
-                if country_code not in data.columns:
-                    raise ValueError(f"No data available for country code: {country_code}")
-                solar_data = data[country_code]
-            else:
-                solar_data = data.drop(['time', 'datetime'], axis=1).mean(axis=1)
-            
-            # Calculate seasonal metrics
-            seasonal_data = {
-                "winter": solar_data[data['datetime'].dt.month.isin([12,1,2])],
-                "spring": solar_data[data['datetime'].dt.month.isin([3,4,5])],
-                "summer": solar_data[data['datetime'].dt.month.isin([6,7,8])],
-                "fall": solar_data[data['datetime'].dt.month.isin([9,10,11])]
-            }
-            
+            profile, column = self._profile(data, country_code, region)
+            seasonal_stats = {season: profile.stats(column, months) for season, months in SEASON_MONTHS.items()}
+            seasonal_means = {season: stats["mean"] for season, stats in seasonal_stats.items()}
+
             return {
                 "analysis": "seasonal_efficiency",
                 "seasonal_metrics": {
                     season: {
-                        "average_output": float(data.mean()),
-                        "peak_output": float(data.max()),
-                        "output_stability": float(data.std() / data.mean()),  # Coefficient of variation
-                        "daylight_hours": float(len(data[data > 0]) / len(data) * 24)
+                        "average_output": stats["mean"],
+                        "peak_output": stats["max"],
+                        "output_stability": stats["std"] / stats["mean"],  # Coefficient of variation
+                        "daylight_hours": stats["daylight_hours"]
                     }
-                    for season, data in seasonal_data.items()
+                    for season, stats in seasonal_stats.items()
                 },
                 "seasonal_comparisons": {
-                    "best_season": max(seasonal_data.items(), key=lambda x: x[1].mean())[0],
-                    "worst_season": min(seasonal_data.items(), key=lambda x: x[1].mean())[0],
-                    "seasonal_variation": float(max(d.mean() for d in seasonal_data.values()) - 
-                                              min(d.mean() for d in seasonal_data.values()))
+                    "best_season": max(seasonal_means, key=seasonal_means.get),
+                    "worst_season": min(seasonal_means, key=seasonal_means.get),
+                    "seasonal_variation": float(max(seasonal_means.values()) - min(seasonal_means.values()))
                 },
                 "monthly_progression": {
-                    str(month): float(solar_data[data['datetime'].dt.month == month].mean())
-                    for month in range(1, 13)
+                    str(month): float(value) for month, value in enumerate(profile.monthly_means(column), 1)
                 }
             }
         except Exception as e:
             raise Exception(f"Error analyzing seasonal efficiency: {str(e)}")
 
+    def analyze_variability(self, data: pd.DataFrame, country_code: str = None, region: str = None):
+        """Ramp rates and 3h/24h/7d variability for a country or region, or a ranking of all countries."""
+        try:
+            if country_code or region:
+                metrics = self._variability(data, region)
+                name = self._regions(data).resolve(region)[0] if region else country_code
+                return {
+                    "analysis": "variability",
+                    "country_code": country_code,
+                    **({"region": region} if region else {}),
+                    **metrics.summary(name)
+                }
+
+            ranking = self._variability(data).ranking()
+            return {
+                "analysis": "variability",
+                "ranking_window": "24h",
+                "countries": [
+                    {
+                        "country_code": row["name"],
+                        "average_output": float(row["mean"]),
+                        "mean_absolute_ramp": float(row["mean_abs_ramp"]),
+                        "p95_absolute_ramp": float(row["p95_abs_ramp"]),
+                        "mean_24h_rolling_std": float(row["rolling_std"])
+                    }
+                    for row in ranking.to_dict("records")
+                ]
+            }
+        except Exception as e:
+            raise Exception(f"Error analyzing variability: {str(e)}")
+
     def _calculate_country_metrics(self, data: pd.DataFrame, country_code: str) -> dict:
         """Helper function to calculate comprehensive metrics for a country."""
-        country_data = data[country_code]
-        
-        seasonal_output = {
-            "winter": float(country_data[data['datetime'].dt.month.isin([12,1,2])].mean()),
-            "spring": float(country_data[data['datetime'].dt.month.isin([3,4,5])].mean()),
-            "summer": float(country_data[data['datetime'].dt.month.isin([6,7,8])].mean()),
-            "fall": float(country_data[data['datetime'].dt.month.isin([9,10,11])].mean())
-        }
-        
+        daily = self._daily(data)
+        overall = daily.hourly_stats(country_code)
+
         return {
-            "average_output": float(country_data.mean()),
-            "peak_output": float(country_data.max()),
-            "daylight_hours": float(len(country_data[country_data > 0]) / len(country_data) * 24),
-            "output_stability": float(country_data.std() / country_data.mean()),
-            "seasonal_output": seasonal_output
-        }
\ No newline at end of file
+            "average_output": overall["mean"],
+            "peak_output": overall["max"],
+            "daylight_hours": overall["daylight_hours"],
+            "output_stability": overall["std"] / overall["mean"],
+            "seasonal_output": {
+                season: daily.hourly_stats(country_code, months)["mean"] for season, months in SEASON_MONTHS.items()
+            }
+        }
@@ -0,0 +1,105 @@
+# tools/solar_comparison.py
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from Tools.solar_daily import country_columns
+
+# A day is a disagreement day when its mean absolute difference is this many
+# standard deviations above the country's average daily absolute difference
+DISAGREEMENT_STD = 2.0
+
+
+def runs(mask: np.ndarray) -> np.ndarray:
+    """(start, end) index pairs, end exclusive, of the runs of True in a boolean array."""
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.column_stack([np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)])
+
+
+class SourceComparison:
+    """
+    SARAH vs MERRA statistics for every country the two hourly matrices share.
+
+    The matrices are aligned on their common timestamps once; bias, RMSE and
+    correlation are then computed column-wise over all countries together and
+    only the per-country results and daily absolute differences are kept.
+    """
+
+    def __init__(self, sarah: pd.DataFrame, merra: pd.DataFrame):
+        """Align both datasets on time and country and compute the statistics."""
+        sarah_times = pd.to_datetime(sarah['time']).to_numpy()
+        merra_times = pd.to_datetime(merra['time']).to_numpy()
+        common_times, sarah_rows, merra_rows = np.intersect1d(sarah_times, merra_times, return_indices=True)
+        merra_countries = set(country_columns(merra))
+        self.countries = [country for country in country_columns(sarah) if country in merra_countries]
+        self.columns = {country: i for i, country in enumerate(self.countries)}
+        self.hours = len(common_times)
+
+        x = sarah[self.countries].to_numpy(dtype=float)[sarah_rows]
+        y = merra[self.countries].to_numpy(dtype=float)[merra_rows]
+        both = ~np.isnan(x) & ~np.isnan(y)
+        x, y = np.where(both, x, 0.0), np.where(both, y, 0.0)
+        n = both.sum(axis=0)
+        count = np.maximum(n, 1)
+
+        diff = x - y
+        self.sarah_mean = x.sum(axis=0) / count
+        self.merra_mean = y.sum(axis=0) / count
+        self.bias = diff.sum(axis=0) / count                      # SARAH - MERRA
+        self.mae = np.abs(diff).sum(axis=0) / count
+        self.rmse = np.sqrt((diff ** 2).sum(axis=0) / count)
+        dx = np.where(both, x - self.sarah_mean, 0.0)
+        dy = np.where(both, y - self.merra_mean, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.correlation = (dx * dy).sum(axis=0) / np.sqrt((dx ** 2).sum(axis=0) * (dy ** 2).sum(axis=0))
+        self.observations = n
+
+        # Hourly bias by calendar month (rows 1-12)
+        months = pd.DatetimeIndex(common_times).month.to_numpy()
+        self.monthly_bias = np.full((13, len(self.countries)), np.nan)
+        for month in np.unique(months):
+            rows = months == month
+            observed = both[rows].sum(axis=0)
+            self.monthly_bias[month] = np.where(observed > 0, diff[rows].sum(axis=0) / np.maximum(observed, 1), np.nan)
+
+        # Daily mean absolute difference, the basis of the disagreement windows
+        day_codes, days = pd.factorize(pd.DatetimeIndex(common_times).normalize(), sort=True)
+        starts = np.searchsorted(day_codes, np.arange(len(days)))
+        self.days = pd.DatetimeIndex(days)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.daily_abs_diff = np.add.reduceat(np.abs(diff), starts, axis=0) / np.add.reduceat(both, starts, axis=0)
+
+    def column(self, country_code: str) -> int:
+        """Column position of a country present in both datasets."""
+        if country_code not in self.columns:
+            raise ValueError(f"Country code {country_code} is not available in both SARAH and MERRA data")
+        return self.columns[country_code]
+
+    def table(self) -> pd.DataFrame:
+        """One row per country, largest RMSE first."""
+        return pd.DataFrame({
+            "country": self.countries,
+            "sarah_mean": self.sarah_mean,
+            "merra_mean": self.merra_mean,
+            "bias": self.bias,
+            "mae": self.mae,
+            "rmse": self.rmse,
+            "correlation": self.correlation,
+        }).sort_values("rmse", ascending=False, kind="stable").reset_index(drop=True)
+
+    def disagreement_windows(self, country_code: str, limit: int = 5) -> List[dict]:
+        """Runs of consecutive days with unusually large SARAH/MERRA differences, worst first."""
+        daily = self.daily_abs_diff[:, self.column(country_code)]
+        threshold = np.nanmean(daily) + DISAGREEMENT_STD * np.nanstd(daily)
+        windows = []
+        for start, end in runs(daily > threshold):
+            windows.append({
+                "start": str(self.days[start].date()),
+                "end": str(self.days[end - 1].date()),
+                "days": int(end - start),
+                "mean_absolute_difference": float(np.nanmean(daily[start:end])),
+            })
+        windows.sort(key=lambda window: -window["mean_absolute_difference"] * window["days"])
+        return windows[:limit]
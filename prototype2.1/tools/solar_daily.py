@@ -0,0 +1,145 @@
+# tools/solar_daily.py
+
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Month lists of the meteorological seasons
+SEASON_MONTHS = {"winter": (12, 1, 2), "spring": (3, 4, 5), "summer": (6, 7, 8), "fall": (9, 10, 11)}
+# Columns of the hourly solar matrices that aren't countries
+NON_COUNTRY_COLUMNS = ("time", "datetime")
+
+
+def country_columns(data: pd.DataFrame) -> list:
+    """Country columns of an hourly time x country matrix."""
+    return [col for col in data.columns if col not in NON_COUNTRY_COLUMNS]
+
+
+def minutes_to_clock(minutes: float) -> str:
+    """Format minutes since midnight as 'HH:MM:00'."""
+    minutes = int(minutes)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}:00"
+
+
+class SolarDailyTable:
+    """
+    One row per day and one column per country (plus the cross-country mean) of an
+    hourly solar matrix: daylight hours, daily max, first/last light and energy.
+
+    Built in a single pass with np.*.reduceat over the day boundaries, so daily
+    analyses work on days x countries instead of regrouping every hour.
+    """
+
+    # Column name used for the mean over all countries
+    MEAN = "mean"
+
+    def __init__(self, data: pd.DataFrame):
+        """Aggregate the hourly data (a 'time' column plus one column per country) by day."""
+        times = pd.to_datetime(data['time'])
+        self.countries = country_columns(data)
+        values = data[self.countries].to_numpy(dtype=float)
+        values = np.column_stack([values, np.nanmean(values, axis=1) if self.countries else np.zeros(len(values))])
+        self.columns = {country: i for i, country in enumerate(self.countries)}
+        self.columns[self.MEAN] = len(self.countries)
+
+        day_codes, days = pd.factorize(times.dt.normalize(), sort=True)
+        order = np.argsort(day_codes, kind='stable')
+        values = values[order]
+        starts = np.searchsorted(day_codes[order], np.arange(len(days)))
+        minutes = (times.dt.hour * 60 + times.dt.minute).to_numpy()[order]
+
+        self.dates = pd.DatetimeIndex(days)
+        self.months = self.dates.month.to_numpy()
+        known = ~np.isnan(values)
+        light = np.where(known, values, 0.0) > 0
+        with np.errstate(invalid='ignore'):
+            self.hours = np.add.reduceat(known, starts, axis=0)                # hours with a value
+            self.daylight_hours = np.add.reduceat(light, starts, axis=0)
+            self.daily_max = np.fmax.reduceat(values, starts, axis=0)
+            self.energy = np.add.reduceat(np.where(known, values, 0.0), starts, axis=0)
+            self.sumsq = np.add.reduceat(np.where(known, values, 0.0) ** 2, starts, axis=0)
+            first = np.minimum.reduceat(np.where(light, minutes[:, None], np.inf), starts, axis=0)
+            last = np.maximum.reduceat(np.where(light, minutes[:, None], -np.inf), starts, axis=0)
+        # Minutes since midnight of the first/last hour with output (NaN on days without any)
+        self.first_light = np.where(np.isfinite(first), first, np.nan)
+        self.last_light = np.where(np.isfinite(last), last, np.nan)
+
+    def column(self, country_code: str = None) -> int:
+        """Column position of a country, or of the cross-country mean when country_code is None."""
+        if country_code is None:
+            return self.columns[self.MEAN]
+        if country_code not in self.columns or country_code == self.MEAN:
+            raise ValueError(f"No data available for country code: {country_code}")
+        return self.columns[country_code]
+
+    def month_mask(self, months: Sequence[int]) -> np.ndarray:
+        """Days falling in any of the given months."""
+        return np.isin(self.months, months)
+
+    def hourly_stats(self, country_code: str = None, months: Sequence[int] = None) -> Dict[str, float]:
+        """Mean, std, peak and mean daylight hours/day of the hourly values over the selected days."""
+        col = self.column(country_code)
+        days = self.month_mask(months) if months is not None else slice(None)
+        hours = self.hours[days, col].sum()
+        total = self.energy[days, col].sum()
+        mean = total / hours if hours else np.nan
+        # Sample standard deviation from the daily sums of squares
+        variance = (self.sumsq[days, col].sum() - hours * mean ** 2) / (hours - 1) if hours > 1 else np.nan
+        return {
+            "mean": float(mean),
+            "std": float(np.sqrt(max(variance, 0.0))),
+            "max": float(np.nanmax(self.daily_max[days, col])) if hours else float('nan'),
+            "daylight_hours": float(self.daylight_hours[days, col].mean()),
+        }
+
+
+class ClearSkyDays:
+    """Clear-sky days of every column of a SolarDailyTable: days whose max reaches the column's quantile."""
+
+    def __init__(self, daily: SolarDailyTable, quantile: float = 0.9):
+        """Classify all countries at once from the daily maxima."""
+        self.daily = daily
+        self.thresholds = np.nanquantile(daily.daily_max, quantile, axis=0)
+        self.mask = daily.daily_max >= self.thresholds
+        self.day_counts = self.mask.sum(axis=0)
+        self.days = (~np.isnan(daily.daily_max)).sum(axis=0)
+        self.intensity = np.where(self.mask, daily.daily_max, 0.0).sum(axis=0) / np.maximum(self.day_counts, 1)
+        # Clear-sky days per month (rows 1-12) and column, as one month one-hot x mask product
+        months = np.zeros((13, len(daily.months)))
+        months[daily.months, np.arange(len(daily.months))] = 1
+        self.monthly_counts = (months @ self.mask).astype(np.int64)
+
+    def season_share(self, season: str) -> np.ndarray:
+        """Fraction of each column's clear-sky days that fall in a season."""
+        counts = self.monthly_counts[list(SEASON_MONTHS[season])].sum(axis=0)
+        return np.where(self.day_counts > 0, counts / np.maximum(self.day_counts, 1), 0.0)
+
+    def summary(self, col: int) -> dict:
+        """The clear_sky_patterns result for one column."""
+        return {
+            "clear_sky_metrics": {
+                "clear_sky_threshold": float(self.thresholds[col]),
+                "clear_sky_days_percentage": float(self.day_counts[col] / self.days[col]),
+                "average_clear_sky_intensity": float(self.intensity[col])
+            },
+            "monthly_distribution": {str(month): int(self.monthly_counts[month, col]) for month in range(1, 13)},
+            "seasonal_patterns": {
+                "summer_clear_days": float(self.season_share("summer")[col]),
+                "winter_clear_days": float(self.season_share("winter")[col])
+            }
+        }
+
+    def ranking(self) -> pd.DataFrame:
+        """One row per country, highest clear-sky intensity first."""
+        countries = self.daily.countries
+        table = pd.DataFrame({
+            "country": countries,
+            "clear_sky_threshold": self.thresholds[:len(countries)],
+            "clear_sky_days": self.day_counts[:len(countries)],
+            "average_clear_sky_intensity": self.intensity[:len(countries)],
+            "summer_share": self.season_share("summer")[:len(countries)],
+            "winter_share": self.season_share("winter")[:len(countries)],
+            "peak_month": self.monthly_counts[1:, :len(countries)].argmax(axis=0) + 1,
+        })
+        return table.sort_values("average_clear_sky_intensity", ascending=False, kind="stable").reset_index(drop=True)
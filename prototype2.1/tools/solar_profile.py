@@ -0,0 +1,94 @@
+# tools/solar_profile.py
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+ALL_MONTHS = tuple(range(1, 13))
+
+
+class ProfileTensor:
+    """
+    Month x hour-of-day x column sufficient statistics of an hourly matrix:
+    count, sum, sum of squares, min, max and count of hours with output.
+
+    Each statistic is a (12, 24, columns) array built in one sorted reduceat pass,
+    so daily cycles and seasonal/monthly figures of any column are sums over a
+    few of the 288 month/hour cells instead of masks over every hour.
+    """
+
+    def __init__(self, values: np.ndarray, months: np.ndarray, hours: np.ndarray, columns: List[str]):
+        """
+        Args:
+            values: (hours, columns) array, NaN for missing values
+            months: Calendar month (1-12) of every row
+            hours: Hour of day (0-23) of every row
+            columns: Column names, in the order of values' columns
+        """
+        self.columns = {column: i for i, column in enumerate(columns)}
+        cells = (np.asarray(months) - 1) * 24 + np.asarray(hours)
+        order = np.argsort(cells, kind='stable')
+        cells = cells[order]
+        values = np.asarray(values, dtype=float)[order]
+        present = np.unique(cells)
+        starts = np.searchsorted(cells, present)
+
+        known = ~np.isnan(values)
+        filled = np.where(known, values, 0.0)
+        shape = (12 * 24, values.shape[1])
+        self.count, self.sum, self.sumsq, self.positive = (np.zeros(shape) for _ in range(4))
+        self.min, self.max = np.full(shape, np.nan), np.full(shape, np.nan)
+        if len(present):
+            self.count[present] = np.add.reduceat(known, starts, axis=0)
+            self.sum[present] = np.add.reduceat(filled, starts, axis=0)
+            self.sumsq[present] = np.add.reduceat(filled ** 2, starts, axis=0)
+            self.positive[present] = np.add.reduceat(filled > 0, starts, axis=0)
+            self.min[present] = np.fmin.reduceat(values, starts, axis=0)
+            self.max[present] = np.fmax.reduceat(values, starts, axis=0)
+        for name in ("count", "sum", "sumsq", "positive", "min", "max"):
+            setattr(self, name, getattr(self, name).reshape(12, 24, -1))
+
+    def column(self, name: str) -> int:
+        if name not in self.columns:
+            raise ValueError(f"No data available for country code: {name}")
+        return self.columns[name]
+
+    def stats(self, column: str, months: Sequence[int] = ALL_MONTHS) -> Dict[str, float]:
+        """Mean, sample std, min, max and daylight hours/day of a column over the given months."""
+        col = self.column(column)
+        rows = np.asarray(months) - 1
+        count = self.count[rows, :, col].sum()
+        mean = self.sum[rows, :, col].sum() / count if count else np.nan
+        variance = (self.sumsq[rows, :, col].sum() - count * mean ** 2) / (count - 1) if count > 1 else np.nan
+        return {
+            "mean": float(mean),
+            "std": float(np.sqrt(max(variance, 0.0))),
+            "min": float(np.nanmin(self.min[rows, :, col])) if count else float('nan'),
+            "max": float(np.nanmax(self.max[rows, :, col])) if count else float('nan'),
+            "daylight_hours": float(self.positive[rows, :, col].sum() / count * 24) if count else float('nan'),
+        }
+
+    def daily_cycle(self, column: str, months: Sequence[int] = ALL_MONTHS) -> np.ndarray:
+        """Mean value of each hour of the day (0-23) over the given months."""
+        col = self.column(column)
+        rows = np.asarray(months) - 1
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.sum[rows, :, col].sum(axis=0) / self.count[rows, :, col].sum(axis=0)
+
+    def monthly_means(self, column: str) -> np.ndarray:
+        """Mean value of each calendar month (index 0 = January)."""
+        col = self.column(column)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.sum[:, :, col].sum(axis=1) / self.count[:, :, col].sum(axis=1)
+
+
+def best_window(cycle: np.ndarray, hours: int = 8) -> Dict[str, float]:
+    """The run of consecutive hours (wrapping past midnight) with the highest mean of a 24-hour cycle."""
+    cycle = np.nan_to_num(cycle)
+    totals = np.convolve(np.concatenate([cycle, cycle[:hours - 1]]), np.ones(hours), mode='valid')
+    start = int(np.argmax(totals))
+    return {
+        "start_hour": start,
+        "end_hour": (start + hours - 1) % 24,
+        "average_output": float(totals[start] / hours),
+    }
@@ -0,0 +1,128 @@
+from typing import Callable, Dict
+from Base_Tool.base_tool import SingleMessageTool
+import duckdb
+import json
+import re
+import threading
+import time
+
+# Statement types allowed through the read-only guard
+READ_ONLY_STATEMENTS = {"SELECT"}
+
+
+class SQLQueryTool(SingleMessageTool):
+    """Tool that answers aggregate questions with read-only SQL over the loaded datasets (DuckDB)."""
+
+    def __init__(self, datasets_dict, views: Dict[str, Callable] = None, row_limit: int = 200,
+                 timeout: float = 10.0):
+        """
+        Initialize with the same datasets dictionary used by the PandasAI router.
+
+        Args:
+            datasets_dict: Dictionary mapping dataset names to their pandas DataFrames
+            views: Optional name -> callable returning a DataFrame, for tables that are
+                   built lazily (e.g. the router's summary views)
+            row_limit: Maximum number of rows returned by a query
+            timeout: Seconds after which a running query is interrupted
+        """
+        self.datasets = datasets_dict
+        self.views = views or {}
+        self.row_limit = row_limit
+        self.timeout = timeout
+
+        # DuckDB scans the pandas DataFrames in place; no data is copied into the database.
+        # External access is disabled and locked, so queries can't read or write files.
+        self._conn = duckdb.connect(config={"enable_external_access": False})
+        self._conn.execute("SET lock_configuration = true")
+        self._lock = threading.Lock()
+
+    def get_name(self) -> str:
+        return "sql_query"
+
+    def get_description(self) -> str:
+        tables = "\n".join(
+            f"- {name}({', '.join(str(col) for col in df.columns)})" for name, df in self.datasets.items()
+        )
+        views = "\n".join(f"- {name}" for name in self.views)
+        return (
+            "Run a read-only SQL SELECT query (DuckDB dialect) over the datasets and return the result rows. "
+            "Use it for aggregate questions that can be expressed directly in SQL (averages, counts, rankings, "
+            "group-bys, filters); it answers in milliseconds without another model. "
+            "Quote column names containing spaces or special characters with double quotes.\n"
+            f"Tables:\n{tables}" + (f"\nPre-aggregated tables:\n{views}" if views else "")
+        )
+
+    def get_params_definition(self) -> Dict[str, dict]:
+        return {
+            "query": {
+                "description": "A single SQL SELECT statement, e.g. "
+                               "'SELECT make, AVG(co2) FROM fuel_data GROUP BY make ORDER BY 2 DESC'",
+                "type": "string",
+                "required": True
+            },
+            "max_rows": {
+                "description": f"Maximum number of rows to return (at most {self.row_limit})",
+                "type": "integer",
+                "required": False
+            }
+        }
+
+    def run_impl(self, query: str, max_rows: int = None):
+        try:
+            statement = self._validate_query(query)
+            if max_rows is not None and max_rows < 1:
+                raise ValueError("max_rows must be a positive integer")
+            limit = min(max_rows or self.row_limit, self.row_limit)
+
+            with self._lock:
+                cursor = self._conn.cursor()
+            try:
+                self._register_tables(cursor, statement)
+
+                # Interrupt queries that run past the timeout
+                timer = threading.Timer(self.timeout, cursor.interrupt)
+                start = time.perf_counter()
+                timer.start()
+                try:
+                    result = cursor.execute(f"SELECT * FROM (\n{statement}\n) AS result LIMIT {limit + 1}").fetchdf()
+                except duckdb.InterruptException:
+                    raise TimeoutError(f"Query exceeded the {self.timeout:.0f}s time limit")
+                finally:
+                    timer.cancel()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+            finally:
+                cursor.close()
+
+            truncated = len(result) > limit
+            result = result.head(limit)
+            return {
+                "columns": [str(col) for col in result.columns],
+                "rows": json.loads(result.to_json(orient="records", date_format="iso")),
+                "row_count": len(result),
+                "truncated": truncated,
+                "elapsed_ms": round(elapsed_ms, 2)
+            }
+        except Exception as e:
+            return {
+                "error": str(e),
+                "note": "The query must be a single read-only SELECT over the listed tables"
+            }
+
+    def _validate_query(self, query: str) -> str:
+        """Allow exactly one SELECT statement (including WITH ... SELECT)."""
+        statements = self._conn.extract_statements(query)
+        if len(statements) != 1:
+            raise ValueError("Exactly one SQL statement is allowed")
+        if statements[0].type.name not in READ_ONLY_STATEMENTS:
+            raise ValueError(f"Only SELECT queries are allowed, got {statements[0].type.name}")
+        return statements[0].query.strip().rstrip(";")
+
+    def _register_tables(self, cursor, statement: str):
+        """Expose the datasets referenced by a statement to the cursor, without copying them."""
+        referenced = set(re.findall(r"[A-Za-z_][A-Za-z0-9_]*", statement))
+        for name, df in self.datasets.items():
+            if name in referenced:
+                cursor.register(name, df)
+        for name, build in self.views.items():
+            if name in referenced and name not in self.datasets:
+                cursor.register(name, build())
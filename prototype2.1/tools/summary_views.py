@@ -0,0 +1,125 @@
+# tools/summary_views.py
+
+from typing import Callable, Dict, Tuple
+
+import pandas as pd
+
+TIME_COLUMNS = ("time", "date", "datetime")
+DERIVED_COLUMNS = ("time", "datetime", "season")
+
+
+def _time_column(data: pd.DataFrame) -> str:
+    for column in TIME_COLUMNS:
+        if column in data.columns:
+            return column
+    raise ValueError("No time column found in dataset")
+
+
+def _value_columns(data: pd.DataFrame):
+    return [col for col in data.select_dtypes(include="number").columns if col not in DERIVED_COLUMNS]
+
+
+def city_yearly_temperature(city_data: pd.DataFrame) -> pd.DataFrame:
+    """One row per country, city and year with temperature statistics over the monthly readings."""
+    year = pd.to_datetime(city_data["dt"], format="%Y-%m-%d", errors="coerce").dt.year.rename("year")
+    summary = city_data.groupby([city_data["Country"], city_data["City"], year], sort=True).agg(
+        avg_temperature=("AverageTemperature", "mean"),
+        min_monthly_temperature=("AverageTemperature", "min"),
+        max_monthly_temperature=("AverageTemperature", "max"),
+        avg_uncertainty=("AverageTemperatureUncertainty", "mean"),
+        months_reported=("AverageTemperature", "count"),
+        latitude=("Latitude", "first"),
+        longitude=("Longitude", "first"),
+    )
+    return summary.reset_index().rename(columns={"Country": "country", "City": "city"})
+
+
+def weather_country_daily(weather_data: pd.DataFrame) -> pd.DataFrame:
+    """One row per country and day: daily means of every hourly measurement plus key extremes and totals."""
+    date = pd.to_datetime(weather_data[_time_column(weather_data)]).dt.date.rename("date")
+    grouped = weather_data.groupby([weather_data["country"], date], sort=True)
+
+    summary = grouped[_value_columns(weather_data)].mean().add_prefix("avg_")
+    extremes = {
+        "max_temperature_2m": ("temperature_2m", "max"),
+        "min_temperature_2m": ("temperature_2m", "min"),
+        "total_precipitation": ("precipitation", "sum"),
+        "max_wind_speed_10m": ("wind_speed_10m", "max"),
+        "max_wind_gusts_10m": ("wind_gusts_10m", "max"),
+        "max_uv_index": ("uv_index", "max"),
+    }
+    available = {name: spec for name, spec in extremes.items() if spec[0] in weather_data.columns}
+    if available:
+        summary = summary.join(grouped.agg(**available))
+    return summary.reset_index()
+
+
+def country_monthly_means(data: pd.DataFrame, value_name: str, type_separator: str = None) -> pd.DataFrame:
+    """
+    Reshape an hourly time x country matrix into one row per country, year and month.
+
+    Args:
+        data: Wide DataFrame with a 'time' column and one column per country
+        value_name: Name of the measured quantity (e.g. 'capacity_factor')
+        type_separator: If set, column names like 'DE_ON' are split into country and type
+    """
+    times = pd.to_datetime(data[_time_column(data)])
+    columns = _value_columns(data)
+    grouped = data[columns].groupby([times.dt.year.rename("year"), times.dt.month.rename("month")])
+
+    means = grouped.mean().stack().rename(f"mean_{value_name}")
+    maxima = grouped.max().stack().rename(f"max_{value_name}")
+    summary = pd.concat([means, maxima], axis=1).reset_index().rename(columns={"level_2": "country"})
+
+    keys = ["country", "year", "month"]
+    if type_separator:
+        split = summary["country"].str.split(type_separator, n=1, expand=True)
+        summary["country"] = split[0]
+        summary["type"] = split[1]
+        keys.insert(1, "type")
+
+    return summary[keys + [f"mean_{value_name}", f"max_{value_name}"]]
+
+
+# name -> (source dataset, builder, description)
+SUMMARY_VIEWS: Dict[str, Tuple[str, Callable[[pd.DataFrame], pd.DataFrame], str]] = {
+    "city_yearly_temperature": (
+        "city_data",
+        city_yearly_temperature,
+        "PRE-AGGREGATED from city_data - prefer it for any yearly, decade or long-term city/country "
+        "temperature question. One row per country, city and year with avg_temperature, "
+        "min_monthly_temperature, max_monthly_temperature, avg_uncertainty, months_reported, latitude, longitude."
+    ),
+    "weather_country_daily": (
+        "weather_data",
+        weather_country_daily,
+        "PRE-AGGREGATED from weather_data - prefer it for daily, monthly or country-level weather questions. "
+        "One row per country and date with avg_<measurement> daily means of every hourly measurement, "
+        "plus max/min_temperature_2m, total_precipitation, max_wind_speed_10m, max_wind_gusts_10m, max_uv_index."
+    ),
+    "wind_national_monthly": (
+        "wind_national_data",
+        lambda data: country_monthly_means(data, "capacity_factor"),
+        "PRE-AGGREGATED from wind_national_data - prefer it for monthly, seasonal or yearly wind questions. "
+        "One row per country (ISO code), year and month with mean_capacity_factor and max_capacity_factor."
+    ),
+    "onoffshore_wind_monthly": (
+        "onoffshore_wind_data",
+        lambda data: country_monthly_means(data, "capacity_factor", type_separator="_"),
+        "PRE-AGGREGATED from onoffshore_wind_data - prefer it for monthly, seasonal or yearly onshore/offshore "
+        "questions. One row per country, type ('ON'/'OFF'), year and month with mean_capacity_factor and "
+        "max_capacity_factor."
+    ),
+    "solar_sarah_monthly": (
+        "solar_sarah_data",
+        lambda data: country_monthly_means(data, "solar_output"),
+        "PRE-AGGREGATED from solar_sarah_data - prefer it for monthly, seasonal or yearly solar questions. "
+        "One row per country, year and month with mean_solar_output and max_solar_output."
+    ),
+    "solar_merra_monthly": (
+        "solar_merra_data",
+        lambda data: country_monthly_means(data, "solar_output"),
+        "PRE-AGGREGATED from solar_merra_data - prefer it for monthly, seasonal or yearly solar questions. "
+        "One row per country, year and month with mean_solar_output and max_solar_output."
+    ),
+}
@@ -0,0 +1,71 @@
+# tools/tool_call_recorder.py
+
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Iterator
+
+
+def result_digest(result) -> str:
+    """Return a stable hash of a tool result, used to detect drift between versions."""
+    payload = json.dumps(result, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def load_tool_calls(path: str) -> Iterator[dict]:
+    """Yield the recorded tool calls from a JSONL file."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ToolCallRecorder:
+    """
+    Appends every tool invocation to a JSONL file.
+
+    Each line holds the tool name, its arguments, the latency and a digest of
+    the result, so recorded traffic can later be replayed offline against the
+    tool instances without calling the LLM.
+    """
+
+    def __init__(self, path: str):
+        """Initialize with the JSONL file to append to."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, tool: str, arguments: dict, latency_ms: float, result=None, error: str = None):
+        """Append one tool call to the log."""
+        entry = {
+            "timestamp": time.time(),
+            "tool": tool,
+            "arguments": arguments,
+            "latency_ms": round(latency_ms, 3),
+            "result_hash": result_digest(result) if error is None else None,
+            "error": error,
+        }
+        line = json.dumps(entry, default=str, ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def wrap(self, tool: str, function: Callable) -> Callable:
+        """Return a version of a tool function that records each call."""
+        @functools.wraps(function)
+        def recorded(**arguments):
+            start = time.perf_counter()
+            try:
+                result = function(**arguments)
+            except Exception as e:
+                self.record(tool, arguments, (time.perf_counter() - start) * 1000, error=str(e))
+                raise
+            self.record(tool, arguments, (time.perf_counter() - start) * 1000, result=result)
+            return result
+
+        recorded.recorder = self
+        return recorded
@@ -1,15 +1,33 @@
-from typing import Dict, Optional, List, Tuple
+from typing import Callable, Dict, Optional, List, Tuple
 from Base_Tool.base_tool import SingleMessageTool
+from Tools.dataset_version import dataset_fingerprint
+from Tools.tornado_geometry import direction_summary, track_geometry
+from Tools.tornado_cube import TornadoCube, VARIABLES
+from Tools.tornado_spatial import TrackIndex
+from Tools.tornado_density import DensityEngine
+from Tools.tornado_outbreaks import OutbreakDetector
+from Tools.tornado_time import MINUTES_PER_DAY, diurnal_histogram, parse_minutes_of_day, time_of_day_counts
 import pandas as pd
 import numpy as np
-from math import atan2, degrees
+import threading
+
+# Columns listed for each track returned by the spatial searches
+TRACK_COLUMNS = ['date', 'time', 'st', 'mag', 'inj', 'fat', 'loss', 'len', 'wid', 'slat', 'slon', 'elat', 'elon']
+MAX_LISTED_TRACKS = 25
 
 class TornadoAnalysisTool(SingleMessageTool):
     """Tool for analyzing tornado data from Tornados.csv"""
 
     def __init__(self, tornado_data):
         """Initialize with tornado data."""
+        # Parse the 'HH:MM:SS' times once; the column follows every state/year filter
+        if 'time' in tornado_data.columns:
+            tornado_data = tornado_data.assign(minute_of_day=parse_minutes_of_day(tornado_data['time']))
         self.tornado_data = tornado_data
+        self._derived = {}  # name -> structure precomputed for _derived_version
+        self._derived_version = None
+        self._derived_source = None
+        self._derived_lock = threading.Lock()
 
     def get_name(self) -> str:
         return "analyze_tornado_data"
@@ -23,13 +41,21 @@ class TornadoAnalysisTool(SingleMessageTool):
             "analysis_type": {
                 "description": ("Type of analysis: 'severity_impact', 'path_characteristics', "
                               "'temporal_patterns', 'state_comparison', 'economic_impact', "
-                              "'movement_analysis', 'f_scale_distribution'"),
+                              "'movement_analysis', 'f_scale_distribution', 'radius_search' (tornadoes "
+                              "passing within radius_km of latitude/longitude), 'bbox_search' (tornadoes "
+                              "crossing a min/max latitude/longitude box), 'nearest_tracks' (the k tracks "
+                              "closest to latitude/longitude), 'density_heatmap' (grid cells with the "
+                              "most tornado tracks and path length), 'outbreak_detection' (clusters of "
+                              "min_tornadoes+ tornadoes within window_hours and radius_km of each other, "
+                              "and how often several tornadoes occur on the same day), 'diurnal_distribution' "
+                              "(tornado counts per time-of-day slot of bin_minutes)"),
                 "type": "string",
                 "required": True,
                 "enum": [
                     "severity_impact", "path_characteristics", "temporal_patterns",
                     "state_comparison", "economic_impact", "movement_analysis",
-                    "f_scale_distribution"
+                    "f_scale_distribution", "radius_search", "bbox_search", "nearest_tracks",
+                    "density_heatmap", "outbreak_detection", "diurnal_distribution"
                 ]
             },
             "state": {
@@ -51,13 +77,101 @@ class TornadoAnalysisTool(SingleMessageTool):
                 "description": "Minimum tornado path length for filtering",
                 "type": "number",
                 "required": False
+            },
+            "latitude": {
+                "description": "Latitude of the search point for radius_search and nearest_tracks (e.g., 35.47)",
+                "type": "number",
+                "required": False
+            },
+            "longitude": {
+                "description": "Longitude of the search point for radius_search and nearest_tracks (e.g., -97.52)",
+                "type": "number",
+                "required": False
+            },
+            "radius_km": {
+                "description": "Search radius in kilometers for radius_search, or the maximum distance "
+                               "between linked tornadoes for outbreak_detection (default 500)",
+                "type": "number",
+                "required": False
+            },
+            "min_latitude": {
+                "description": "Southern edge of the box for bbox_search",
+                "type": "number",
+                "required": False
+            },
+            "max_latitude": {
+                "description": "Northern edge of the box for bbox_search",
+                "type": "number",
+                "required": False
+            },
+            "min_longitude": {
+                "description": "Western edge of the box for bbox_search",
+                "type": "number",
+                "required": False
+            },
+            "max_longitude": {
+                "description": "Eastern edge of the box for bbox_search",
+                "type": "number",
+                "required": False
+            },
+            "start_year": {
+                "description": "First year (inclusive) for the spatial searches",
+                "type": "integer",
+                "required": False
+            },
+            "end_year": {
+                "description": "Last year (inclusive) for the spatial searches",
+                "type": "integer",
+                "required": False
+            },
+            "k": {
+                "description": "Number of tracks to return for nearest_tracks (default 5), of top "
+                               "cells for density_heatmap or of worst outbreaks for outbreak_detection (default 10)",
+                "type": "integer",
+                "required": False
+            },
+            "resolution_degrees": {
+                "description": "Grid cell size in degrees for density_heatmap (default 0.5)",
+                "type": "number",
+                "required": False
+            },
+            "min_magnitude": {
+                "description": "Only include tornadoes of at least this magnitude (density_heatmap)",
+                "type": "integer",
+                "required": False
+            },
+            "window_hours": {
+                "description": "Maximum time between linked tornadoes for outbreak_detection (default 24)",
+                "type": "number",
+                "required": False
+            },
+            "min_tornadoes": {
+                "description": "Minimum number of tornadoes in an outbreak (default 6)",
+                "type": "integer",
+                "required": False
+            },
+            "bin_minutes": {
+                "description": "Slot width in minutes for diurnal_distribution, e.g. 15 or 60 (default 60)",
+                "type": "integer",
+                "required": False
             }
         }
 
     def run_impl(self, analysis_type: str, state: str = None, comparison_state: str = None, 
-                 year: int = None, min_length: float = None):
+                 year: int = None, min_length: float = None, latitude: float = None,
+                 longitude: float = None, radius_km: float = None, min_latitude: float = None,
+                 max_latitude: float = None, min_longitude: float = None, max_longitude: float = None,
+                 start_year: int = None, end_year: int = None, k: int = None,
+                 resolution_degrees: float = None, min_magnitude: int = None, window_hours: float = None,
+                 min_tornadoes: int = None, bin_minutes: int = None):
         """Implement the tool logic."""
         try:
+            year_range = None
+            if start_year is not None or end_year is not None:
+                year_range = (start_year, end_year)
+            elif year:
+                year_range = (year, year)
+
             if analysis_type == "severity_impact":
                 return self.analyze_severity_impact(year, state)
             elif analysis_type == "path_characteristics":
@@ -74,66 +188,146 @@ class TornadoAnalysisTool(SingleMessageTool):
                 return self.analyze_tornado_movement(min_length)
             elif analysis_type == "f_scale_distribution":
                 return self.analyze_f_scale_distribution(state)
+            elif analysis_type == "radius_search":
+                if latitude is None or longitude is None or not radius_km:
+                    raise ValueError("latitude, longitude and radius_km are required for radius search")
+                return self.search_radius(latitude, longitude, radius_km, year_range)
+            elif analysis_type == "bbox_search":
+                if None in (min_latitude, max_latitude, min_longitude, max_longitude):
+                    raise ValueError("min/max latitude and longitude are required for bounding box search")
+                return self.search_bbox(min_latitude, max_latitude, min_longitude, max_longitude, year_range)
+            elif analysis_type == "nearest_tracks":
+                if latitude is None or longitude is None:
+                    raise ValueError("latitude and longitude are required for nearest track search")
+                return self.find_nearest_tracks(latitude, longitude, k or 5, year_range)
+            elif analysis_type == "density_heatmap":
+                return self.analyze_density_heatmap(resolution_degrees or 0.5, min_magnitude, state,
+                                                    year_range, k or 10)
+            elif analysis_type == "outbreak_detection":
+                return self.detect_outbreaks(window_hours or 24, radius_km or 500, min_tornadoes or 6,
+                                             state, year_range, k or 10)
+            elif analysis_type == "diurnal_distribution":
+                return self.analyze_diurnal_distribution(state, year_range, bin_minutes or 60)
             else:
                 raise ValueError(f"Unknown analysis type: {analysis_type}")
         except Exception as e:
             raise Exception(f"Error in tornado analysis: {str(e)}")
 
+    def _derived_data(self, name: str, build: Callable[[pd.DataFrame], object]):
+        """Return a structure precomputed from the tornado data, rebuilt only when the data changes."""
+        with self._derived_lock:
+            # Fingerprinting takes milliseconds, so it is only redone when tornado_data is replaced
+            data = self.tornado_data
+            if self._derived_source != (id(data), data.shape):
+                version = dataset_fingerprint(data)
+                if version != self._derived_version:
+                    self._derived = {}
+                self._derived_source = (id(data), data.shape)
+                self._derived_version = version
+            if name not in self._derived:
+                self._derived[name] = build(data)
+            return self._derived[name]
+
+    def _track_geometry(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Great-circle length and bearing of each track in data (see tornado_geometry.py)."""
+        return self._derived_data("track_geometry", track_geometry).loc[data.index]
+
+    def _cube(self) -> Optional[TornadoCube]:
+        """Pre-aggregated state x year x magnitude cube, or None if the data has missing values."""
+        return self._derived_data("cube", TornadoCube.build)
+
+    def _filter(self, state: str = None, year_range: Tuple[int, int] = None) -> pd.DataFrame:
+        """Raw rows for a state and inclusive year range, either bound may be None (used when there is no cube)."""
+        data = self.tornado_data
+        if state:
+            data = data[data['st'] == state]
+        if year_range and year_range[0] is not None:
+            data = data[data['yr'] >= year_range[0]]
+        if year_range and year_range[1] is not None:
+            data = data[data['yr'] <= year_range[1]]
+        return data
+
+    def _summary(self, state: str = None, year_range: Tuple[int, int] = None, by: str = None):
+        """
+        Count plus sum_<col> and mean_<col> of every cube variable, overall (one dict)
+        or per 'yr'/'mag' group (group -> dict, ascending, without empty groups).
+        """
+        cube = self._cube()
+        if cube is not None:
+            axis = {"yr": "year", "mag": "mag"}.get(by)
+            totals = cube.rollup(state or None, year_range, keep=(axis,) if axis else ())
+            columns = {"count": totals.count}
+            for var in VARIABLES:
+                columns[f"sum_{var}"] = totals.sum(var)
+                columns[f"mean_{var}"] = totals.mean(var)
+            if not by:
+                return {name: float(value) for name, value in columns.items()}
+            return {
+                label.item(): {name: float(values[i]) for name, values in columns.items()}
+                for i, label in enumerate(totals.labels[axis]) if totals.count[i] > 0
+            }
+
+        data = self._filter(state, year_range)
+        variables = [var for var in VARIABLES if var != by]
+        if not by:
+            return {"count": float(len(data)),
+                    **data[variables].sum().add_prefix("sum_").to_dict(),
+                    **data[variables].mean().add_prefix("mean_").to_dict()}
+        grouped = data.groupby(by)
+        summary = pd.concat([grouped.size().rename("count"),
+                             grouped[variables].sum().add_prefix("sum_"),
+                             grouped[variables].mean().add_prefix("mean_")], axis=1)
+        if by in VARIABLES:
+            summary[f"sum_{by}"] = summary.index.to_numpy(dtype=float) * summary['count']
+            summary[f"mean_{by}"] = summary.index.to_numpy(dtype=float)
+        return summary.to_dict(orient='index')
+
+    def _correlations(self, pairs, state: str = None, year_range: Tuple[int, int] = None) -> Dict:
+        """Pearson correlation for each (x, y) column pair, from the cube's sufficient statistics when possible."""
+        cube = self._cube()
+        if cube is not None:
+            totals = cube.rollup(state or None, year_range)
+            return {(x, y): float(totals.corr(x, y)) for x, y in pairs}
+        data = self._filter(state, year_range)
+        return {(x, y): float(data[x].corr(data[y])) for x, y in pairs}
+
     def analyze_severity_impact(self, year: int = None, state: str = None):
         """Analyze relationship between magnitude and impact."""
         try:
-            data = self.tornado_data
-            if year:
-                data = data[data['yr'] == year]
-            if state:
-                data = data[data['st'] == state]
-            
+            year_range = (year, year) if year else None
+            by_magnitude = sorted(self._summary(state, year_range, by='mag').items(),
+                                  key=lambda item: -item[1]['count'])
+            overall = self._summary(state, year_range)
+            correlations = self._correlations([('mag', 'inj'), ('mag', 'fat'), ('mag', 'loss')], state, year_range)
+
             return {
                 "analysis": "severity_impact",
                 "magnitude_distribution": {
                     str(mag): {
-                        "count": int(count),
-                        "avg_injuries": float(data[data['mag'] == mag]['inj'].mean()),
-                        "avg_fatalities": float(data[data['mag'] == mag]['fat'].mean()),
-                        "avg_loss": float(data[data['mag'] == mag]['loss'].mean())
+                        "count": int(row['count']),
+                        "avg_injuries": float(row['mean_inj']),
+                        "avg_fatalities": float(row['mean_fat']),
+                        "avg_loss": float(row['mean_loss'])
                     }
-                    for mag, count in data['mag'].value_counts().items()
+                    for mag, row in by_magnitude
                 },
                 "correlation": {
-                    "magnitude_injuries": float(data['mag'].corr(data['inj'])),
-                    "magnitude_fatalities": float(data['mag'].corr(data['fat'])),
-                    "magnitude_loss": float(data['mag'].corr(data['loss']))
+                    "magnitude_injuries": correlations[('mag', 'inj')],
+                    "magnitude_fatalities": correlations[('mag', 'fat')],
+                    "magnitude_loss": correlations[('mag', 'loss')]
                 },
                 "total_impact": {
-                    "total_injuries": int(data['inj'].sum()),
-                    "total_fatalities": int(data['fat'].sum()),
-                    "total_loss": float(data['loss'].sum())
+                    "total_injuries": int(overall['sum_inj']),
+                    "total_fatalities": int(overall['sum_fat']),
+                    "total_loss": float(overall['sum_loss'])
                 }
             }
         except Exception as e:
             raise Exception(f"Error analyzing severity impact: {str(e)}")
 
     def _calculate_path_directions(self, data: pd.DataFrame) -> Dict:
-        """Calculate tornado path directions using start/end coordinates."""
-        directions = []
-        for _, row in data.iterrows():
-            if row['elat'] != 0 and row['elon'] != 0:  # Check for valid end coordinates
-                dy = row['elat'] - row['slat']
-                dx = row['elon'] - row['slon']
-                angle = degrees(atan2(dy, dx))
-                directions.append(angle)
-        
-        if directions:
-            return {
-                "avg_direction": float(np.mean(directions)),
-                "direction_distribution": {
-                    "north": len([d for d in directions if 45 <= d < 135]),
-                    "south": len([d for d in directions if -135 <= d < -45]),
-                    "east": len([d for d in directions if (-45 <= d < 45)]),
-                    "west": len([d for d in directions if (d >= 135) or (d < -135)])
-                }
-            }
-        return {"error": "No valid direction data available"}
+        """Calculate tornado path directions from the great-circle bearing of each track."""
+        return direction_summary(self._track_geometry(data)['bearing'])
 
     def analyze_path_characteristics(self, state: str = None, min_length: float = None):
         """Analyze tornado paths (length, width, direction)."""
@@ -170,80 +364,75 @@ class TornadoAnalysisTool(SingleMessageTool):
 
     def _analyze_time_distribution(self, data: pd.DataFrame) -> Dict:
         """Analyze distribution of tornadoes across different times."""
-        time_counts = data['time'].value_counts()
-        return {
-            "morning": int(time_counts[(time_counts.index >= '06:00:00') & 
-                                     (time_counts.index < '12:00:00')].sum()),
-            "afternoon": int(time_counts[(time_counts.index >= '12:00:00') & 
-                                       (time_counts.index < '18:00:00')].sum()),
-            "evening": int(time_counts[(time_counts.index >= '18:00:00') & 
-                                     (time_counts.index < '22:00:00')].sum()),
-            "night": int(time_counts[(time_counts.index >= '22:00:00') | 
-                                   (time_counts.index < '06:00:00')].sum())
-        }
+        return time_of_day_counts(diurnal_histogram(data['minute_of_day'].to_numpy(), 60))
 
     def analyze_temporal_patterns(self, state: str = None):
         """Analyze patterns across different time scales."""
         try:
-            data = self.tornado_data
-            if state:
-                data = data[data['st'] == state]
-            
+            by_year = self._summary(state, by='yr')
+            cube = self._cube()
+            if cube is not None:
+                monthly_counts = {
+                    month: int(count) for month, count in enumerate(cube.monthly_counts(state or None), 1) if count
+                }
+                time_of_day = time_of_day_counts(cube.hourly_counts(state or None))
+            else:
+                monthly_counts = self._filter(state)['mo'].value_counts().sort_index().to_dict()
+                time_of_day = self._analyze_time_distribution(self._filter(state))
+            seasons = {"spring": [3, 4, 5], "summer": [6, 7, 8], "fall": [9, 10, 11], "winter": [12, 1, 2]}
+
             return {
                 "analysis": "temporal_patterns",
                 "yearly_trends": {
                     str(year): {
-                        "count": int(count),
-                        "avg_magnitude": float(data[data['yr'] == year]['mag'].mean()),
-                        "total_injuries": int(data[data['yr'] == year]['inj'].sum()),
-                        "total_fatalities": int(data[data['yr'] == year]['fat'].sum())
+                        "count": int(row['count']),
+                        "avg_magnitude": float(row['mean_mag']),
+                        "total_injuries": int(row['sum_inj']),
+                        "total_fatalities": int(row['sum_fat'])
                     }
-                    for year, count in data['yr'].value_counts().items()
+                    for year, row in by_year.items()
                 },
                 "monthly_distribution": {
                     str(month): int(count)
-                    for month, count in data['mo'].value_counts().sort_index().items()
+                    for month, count in monthly_counts.items()
                 },
-                "time_of_day": self._analyze_time_distribution(data),
+                "time_of_day": time_of_day,
                 "seasonal_patterns": {
-                    "spring": int(data[data['mo'].isin([3,4,5])].shape[0]),
-                    "summer": int(data[data['mo'].isin([6,7,8])].shape[0]),
-                    "fall": int(data[data['mo'].isin([9,10,11])].shape[0]),
-                    "winter": int(data[data['mo'].isin([12,1,2])].shape[0])
+                    season: int(sum(monthly_counts.get(month, 0) for month in months))
+                    for season, months in seasons.items()
                 }
             }
         except Exception as e:
             raise Exception(f"Error analyzing temporal patterns: {str(e)}") 
 
-    def _calculate_state_metrics(self, data: pd.DataFrame) -> Dict:
-        """Calculate comprehensive metrics for a state."""
+    def _calculate_state_metrics(self, summary: Dict) -> Dict:
+        """Calculate comprehensive metrics for a state from its summary statistics."""
         return {
-            "total_tornadoes": len(data),
-            "avg_magnitude": float(data['mag'].mean()),
-            "total_injuries": int(data['inj'].sum()),
-            "total_fatalities": int(data['fat'].sum()),
-            "total_loss": float(data['loss'].sum()),
-            "avg_path_length": float(data['len'].mean()),
-            "avg_path_width": float(data['wid'].mean())
+            "total_tornadoes": int(summary['count']),
+            "avg_magnitude": float(summary['mean_mag']),
+            "total_injuries": int(summary['sum_inj']),
+            "total_fatalities": int(summary['sum_fat']),
+            "total_loss": float(summary['sum_loss']),
+            "avg_path_length": float(summary['mean_len']),
+            "avg_path_width": float(summary['mean_wid'])
         }
 
     def compare_states(self, state1: str, state2: str = None):
         """Compare tornado characteristics between states."""
         try:
-            data = self.tornado_data
-            state1_data = data[data['st'] == state1]
+            state1_summary = self._summary(state1)
             
-            if not len(state1_data):
+            if not state1_summary['count']:
                 raise ValueError(f"No data available for state: {state1}")
             
-            metrics1 = self._calculate_state_metrics(state1_data)
+            metrics1 = self._calculate_state_metrics(state1_summary)
             
             if state2:
-                state2_data = data[data['st'] == state2]
-                if not len(state2_data):
+                state2_summary = self._summary(state2)
+                if not state2_summary['count']:
                     raise ValueError(f"No data available for state: {state2}")
                 
-                metrics2 = self._calculate_state_metrics(state2_data)
+                metrics2 = self._calculate_state_metrics(state2_summary)
                 return {
                     "analysis": "state_comparison",
                     "state1": {
@@ -262,7 +451,7 @@ class TornadoAnalysisTool(SingleMessageTool):
                 }
             else:
                 # Compare with national averages
-                national_metrics = self._calculate_state_metrics(data)
+                national_metrics = self._calculate_state_metrics(self._summary())
                 return {
                     "analysis": "state_comparison",
                     "state": {
@@ -282,34 +471,34 @@ class TornadoAnalysisTool(SingleMessageTool):
     def analyze_economic_impact(self, state: str = None, year_range: tuple = None):
         """Analyze economic losses and patterns."""
         try:
-            data = self.tornado_data
-            if state:
-                data = data[data['st'] == state]
-            if year_range:
-                data = data[(data['yr'] >= year_range[0]) & (data['yr'] <= year_range[1])]
-            
-            yearly_losses = data.groupby('yr')['loss'].agg(['sum', 'mean', 'count'])
+            # run_impl passes a single year
+            if isinstance(year_range, (int, np.integer)):
+                year_range = (year_range, year_range)
+
+            overall = self._summary(state, year_range)
+            yearly_losses = self._summary(state, year_range, by='yr')
+            correlations = self._correlations([('loss', 'mag'), ('loss', 'len'), ('loss', 'wid')], state, year_range)
             
             return {
                 "analysis": "economic_impact",
-                "total_loss": float(data['loss'].sum()),
-                "avg_loss_per_tornado": float(data['loss'].mean()),
+                "total_loss": float(overall['sum_loss']),
+                "avg_loss_per_tornado": float(overall['mean_loss']),
                 "loss_by_magnitude": {
-                    str(mag): float(avg_loss)
-                    for mag, avg_loss in data.groupby('mag')['loss'].mean().items()
+                    str(mag): float(row['mean_loss'])
+                    for mag, row in self._summary(state, year_range, by='mag').items()
                 },
                 "yearly_trends": {
                     str(year): {
-                        "total_loss": float(row['sum']),
-                        "avg_loss": float(row['mean']),
+                        "total_loss": float(row['sum_loss']),
+                        "avg_loss": float(row['mean_loss']),
                         "tornado_count": int(row['count'])
                     }
-                    for year, row in yearly_losses.iterrows()
+                    for year, row in yearly_losses.items()
                 },
                 "correlation_metrics": {
-                    "loss_vs_magnitude": float(data['loss'].corr(data['mag'])),
-                    "loss_vs_path_length": float(data['loss'].corr(data['len'])),
-                    "loss_vs_path_width": float(data['loss'].corr(data['wid']))
+                    "loss_vs_magnitude": correlations[('loss', 'mag')],
+                    "loss_vs_path_length": correlations[('loss', 'len')],
+                    "loss_vs_path_width": correlations[('loss', 'wid')]
                 }
             }
         except Exception as e:
@@ -323,8 +512,11 @@ class TornadoAnalysisTool(SingleMessageTool):
                 data = data[data['len'] >= min_length]
             
             # Filter for valid coordinates
-            valid_data = data[(data['elat'] != 0) & (data['elon'] != 0)]
-            
+            geometry = self._track_geometry(data)
+            valid_data = data[geometry['valid']]
+            displacement = geometry.loc[geometry['valid'], 'displacement_miles']
+            has_length = valid_data['len'] > 0
+
             return {
                 "analysis": "movement_analysis",
                 "path_statistics": {
@@ -337,17 +529,11 @@ class TornadoAnalysisTool(SingleMessageTool):
                 },
                 "direction_analysis": self._calculate_path_directions(valid_data),
                 "movement_patterns": {
-                    "avg_displacement": float(
-                        np.mean(np.sqrt(
-                            (valid_data['elat'] - valid_data['slat'])**2 + 
-                            (valid_data['elon'] - valid_data['slon'])**2
-                        ))
-                    ),
+                    "avg_displacement_miles": float(displacement.mean()),
+                    "avg_displacement_km": float(geometry.loc[geometry['valid'], 'displacement_km'].mean()),
+                    # Straight-line distance over reported path length (both in miles)
                     "path_efficiency": float(
-                        np.mean(np.sqrt(
-                            (valid_data['elat'] - valid_data['slat'])**2 + 
-                            (valid_data['elon'] - valid_data['slon'])**2
-                        ) / valid_data['len'])
+                        (displacement[has_length] / valid_data.loc[has_length, 'len']).mean()
                     )
                 }
             }
@@ -357,36 +543,226 @@ class TornadoAnalysisTool(SingleMessageTool):
     def analyze_f_scale_distribution(self, state: str = None):
         """Analyze F-scale ratings distribution and their relationships."""
         try:
-            data = self.tornado_data
-            if state:
-                data = data[data['st'] == state]
-            
             f_scale_cols = ['f1', 'f2', 'f3', 'f4']
-            f_scale_data = data[f_scale_cols]
+            overall = self._summary(state)
+            by_year = self._summary(state, by='yr')
+            correlations = self._correlations(
+                [('mag', col) for col in f_scale_cols] + [('loss', col) for col in f_scale_cols], state
+            )
             
             return {
                 "analysis": "f_scale_distribution",
                 "f_scale_counts": {
-                    f"F{i+1}": int(f_scale_data[col].sum())
+                    f"F{i+1}": int(overall[f'sum_{col}'])
                     for i, col in enumerate(f_scale_cols)
                 },
                 "f_scale_correlations": {
                     "magnitude": {
-                        f"F{i+1}": float(data['mag'].corr(data[col]))
+                        f"F{i+1}": correlations[('mag', col)]
                         for i, col in enumerate(f_scale_cols)
                     },
                     "damage": {
-                        f"F{i+1}": float(data['loss'].corr(data[col]))
+                        f"F{i+1}": correlations[('loss', col)]
                         for i, col in enumerate(f_scale_cols)
                     }
                 },
                 "temporal_distribution": {
                     str(year): {
-                        f"F{i+1}": int(year_data[col].sum())
+                        f"F{i+1}": int(row[f'sum_{col}'])
                         for i, col in enumerate(f_scale_cols)
                     }
-                    for year, year_data in data.groupby('yr')[f_scale_cols]
+                    for year, row in by_year.items()
                 }
             }
         except Exception as e:
-            raise Exception(f"Error analyzing F-scale distribution: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error analyzing F-scale distribution: {str(e)}")
+
+    def _track_index(self) -> TrackIndex:
+        """Grid index over the track segments (see tornado_spatial.py)."""
+        return self._derived_data("track_index", TrackIndex)
+
+    def _describe_tracks(self, positions: np.ndarray, distances: np.ndarray = None) -> Dict:
+        """Summarize the tornadoes at the given row positions and list the first MAX_LISTED_TRACKS."""
+        tracks = self.tornado_data.iloc[positions]
+        listed = tracks[[col for col in TRACK_COLUMNS if col in tracks.columns]].head(MAX_LISTED_TRACKS)
+        records = listed.to_dict(orient="records")
+        if distances is not None:
+            for record, distance in zip(records, distances):
+                record["distance_km"] = round(float(distance), 2)
+
+        return {
+            "tornado_count": len(tracks),
+            "magnitude_distribution": {
+                str(mag): int(count) for mag, count in tracks['mag'].value_counts().sort_index().items()
+            },
+            "total_injuries": int(tracks['inj'].sum()),
+            "total_fatalities": int(tracks['fat'].sum()),
+            "total_loss": float(tracks['loss'].sum()),
+            "tracks": records,
+            "tracks_listed": len(records)
+        }
+
+    def search_radius(self, latitude: float, longitude: float, radius_km: float,
+                      year_range: Tuple[int, int] = None):
+        """Find tornadoes whose track passes within radius_km of a point, nearest first."""
+        try:
+            positions, distances = self._track_index().radius_search(latitude, longitude, radius_km, year_range)
+            return {
+                "analysis": "radius_search",
+                "center": {"latitude": latitude, "longitude": longitude},
+                "radius_km": radius_km,
+                "year_range": list(year_range) if year_range else None,
+                **self._describe_tracks(positions, distances)
+            }
+        except Exception as e:
+            raise Exception(f"Error in radius search: {str(e)}")
+
+    def search_bbox(self, min_latitude: float, max_latitude: float, min_longitude: float,
+                    max_longitude: float, year_range: Tuple[int, int] = None):
+        """Find tornadoes whose track crosses a latitude/longitude box, most severe first."""
+        try:
+            positions = self._track_index().bbox_search(min_latitude, max_latitude, min_longitude,
+                                                        max_longitude, year_range)
+            severity = self.tornado_data.iloc[positions][['mag', 'fat', 'inj']].to_numpy(dtype=float)
+            # Sort by magnitude, then fatalities, then injuries (all descending)
+            positions = positions[np.lexsort((-severity[:, 2], -severity[:, 1], -severity[:, 0]))]
+            return {
+                "analysis": "bbox_search",
+                "bounds": {"min_latitude": min_latitude, "max_latitude": max_latitude,
+                           "min_longitude": min_longitude, "max_longitude": max_longitude},
+                "year_range": list(year_range) if year_range else None,
+                **self._describe_tracks(positions)
+            }
+        except Exception as e:
+            raise Exception(f"Error in bounding box search: {str(e)}")
+
+    def find_nearest_tracks(self, latitude: float, longitude: float, k: int = 5,
+                            year_range: Tuple[int, int] = None):
+        """Find the k tornado tracks nearest to a point."""
+        try:
+            positions, distances = self._track_index().nearest(latitude, longitude, min(k, MAX_LISTED_TRACKS),
+                                                               year_range)
+            return {
+                "analysis": "nearest_tracks",
+                "center": {"latitude": latitude, "longitude": longitude},
+                "year_range": list(year_range) if year_range else None,
+                **self._describe_tracks(positions, distances)
+            }
+        except Exception as e:
+            raise Exception(f"Error in nearest track search: {str(e)}")
+
+    def analyze_density_heatmap(self, resolution_degrees: float = 0.5, min_magnitude: int = None,
+                                state: str = None, year_range: Tuple[int, int] = None, top_n: int = 10):
+        """Summarize the grid cells with the highest tornado track frequency and path density."""
+        try:
+            if not 0.05 <= resolution_degrees <= 5:
+                raise ValueError("resolution_degrees must be between 0.05 and 5")
+
+            grid = self._derived_data("density", DensityEngine).grid(
+                resolution_degrees, min_magnitude, state, year_range
+            )
+            top_cells = grid.head(min(top_n, MAX_LISTED_TRACKS)).round(
+                {"center_latitude": 3, "center_longitude": 3, "path_km": 1, "tracks_per_year": 3}
+            )
+            return {
+                "analysis": "density_heatmap",
+                "resolution_degrees": resolution_degrees,
+                "filters": {
+                    "min_magnitude": min_magnitude,
+                    "state": state,
+                    "year_range": list(year_range) if year_range else None
+                },
+                "cells_with_tornadoes": len(grid),
+                "top_cells": top_cells.to_dict(orient="records"),
+                "top_path_density_cells": grid.nlargest(min(top_n, MAX_LISTED_TRACKS), "path_km").round(
+                    {"center_latitude": 3, "center_longitude": 3, "path_km": 1, "tracks_per_year": 3}
+                ).to_dict(orient="records")
+            }
+        except Exception as e:
+            raise Exception(f"Error analyzing tornado density: {str(e)}")
+
+    def detect_outbreaks(self, window_hours: float = 24, radius_km: float = 500, min_tornadoes: int = 6,
+                         state: str = None, year_range: Tuple[int, int] = None, top_n: int = 10):
+        """Detect tornado outbreaks and summarize their counts, sizes and worst events."""
+        try:
+            if min_tornadoes < 2:
+                raise ValueError("min_tornadoes must be at least 2")
+
+            detector = self._derived_data("outbreaks", OutbreakDetector)
+            outbreaks = detector.outbreaks(window_hours, radius_km, min_tornadoes)
+            if state:
+                outbreaks = outbreaks[outbreaks['states'].map(lambda states: state in states)]
+            if year_range and year_range[0] is not None:
+                outbreaks = outbreaks[outbreaks['year'] >= year_range[0]]
+            if year_range and year_range[1] is not None:
+                outbreaks = outbreaks[outbreaks['year'] <= year_range[1]]
+
+            sizes = pd.cut(outbreaks['tornado_count'], [min_tornadoes - 1, 9, 19, 49, np.inf],
+                           labels=[f"{min_tornadoes}-9", "10-19", "20-49", "50+"]) if min_tornadoes <= 9 else None
+            by_state = outbreaks.explode('states')['states'].value_counts()
+
+            def describe(rows: pd.DataFrame):
+                rows = rows.assign(start=rows['start'].astype(str), end=rows['end'].astype(str),
+                                   duration_hours=rows['duration_hours'].round(1))
+                return rows.drop(columns=['year']).to_dict(orient="records")
+
+            return {
+                "analysis": "outbreak_detection",
+                "parameters": {
+                    "window_hours": window_hours,
+                    "radius_km": radius_km,
+                    "min_tornadoes": min_tornadoes,
+                    "state": state,
+                    "year_range": list(year_range) if year_range else None
+                },
+                "outbreak_count": len(outbreaks),
+                "tornadoes_in_outbreaks": int(outbreaks['tornado_count'].sum()),
+                "size_distribution": (
+                    {str(bucket): int(count) for bucket, count in sizes.value_counts(sort=False).items()}
+                    if sizes is not None else None
+                ),
+                "outbreaks_per_year": {
+                    str(year): int(count) for year, count in outbreaks['year'].value_counts().sort_index().items()
+                },
+                "outbreaks_per_state": {str(st): int(count) for st, count in by_state.head(15).items()},
+                "largest_outbreaks": describe(outbreaks.head(min(top_n, MAX_LISTED_TRACKS))),
+                "deadliest_outbreaks": describe(
+                    outbreaks.nlargest(min(top_n, MAX_LISTED_TRACKS), 'fatalities').query('fatalities > 0')
+                ),
+                "same_day_statistics": detector.same_day_statistics(state, year_range)
+            }
+        except Exception as e:
+            raise Exception(f"Error detecting tornado outbreaks: {str(e)}")
+
+    def _diurnal_histogram(self, state: str = None, year_range: Tuple[int, int] = None,
+                           bin_minutes: int = 60) -> np.ndarray:
+        """Tornado counts per bin_minutes slot of the day for a state and year range."""
+        cube = self._cube()
+        if bin_minutes == 60 and cube is not None:
+            return cube.hourly_counts(state or None, year_range)
+        data = self._filter(state, year_range)
+        return diurnal_histogram(data['minute_of_day'].to_numpy(), bin_minutes)
+
+    def analyze_diurnal_distribution(self, state: str = None, year_range: Tuple[int, int] = None,
+                                     bin_minutes: int = 60):
+        """Analyze when during the day tornadoes occur."""
+        try:
+            histogram = self._diurnal_histogram(state, year_range, bin_minutes)
+            hourly = histogram if bin_minutes == 60 else self._diurnal_histogram(state, year_range, 60)
+            total = int(histogram.sum())
+            labels = [f"{start // 60:02d}:{start % 60:02d}" for start in range(0, MINUTES_PER_DAY, bin_minutes)]
+            peak = int(np.argmax(histogram))
+
+            return {
+                "analysis": "diurnal_distribution",
+                "state": state,
+                "year_range": list(year_range) if year_range else None,
+                "bin_minutes": bin_minutes,
+                "tornadoes_with_known_time": total,
+                "distribution": {label: int(count) for label, count in zip(labels, histogram)},
+                "peak_slot": labels[peak] if total else None,
+                "peak_share": float(histogram[peak] / total) if total else None,
+                "time_of_day": time_of_day_counts(hourly)
+            }
+        except Exception as e:
+            raise Exception(f"Error analyzing diurnal distribution: {str(e)}")
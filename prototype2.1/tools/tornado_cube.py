@@ -0,0 +1,167 @@
+# tools/tornado_cube.py
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from Tools.tornado_time import parse_minutes_of_day
+
+# Columns summed per cell; sums of squares and cross-products are kept for correlations
+VARIABLES = ("mag", "inj", "fat", "loss", "len", "wid", "f1", "f2", "f3", "f4")
+CORRELATION_PAIRS = (
+    ("mag", "inj"), ("mag", "fat"), ("mag", "loss"),
+    ("loss", "len"), ("loss", "wid"),
+    ("mag", "f1"), ("mag", "f2"), ("mag", "f3"), ("mag", "f4"),
+    ("loss", "f1"), ("loss", "f2"), ("loss", "f3"), ("loss", "f4"),
+)
+AXES = ("state", "year", "mag")
+
+
+class CubeTotals:
+    """Measures of a TornadoCube summed over every axis except the kept ones."""
+
+    def __init__(self, cube: "TornadoCube", values: np.ndarray, labels: Dict[str, np.ndarray]):
+        self.cube = cube
+        self.values = values
+        self.labels = labels
+
+    def __getitem__(self, measure: str) -> np.ndarray:
+        return self.values[self.cube.measure_index[measure]]
+
+    @property
+    def count(self) -> np.ndarray:
+        return self["count"]
+
+    def sum(self, variable: str) -> np.ndarray:
+        return self[f"sum_{variable}"]
+
+    def mean(self, variable: str) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 0, self.sum(variable) / self.count, np.nan)
+
+    def corr(self, x: str, y: str) -> np.ndarray:
+        """Pearson correlation from the shifted sufficient statistics (NaN when undefined)."""
+        n = self.count
+        sx = self.sum(x) - n * self.cube.shifts[x]
+        sy = self.sum(y) - n * self.cube.shifts[y]
+        pair = f"xp_{x}_{y}" if f"xp_{x}_{y}" in self.cube.measure_index else f"xp_{y}_{x}"
+        with np.errstate(invalid="ignore", divide="ignore"):
+            covariance = n * self[pair] - sx * sy
+            variance_x = n * self[f"sq_{x}"] - sx ** 2
+            variance_y = n * self[f"sq_{y}"] - sy ** 2
+            valid = (n > 1) & (variance_x > 0) & (variance_y > 0)
+            return np.where(valid, covariance / np.sqrt(variance_x * variance_y), np.nan)
+
+
+class TornadoCube:
+    """
+    Dense pre-aggregated tornado statistics indexed by state, year and magnitude.
+
+    Every cell holds the tornado count, the sum of each variable, sums of squares
+    and cross-products (shifted by the dataset mean, for numerically stable
+    correlations). Separate state x year x month and state x year x hour count
+    arrays cover the temporal breakdowns. Any state/year filter becomes an array
+    slice and every rollup a sum over a few thousand cells.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        """Build the cube; use ``TornadoCube.build`` to get None for data it can't represent exactly."""
+        self.states = np.unique(data['st'].to_numpy())
+        self.years = np.arange(int(data['yr'].min()), int(data['yr'].max()) + 1)
+        self.mags = np.unique(data['mag'].to_numpy())
+
+        state_codes = np.searchsorted(self.states, data['st'].to_numpy())
+        year_codes = data['yr'].to_numpy(dtype=np.int64) - self.years[0]
+        mag_codes = np.searchsorted(self.mags, data['mag'].to_numpy())
+        shape = (len(self.states), len(self.years), len(self.mags))
+        cells = np.ravel_multi_index((state_codes, year_codes, mag_codes), shape)
+
+        self.shifts = {var: float(data[var].mean()) for var in VARIABLES}
+        columns = {var: data[var].to_numpy(dtype=float) for var in VARIABLES}
+        centred = {var: columns[var] - self.shifts[var] for var in VARIABLES}
+
+        measures = {"count": None}
+        measures.update({f"sum_{var}": columns[var] for var in VARIABLES})
+        measures.update({f"sq_{var}": centred[var] ** 2 for var in VARIABLES})
+        measures.update({f"xp_{x}_{y}": centred[x] * centred[y] for x, y in CORRELATION_PAIRS})
+
+        self.measure_index = {name: k for k, name in enumerate(measures)}
+        self.values = np.stack([
+            np.bincount(cells, weights=weights, minlength=np.prod(shape)).astype(float).reshape(shape)
+            for weights in measures.values()
+        ])
+        # Nationwide year x magnitude totals, so unfiltered rollups don't sum over every state
+        self.national = self.values.sum(axis=1)
+
+        time_shape = (len(self.states), len(self.years))
+        months = data['mo'].to_numpy(dtype=np.int64) - 1
+        self.month_counts = np.bincount(
+            np.ravel_multi_index((state_codes, year_codes, months), time_shape + (12,)),
+            minlength=np.prod(time_shape) * 12
+        ).reshape(time_shape + (12,))
+
+        # Hour of day from the parsed minutes (see tornado_time.py); unknown times are left out
+        minutes = (data['minute_of_day'].to_numpy() if 'minute_of_day' in data.columns
+                   else parse_minutes_of_day(data['time']))
+        known = minutes >= 0
+        self.hour_counts = np.bincount(
+            np.ravel_multi_index((state_codes[known], year_codes[known], minutes[known] // 60),
+                                 time_shape + (24,)),
+            minlength=np.prod(time_shape) * 24
+        ).reshape(time_shape + (24,))
+
+    @classmethod
+    def build(cls, data: pd.DataFrame) -> Optional["TornadoCube"]:
+        """Return a cube for data, or None if it has missing values (those need the raw, NaN-aware path)."""
+        required = ["st", "yr", "mo"] + list(VARIABLES)
+        if data.empty or any(col not in data.columns for col in required):
+            return None
+        if 'time' not in data.columns and 'minute_of_day' not in data.columns:
+            return None
+        if data[required].isna().any().any() or not data['mo'].between(1, 12).all():
+            return None
+        return cls(data)
+
+    def _slices(self, state: str = None, year_range: Tuple[int, int] = None):
+        if state is None:
+            states = slice(None)
+        else:
+            position = int(np.searchsorted(self.states, state))
+            found = position < len(self.states) and self.states[position] == state
+            states = slice(position, position + 1) if found else slice(0, 0)
+
+        # A None bound leaves that end of the year range open
+        start, end = year_range if year_range is not None else (None, None)
+        years = slice(None if start is None else int(np.searchsorted(self.years, start)),
+                      None if end is None else int(np.searchsorted(self.years, end, side="right")))
+        return states, years
+
+    def rollup(self, state: str = None, year_range: Tuple[int, int] = None,
+               keep: Sequence[str] = ()) -> CubeTotals:
+        """
+        Sum the cube over every axis not in ``keep``.
+
+        Args:
+            state: Restrict to one state code
+            year_range: Restrict to an inclusive (start, end) year range; either bound may be None
+            keep: Axes to keep, any of 'state', 'year', 'mag'
+        """
+        states, years = self._slices(state, year_range)
+        if state is None and "state" not in keep:
+            values = self.national[:, np.newaxis, years, :]
+        else:
+            values = self.values[:, states, years, :]
+        summed = tuple(axis + 1 for axis, name in enumerate(AXES) if name not in keep)
+        labels = {"state": self.states[states], "year": self.years[years], "mag": self.mags}
+        return CubeTotals(self, values.sum(axis=summed), {name: labels[name] for name in AXES if name in keep})
+
+    def monthly_counts(self, state: str = None, year_range: Tuple[int, int] = None) -> np.ndarray:
+        """Tornado counts for months 1-12."""
+        states, years = self._slices(state, year_range)
+        return self.month_counts[states, years].sum(axis=(0, 1))
+
+    def hourly_counts(self, state: str = None, year_range: Tuple[int, int] = None) -> np.ndarray:
+        """Tornado counts for hours 0-23 (tornadoes with an unknown time are not counted)."""
+        states, years = self._slices(state, year_range)
+        return self.hour_counts[states, years].sum(axis=(0, 1))
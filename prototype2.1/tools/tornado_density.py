@@ -0,0 +1,115 @@
+# tools/tornado_density.py
+
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from Tools.tornado_geometry import EARTH_RADIUS_KM, haversine
+
+# Samples taken per grid cell along each track when rasterizing
+SAMPLES_PER_CELL = 4
+# Density grids kept per parameter set
+MAX_CACHED_GRIDS = 16
+
+
+def rasterize_tracks(slat, slon, elat, elon, lengths_km, cell_degrees: float):
+    """
+    Rasterize start -> end track segments onto a lat/lon grid in one vectorized pass.
+
+    Every segment is sampled SAMPLES_PER_CELL times per cell it spans. Returns
+    (cell keys, distinct tracks per cell, track km per cell, tornado starts per cell),
+    with cell key = row * columns + column for rows/columns counted from (-90, -180).
+    """
+    columns = int(np.ceil(360 / cell_degrees))
+    span_cells = np.maximum(np.abs(elat - slat), np.abs(elon - slon)) / cell_degrees
+    samples = np.ceil(span_cells * SAMPLES_PER_CELL).astype(np.int64) + 1
+
+    tracks = np.repeat(np.arange(len(slat)), samples)
+    first = np.repeat(np.cumsum(samples) - samples, samples)
+    fraction = (np.arange(len(tracks)) - first) / np.maximum(np.repeat(samples - 1, samples), 1)
+    lats = slat[tracks] + fraction * (elat - slat)[tracks]
+    lons = slon[tracks] + fraction * (elon - slon)[tracks]
+    keys = (np.floor((lats + 90) / cell_degrees).astype(np.int64) * columns
+            + np.floor((lons + 180) / cell_degrees).astype(np.int64))
+
+    # A straight segment can't re-enter a cell it left, so a track's distinct cells
+    # are the samples whose cell differs from the previous sample of the same track
+    new_cell = np.ones(len(keys), dtype=bool)
+    new_cell[1:] = (keys[1:] != keys[:-1]) | (tracks[1:] != tracks[:-1])
+
+    start_keys = (np.floor((slat + 90) / cell_degrees).astype(np.int64) * columns
+                  + np.floor((slon + 180) / cell_degrees).astype(np.int64))
+    cells, inverse = np.unique(np.concatenate([keys, start_keys]), return_inverse=True)
+    sample_cells, start_cells = inverse[:len(keys)], inverse[len(keys):]
+
+    track_counts = np.bincount(sample_cells[new_cell], minlength=len(cells))
+    path_km = np.bincount(sample_cells, weights=(lengths_km / samples)[tracks], minlength=len(cells))
+    start_counts = np.bincount(start_cells, minlength=len(cells))
+    return cells, track_counts, path_km, start_counts
+
+
+class DensityEngine:
+    """Gridded tornado frequency and path density, cached per parameter set."""
+
+    def __init__(self, data: pd.DataFrame):
+        """Keep the track end points and filter columns of data as arrays."""
+        slat, slon, elat, elon = (data[col].to_numpy(dtype=float) for col in ('slat', 'slon', 'elat', 'elon'))
+        valid = ~np.isnan(slat) & ~np.isnan(slon) & (slat != 0) & (slon != 0)
+        has_end = valid & ~np.isnan(elat) & ~np.isnan(elon) & (elat != 0) & (elon != 0)
+
+        # Tracks without an end point count as a point at their start
+        self.slat, self.slon = slat[valid], slon[valid]
+        self.elat = np.where(has_end, elat, slat)[valid]
+        self.elon = np.where(has_end, elon, slon)[valid]
+        self.lengths_km = haversine(self.slat, self.slon, self.elat, self.elon, radius=EARTH_RADIUS_KM)
+        self.years = data['yr'].to_numpy()[valid]
+        self.mags = data['mag'].to_numpy()[valid]
+        self.states = data['st'].to_numpy()[valid]
+
+        self._grids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def grid(self, cell_degrees: float = 0.5, min_magnitude: int = None, state: str = None,
+             year_range: Tuple[int, int] = None) -> pd.DataFrame:
+        """Return one row per non-empty cell, most tracks first; computed once per parameter set."""
+        key = (cell_degrees, min_magnitude, state, tuple(year_range) if year_range else None)
+        with self._lock:
+            if key in self._grids:
+                self._grids.move_to_end(key)
+                return self._grids[key]
+
+        selected = np.ones(len(self.slat), dtype=bool)
+        if min_magnitude is not None:
+            selected &= self.mags >= min_magnitude
+        if state:
+            selected &= self.states == state
+        if year_range and year_range[0] is not None:
+            selected &= self.years >= year_range[0]
+        if year_range and year_range[1] is not None:
+            selected &= self.years <= year_range[1]
+
+        cells, track_counts, path_km, start_counts = rasterize_tracks(
+            self.slat[selected], self.slon[selected], self.elat[selected], self.elon[selected],
+            self.lengths_km[selected], cell_degrees
+        )
+        columns = int(np.ceil(360 / cell_degrees))
+        years = self.years[selected]
+        year_count = int(years.max() - years.min() + 1) if len(years) else 1
+
+        grid = pd.DataFrame({
+            "center_latitude": ((cells // columns) + 0.5) * cell_degrees - 90,
+            "center_longitude": ((cells % columns) + 0.5) * cell_degrees - 180,
+            "track_count": track_counts,
+            "tornado_starts": start_counts,
+            "path_km": path_km,
+            "tracks_per_year": track_counts / year_count,
+        }).sort_values(["track_count", "path_km"], ascending=False, kind="stable").reset_index(drop=True)
+
+        with self._lock:
+            self._grids[key] = grid
+            while len(self._grids) > MAX_CACHED_GRIDS:
+                self._grids.popitem(last=False)
+        return grid
@@ -0,0 +1,77 @@
+# tools/tornado_geometry.py
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_MILES = 3958.8
+EARTH_RADIUS_KM = 6371.0088
+
+# Compass sectors centred on their bearing, clockwise from north
+CARDINAL_SECTORS = ("north", "east", "south", "west")
+COMPASS_SECTORS = ("N", "NE", "E", "SE", "S", "SW", "W", "NW")
+
+
+def haversine(lat1, lon1, lat2, lon2, radius: float = EARTH_RADIUS_MILES) -> np.ndarray:
+    """Great-circle distance between arrays of points given in degrees (miles by default)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * radius * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def initial_bearing(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Initial great-circle bearing in degrees clockwise from north (0-360)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    dlon = lon2 - lon1
+    x = np.sin(dlon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return np.degrees(np.arctan2(x, y)) % 360
+
+
+def compass_sector(bearings, sectors: int) -> np.ndarray:
+    """Index of the compass sector (0 = north, clockwise) each bearing falls into."""
+    width = 360 / sectors
+    return (np.floor((np.asarray(bearings) + width / 2) / width) % sectors).astype(np.int64)
+
+
+def track_geometry(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Great-circle length and initial bearing of every tornado track in one vectorized pass.
+
+    Tracks without an end point (elat/elon recorded as 0) get NaN geometry.
+    The result shares the index of ``data`` so it can be subset with the same filters.
+    """
+    valid = (data['elat'] != 0) & (data['elon'] != 0)
+    valid &= data[['slat', 'slon', 'elat', 'elon']].notna().all(axis=1)
+
+    slat, slon, elat, elon = (data[col].to_numpy(dtype=float) for col in ('slat', 'slon', 'elat', 'elon'))
+    displacement = np.where(valid, haversine(slat, slon, elat, elon), np.nan)
+    bearing = np.where(valid, initial_bearing(slat, slon, elat, elon), np.nan)
+
+    return pd.DataFrame({
+        "valid": valid.to_numpy(),
+        "displacement_miles": displacement,
+        "displacement_km": displacement * (EARTH_RADIUS_KM / EARTH_RADIUS_MILES),
+        "bearing": bearing,
+    }, index=data.index)
+
+
+def direction_summary(bearings) -> Dict:
+    """Circular mean bearing and compass-sector histograms for an array of bearings."""
+    bearings = np.asarray(bearings, dtype=float)
+    bearings = bearings[~np.isnan(bearings)]
+    if not len(bearings):
+        return {"error": "No valid direction data available"}
+
+    radians = np.radians(bearings)
+    mean_bearing = np.degrees(np.arctan2(np.sin(radians).mean(), np.cos(radians).mean())) % 360
+    cardinal = np.bincount(compass_sector(bearings, 4), minlength=4)
+    compass = np.bincount(compass_sector(bearings, 8), minlength=8)
+
+    return {
+        "avg_direction": float(mean_bearing),
+        "avg_direction_compass": COMPASS_SECTORS[int(compass_sector(mean_bearing, 8))],
+        "direction_distribution": {name: int(count) for name, count in zip(CARDINAL_SECTORS, cardinal)},
+        "compass_distribution": {name: int(count) for name, count in zip(COMPASS_SECTORS, compass)}
+    }
@@ -0,0 +1,158 @@
+# tools/tornado_outbreaks.py
+
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from Tools.tornado_geometry import EARTH_RADIUS_KM, haversine
+
+# Outbreak tables kept per (window, radius, minimum size) parameter set
+MAX_CACHED_OUTBREAK_TABLES = 8
+
+
+def tornado_datetimes(data: pd.DataFrame) -> pd.Series:
+    """Start time of every tornado, from 'date' + 'time' when present, else yr/mo/dy (NaT if unparseable)."""
+    if 'date' in data.columns and 'time' in data.columns:
+        return pd.to_datetime(data['date'].astype(str) + ' ' + data['time'].astype(str), errors='coerce')
+    return pd.to_datetime(pd.DataFrame({'year': data['yr'], 'month': data['mo'], 'day': data['dy']}),
+                          errors='coerce')
+
+
+def connected_components(n: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Label the connected components of an n-node graph given as edge arrays.
+
+    Vectorized union-find: every round hooks each edge's endpoints onto the
+    smaller of their roots, then compresses paths by pointer jumping.
+    """
+    parent = np.arange(n)
+    while True:
+        root_left, root_right = parent[left], parent[right]
+        changed = root_left != root_right
+        if not changed.any():
+            return parent
+        low = np.minimum(root_left[changed], root_right[changed])
+        high = np.maximum(root_left[changed], root_right[changed])
+        np.minimum.at(parent, high, low)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+
+class OutbreakDetector:
+    """Clusters tornadoes into outbreaks: chains of tornadoes close together in time and space."""
+
+    def __init__(self, data: pd.DataFrame):
+        """Sort the tornadoes with a valid start time and location by time, once."""
+        times = tornado_datetimes(data)
+        valid = (times.notna() & data['slat'].notna() & data['slon'].notna()
+                 & (data['slat'] != 0) & (data['slon'] != 0)).to_numpy()
+        order = np.flatnonzero(valid)[np.argsort(times.to_numpy()[valid], kind='stable')]
+
+        # Positions (iloc) into data, in time order
+        self.positions = order
+        self.times = times.to_numpy()[order].astype('datetime64[m]').astype(np.int64)  # minutes
+        self.lat = data['slat'].to_numpy(dtype=float)[order]
+        self.lon = data['slon'].to_numpy(dtype=float)[order]
+        self.data = data
+
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def outbreaks(self, window_hours: float = 24, radius_km: float = 500,
+                  min_tornadoes: int = 6) -> pd.DataFrame:
+        """
+        Return one row per outbreak, largest first.
+
+        Two tornadoes are linked when they start within window_hours and radius_km
+        of each other; an outbreak is a linked group of at least min_tornadoes.
+        """
+        key = (window_hours, radius_km, min_tornadoes)
+        with self._lock:
+            if key in self._tables:
+                self._tables.move_to_end(key)
+                return self._tables[key]
+
+        n = len(self.times)
+        window = int(round(window_hours * 60))
+        # Two-pointer window: tornadoes i+1 .. ends[i]-1 start within the window after tornado i
+        ends = np.searchsorted(self.times, self.times + window, side='right')
+        left, right = [], []
+        for offset in range(1, int((ends - np.arange(n)).max(initial=1))):
+            first = np.flatnonzero(ends[:n - offset] > np.arange(n - offset) + offset)
+            if not len(first):
+                break
+            second = first + offset
+            close = haversine(self.lat[first], self.lon[first], self.lat[second], self.lon[second],
+                              radius=EARTH_RADIUS_KM) <= radius_km
+            left.append(first[close])
+            right.append(second[close])
+
+        left = np.concatenate(left) if left else np.empty(0, dtype=np.int64)
+        right = np.concatenate(right) if right else np.empty(0, dtype=np.int64)
+        labels = connected_components(n, left, right)
+
+        sizes = np.bincount(labels, minlength=n)
+        members = np.flatnonzero(sizes[labels] >= min_tornadoes)
+        table = self._summarize(labels[members], members)
+
+        with self._lock:
+            self._tables[key] = table
+            while len(self._tables) > MAX_CACHED_OUTBREAK_TABLES:
+                self._tables.popitem(last=False)
+        return table
+
+    def _summarize(self, labels: np.ndarray, members: np.ndarray) -> pd.DataFrame:
+        """One grouped pass over the outbreak members."""
+        rows = self.data.iloc[self.positions[members]]
+        frame = pd.DataFrame({
+            "outbreak": labels,
+            "start": self.times[members],
+            "st": rows['st'].to_numpy(),
+            "mag": rows['mag'].to_numpy(),
+            "inj": rows['inj'].to_numpy(),
+            "fat": rows['fat'].to_numpy(),
+            "loss": rows['loss'].to_numpy(),
+        })
+        table = frame.groupby("outbreak").agg(
+            tornado_count=("start", "size"),
+            start=("start", "min"),
+            end=("start", "max"),
+            states=("st", lambda states: sorted(set(states))),
+            max_magnitude=("mag", "max"),
+            injuries=("inj", "sum"),
+            fatalities=("fat", "sum"),
+            loss=("loss", "sum"),
+        )
+        table["duration_hours"] = (table["end"] - table["start"]) / 60
+        table["start"] = pd.to_datetime(table["start"] * 60, unit="s")
+        table["end"] = pd.to_datetime(table["end"] * 60, unit="s")
+        table["year"] = table["start"].dt.year
+        return table.sort_values(["tornado_count", "fatalities"], ascending=False, kind="stable").reset_index(drop=True)
+
+    def same_day_statistics(self, state: str = None, year_range: Tuple[int, int] = None) -> dict:
+        """How often a day with a tornado has more than one."""
+        days = self.times // (24 * 60)
+        selected = np.ones(len(days), dtype=bool)
+        if state:
+            selected &= self.data['st'].to_numpy()[self.positions] == state
+        if year_range:
+            years = self.data['yr'].to_numpy()[self.positions]
+            if year_range[0] is not None:
+                selected &= years >= year_range[0]
+            if year_range[1] is not None:
+                selected &= years <= year_range[1]
+
+        _, per_day = np.unique(days[selected], return_counts=True)
+        tornado_days = len(per_day)
+        return {
+            "tornado_days": tornado_days,
+            "days_with_multiple_tornadoes": int((per_day >= 2).sum()),
+            "probability_multiple_same_day": float((per_day >= 2).mean()) if tornado_days else None,
+            "max_tornadoes_in_one_day": int(per_day.max()) if tornado_days else 0,
+        }
@@ -0,0 +1,155 @@
+# tools/tornado_spatial.py
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from Tools.tornado_geometry import EARTH_RADIUS_KM
+
+KM_PER_DEGREE = EARTH_RADIUS_KM * np.pi / 180
+
+
+class TrackIndex:
+    """
+    Uniform lat/lon grid over tornado track segments (start -> end point).
+
+    Each track is registered in every grid cell its segment's bounding box
+    overlaps, stored as one array sorted by cell id, so a query only looks at the
+    cells it covers and then runs an exact vectorized test on those candidates.
+    Tracks without an end point are treated as a point at their start.
+    """
+
+    def __init__(self, data: pd.DataFrame, cell_degrees: float = 0.25):
+        """
+        Build the index.
+
+        Args:
+            data: Tornado data with slat, slon, elat, elon and yr columns
+            cell_degrees: Grid cell size in degrees
+        """
+        self.cell_degrees = cell_degrees
+        slat, slon, elat, elon = (data[col].to_numpy(dtype=float) for col in ('slat', 'slon', 'elat', 'elon'))
+        valid = ~np.isnan(slat) & ~np.isnan(slon) & (slat != 0) & (slon != 0)
+        has_end = valid & ~np.isnan(elat) & ~np.isnan(elon) & (elat != 0) & (elon != 0)
+
+        # Positions (iloc) of the indexed tracks in data, and their segment end points
+        self.positions = np.flatnonzero(valid)
+        self.slat, self.slon = slat[valid], slon[valid]
+        self.elat = np.where(has_end, elat, slat)[valid]
+        self.elon = np.where(has_end, elon, slon)[valid]
+        self.years = data['yr'].to_numpy()[valid]
+
+        if not len(self.positions):
+            self.row0, self.col0, self.n_rows, self.n_cols = 0, 0, 0, 0
+            self.cell_keys = self.cell_tracks = np.empty(0, dtype=np.int64)
+            return
+
+        low_rows, high_rows = self._cells(np.minimum(self.slat, self.elat)), self._cells(np.maximum(self.slat, self.elat))
+        low_cols, high_cols = self._cells(np.minimum(self.slon, self.elon)), self._cells(np.maximum(self.slon, self.elon))
+        self.row0, self.col0 = int(low_rows.min()), int(low_cols.min())
+        self.n_rows = int(high_rows.max()) - self.row0 + 1
+        self.n_cols = int(high_cols.max()) - self.col0 + 1
+
+        # Expand every track into the cells of its bounding box
+        widths = high_cols - low_cols + 1
+        counts = (high_rows - low_rows + 1) * widths
+        tracks = np.repeat(np.arange(len(self.positions)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = np.repeat(low_rows - self.row0, counts) + offsets // np.repeat(widths, counts)
+        cols = np.repeat(low_cols - self.col0, counts) + offsets % np.repeat(widths, counts)
+        keys = rows * self.n_cols + cols
+
+        order = np.argsort(keys, kind='stable')
+        self.cell_keys = keys[order]
+        self.cell_tracks = tracks[order]
+
+    def _cells(self, degrees: np.ndarray) -> np.ndarray:
+        return np.floor(np.asarray(degrees) / self.cell_degrees).astype(np.int64)
+
+    def _candidates(self, min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> np.ndarray:
+        """Indexed tracks registered in any cell overlapping the box."""
+        row_low = max(int(self._cells(min_lat)) - self.row0, 0)
+        row_high = min(int(self._cells(max_lat)) - self.row0, self.n_rows - 1)
+        col_low = max(int(self._cells(min_lon)) - self.col0, 0)
+        col_high = min(int(self._cells(max_lon)) - self.col0, self.n_cols - 1)
+        if row_low > row_high or col_low > col_high:
+            return np.empty(0, dtype=np.int64)
+
+        # Within a grid row the covered cells have consecutive keys
+        row_keys = np.arange(row_low, row_high + 1) * self.n_cols
+        starts = np.searchsorted(self.cell_keys, row_keys + col_low, side='left')
+        ends = np.searchsorted(self.cell_keys, row_keys + col_high, side='right')
+        chunks = [self.cell_tracks[start:end] for start, end in zip(starts, ends) if end > start]
+        return np.unique(np.concatenate(chunks)) if chunks else np.empty(0, dtype=np.int64)
+
+    def _year_filter(self, tracks: np.ndarray, year_range: Tuple[int, int] = None) -> np.ndarray:
+        if year_range is None:
+            return tracks
+        years = self.years[tracks]
+        keep = np.ones(len(tracks), dtype=bool)
+        if year_range[0] is not None:
+            keep &= years >= year_range[0]
+        if year_range[1] is not None:
+            keep &= years <= year_range[1]
+        return tracks[keep]
+
+    def distance_km(self, tracks: np.ndarray, lat: float, lon: float) -> np.ndarray:
+        """Shortest distance from a point to each track segment (local equirectangular projection)."""
+        scale_x = KM_PER_DEGREE * np.cos(np.radians(lat))
+        ax, ay = (self.slon[tracks] - lon) * scale_x, (self.slat[tracks] - lat) * KM_PER_DEGREE
+        bx, by = (self.elon[tracks] - lon) * scale_x, (self.elat[tracks] - lat) * KM_PER_DEGREE
+        dx, dy = bx - ax, by - ay
+        length_sq = dx ** 2 + dy ** 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = np.where(length_sq > 0, -(ax * dx + ay * dy) / length_sq, 0.0)
+        t = np.clip(t, 0.0, 1.0)
+        return np.hypot(ax + t * dx, ay + t * dy)
+
+    def radius_search(self, lat: float, lon: float, radius_km: float,
+                      year_range: Tuple[int, int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (positions in data, distances in km) of tracks passing within radius_km, nearest first."""
+        lat_span = radius_km / KM_PER_DEGREE
+        lon_span = radius_km / (KM_PER_DEGREE * max(np.cos(np.radians(min(abs(lat) + lat_span, 89.9))), 1e-6))
+        tracks = self._year_filter(
+            self._candidates(lat - lat_span, lat + lat_span, lon - lon_span, lon + lon_span), year_range
+        )
+        distances = self.distance_km(tracks, lat, lon)
+        inside = distances <= radius_km
+        order = np.argsort(distances[inside], kind='stable')
+        return self.positions[tracks[inside][order]], distances[inside][order]
+
+    def bbox_search(self, min_lat: float, max_lat: float, min_lon: float, max_lon: float,
+                    year_range: Tuple[int, int] = None) -> np.ndarray:
+        """Return positions in data of tracks whose segment crosses the box (Liang-Barsky clipping)."""
+        tracks = self._year_filter(self._candidates(min_lat, max_lat, min_lon, max_lon), year_range)
+        x0, y0 = self.slon[tracks], self.slat[tracks]
+        dx, dy = self.elon[tracks] - x0, self.elat[tracks] - y0
+
+        t_enter = np.zeros(len(tracks))
+        t_exit = np.ones(len(tracks))
+        crosses = np.ones(len(tracks), dtype=bool)
+        for p, q in ((-dx, x0 - min_lon), (dx, max_lon - x0), (-dy, y0 - min_lat), (dy, max_lat - y0)):
+            parallel = p == 0
+            crosses &= ~(parallel & (q < 0))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                ratio = np.where(parallel, 0.0, q / np.where(parallel, 1.0, p))
+            t_enter = np.where(~parallel & (p < 0), np.maximum(t_enter, ratio), t_enter)
+            t_exit = np.where(~parallel & (p > 0), np.minimum(t_exit, ratio), t_exit)
+        return self.positions[tracks[crosses & (t_enter <= t_exit)]]
+
+    def nearest(self, lat: float, lon: float, k: int,
+                year_range: Tuple[int, int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (positions, distances in km) of the k tracks nearest to a point."""
+        radius = max(self.cell_degrees * KM_PER_DEGREE, 1.0)
+        # Grow the search radius until it holds k tracks, or covers the whole grid
+        while radius < 2 * np.pi * EARTH_RADIUS_KM:
+            positions, distances = self.radius_search(lat, lon, radius, year_range)
+            if len(positions) >= k:
+                return positions[:k], distances[:k]
+            radius *= 2
+
+        tracks = self._year_filter(np.arange(len(self.positions)), year_range)
+        distances = self.distance_km(tracks, lat, lon)
+        order = np.argsort(distances, kind='stable')[:k]
+        return self.positions[tracks[order]], distances[order]
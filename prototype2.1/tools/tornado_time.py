@@ -0,0 +1,39 @@
+# tools/tornado_time.py
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_DAY = 24 * 60
+# Stored for times that are missing or can't be parsed
+UNKNOWN_MINUTE = -1
+
+# Hour ranges [start, end) of the time-of-day buckets; night wraps past midnight
+TIME_OF_DAY_BUCKETS = {"morning": (6, 12), "afternoon": (12, 18), "evening": (18, 22), "night": (22, 6)}
+
+
+def parse_minutes_of_day(times: pd.Series) -> np.ndarray:
+    """Parse 'HH:MM:SS' strings into minutes since midnight (int16, UNKNOWN_MINUTE if unparseable)."""
+    durations = pd.to_timedelta(times.astype(str), errors='coerce')
+    minutes = (durations.dt.total_seconds() // 60).to_numpy()
+    valid = ~np.isnan(minutes) & (minutes >= 0) & (minutes < MINUTES_PER_DAY)
+    return np.where(valid, np.nan_to_num(minutes), UNKNOWN_MINUTE).astype(np.int16)
+
+
+def diurnal_histogram(minutes: np.ndarray, bin_minutes: int = 60) -> np.ndarray:
+    """Count tornadoes per bin_minutes-wide slot of the day, ignoring unknown times."""
+    if MINUTES_PER_DAY % bin_minutes:
+        raise ValueError("bin_minutes must divide a day evenly (e.g. 15, 30 or 60)")
+    minutes = np.asarray(minutes)
+    minutes = minutes[minutes >= 0]
+    return np.bincount(minutes.astype(np.int64) // bin_minutes, minlength=MINUTES_PER_DAY // bin_minutes)
+
+
+def time_of_day_counts(hourly_counts: np.ndarray) -> Dict[str, int]:
+    """Collapse 24 hourly counts into the morning/afternoon/evening/night buckets."""
+    counts = {}
+    for bucket, (start, end) in TIME_OF_DAY_BUCKETS.items():
+        hours = hourly_counts[start:end] if start < end else np.concatenate([hourly_counts[start:], hourly_counts[:end]])
+        counts[bucket] = int(hours.sum())
+    return counts
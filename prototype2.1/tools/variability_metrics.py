@@ -0,0 +1,109 @@
+# tools/variability_metrics.py
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Rolling standard deviation windows in hours: 3 hours, a day and a week
+ROLLING_WINDOWS = {"3h": 3, "24h": 24, "7d": 168}
+RAMP_PERCENTILES = (50, 90, 95, 99)
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Sample standard deviation of every full window of rows, for all columns at once.
+
+    Uses running sums of x and x^2 (after centering each column), so the cost is
+    independent of the window length; windows with fewer than two values are NaN.
+    """
+    known = ~np.isnan(values)
+    centered = np.where(known, values - np.nanmean(values, axis=0), 0.0)
+    zero = np.zeros((1, values.shape[1]))
+    sums = np.concatenate([zero, np.cumsum(centered, axis=0)])
+    squares = np.concatenate([zero, np.cumsum(centered ** 2, axis=0)])
+    counts = np.concatenate([zero, np.cumsum(known, axis=0)])
+
+    n = counts[window:] - counts[:-window]
+    total = sums[window:] - sums[:-window]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (squares[window:] - squares[:-window] - total ** 2 / n) / (n - 1)
+    return np.where(n >= 2, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+
+class VariabilityMetrics:
+    """Ramp rates and multi-timescale variability of every column of an hourly matrix."""
+
+    def __init__(self, values: np.ndarray, columns: List[str], windows: Dict[str, int] = None):
+        """
+        Args:
+            values: (hours, columns) array in time order, NaN for missing values
+            columns: Column names, in the order of values' columns
+            windows: Rolling window name -> length in hours (default ROLLING_WINDOWS)
+        """
+        values = np.asarray(values, dtype=float)
+        self.columns = {column: i for i, column in enumerate(columns)}
+        self.names = list(columns)
+        self.windows = windows or ROLLING_WINDOWS
+
+        ramps = np.diff(values, axis=0)
+        with np.errstate(invalid='ignore'):
+            self.mean_abs_ramp = np.nanmean(np.abs(ramps), axis=0)
+            self.max_ramp_up = np.nanmax(ramps, axis=0)
+            self.max_ramp_down = np.nanmin(ramps, axis=0)
+            self.ramp_percentiles = np.nanpercentile(np.abs(ramps), RAMP_PERCENTILES, axis=0)
+            self.std = np.nanstd(values, axis=0, ddof=1)
+            self.mean = np.nanmean(values, axis=0)
+            self.rolling_mean_std = {}
+            self.rolling_max_std = {}
+            for name, window in self.windows.items():
+                if len(values) < window:
+                    self.rolling_mean_std[name] = self.rolling_max_std[name] = np.full(len(columns), np.nan)
+                    continue
+                stds = rolling_std(values, window)
+                self.rolling_mean_std[name] = np.nanmean(stds, axis=0)
+                self.rolling_max_std[name] = np.nanmax(stds, axis=0)
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, columns: Sequence[str], time_column: str = 'time'):
+        """Build from the given columns of a DataFrame, sorted by its time column."""
+        order = np.argsort(pd.to_datetime(data[time_column]).to_numpy(), kind='stable')
+        return cls(data[list(columns)].to_numpy(dtype=float)[order], list(columns))
+
+    def column(self, name: str) -> int:
+        if name not in self.columns:
+            raise ValueError(f"No data available for: {name}")
+        return self.columns[name]
+
+    def summary(self, name: str) -> dict:
+        """All metrics of one column."""
+        col = self.column(name)
+        return {
+            "mean": float(self.mean[col]),
+            "std": float(self.std[col]),
+            "coefficient_of_variation": float(self.std[col] / self.mean[col]) if self.mean[col] else None,
+            "hourly_ramps": {
+                "mean_absolute_ramp": float(self.mean_abs_ramp[col]),
+                "max_ramp_up": float(self.max_ramp_up[col]),
+                "max_ramp_down": float(self.max_ramp_down[col]),
+                **{f"p{p}_absolute_ramp": float(self.ramp_percentiles[i, col])
+                   for i, p in enumerate(RAMP_PERCENTILES)}
+            },
+            "rolling_std": {
+                name: {
+                    "mean": float(self.rolling_mean_std[name][col]),
+                    "max": float(self.rolling_max_std[name][col])
+                }
+                for name in self.windows
+            }
+        }
+
+    def ranking(self, window: str = "24h") -> pd.DataFrame:
+        """One row per column, least variable (lowest mean rolling std over window) first."""
+        return pd.DataFrame({
+            "name": self.names,
+            "mean": self.mean,
+            "mean_abs_ramp": self.mean_abs_ramp,
+            "p95_abs_ramp": self.ramp_percentiles[RAMP_PERCENTILES.index(95)],
+            "rolling_std": self.rolling_mean_std[window],
+        }).sort_values("rolling_std", kind="stable").reset_index(drop=True)
@@ -0,0 +1,120 @@
+# tools/wind_correlation.py
+
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Rows per block when accumulating the Gram matrix
+BLOCK_ROWS = 8192
+
+
+class CorrelationMatrix:
+    """
+    Column x column covariance and correlation of an hourly matrix.
+
+    Each pair uses the hours where both columns have a value (pairwise-complete,
+    like DataFrame.corr/cov). Columns are centered on their means first, and the
+    cross products are accumulated over row blocks with float32 products summed
+    into float64 totals, so memory stays at one block and the result doesn't lose
+    precision over millions of hours.
+    """
+
+    def __init__(self, values: np.ndarray, columns: Sequence[str], block_rows: int = BLOCK_ROWS):
+        """
+        Args:
+            values: (hours, columns) array, NaN for missing values
+            columns: Column names, in the order of values' columns
+            block_rows: Rows per float32 block
+        """
+        self.names: List[str] = list(columns)
+        self.columns = {name: i for i, name in enumerate(self.names)}
+        values = np.asarray(values, dtype=float)
+        known = ~np.isnan(values)
+        counts = known.sum(axis=0)
+        means = np.nansum(values, axis=0) / np.maximum(counts, 1)
+        gaps = not known.all()
+
+        width = values.shape[1]
+        gram = np.zeros((width, width))
+        if gaps:
+            # [i, j]: sum of x_i and of x_i^2 over the hours where j is known, and overlap counts
+            sums, squares, overlap = np.zeros((width, width)), np.zeros((width, width)), np.zeros((width, width))
+        for start in range(0, len(values), block_rows):
+            block = np.nan_to_num(values[start:start + block_rows] - means).astype(np.float32)
+            gram += block.T @ block
+            if gaps:
+                mask = known[start:start + block_rows].astype(np.float32)
+                sums += block.T @ mask
+                squares += (block * block).T @ mask
+                overlap += mask.T @ mask
+        self.hours = len(values)
+
+        if gaps:
+            # Products around the pair's own means over its overlapping hours
+            with np.errstate(invalid='ignore', divide='ignore'):
+                gram = gram - sums * sums.T / overlap
+                variances = squares - sums ** 2 / overlap          # [i, j]: x_i over the overlap with j
+            pair_counts = overlap
+        else:
+            variances = np.broadcast_to(np.diag(gram)[:, None], gram.shape)
+            pair_counts = np.full((width, width), float(len(values)))
+
+        # Sample covariance over each pair's overlapping hours
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.covariance = np.where(pair_counts > 1, gram / (pair_counts - 1), np.nan)
+            self.std = np.sqrt(np.diag(self.covariance))
+            self.std[counts < 2] = np.nan
+            self.correlation = np.clip(gram / np.sqrt(variances * variances.T), -1.0, 1.0)
+        self.correlation[pair_counts < 2] = np.nan
+
+    def column(self, name: str) -> int:
+        if name not in self.columns:
+            raise ValueError(f"No data available for: {name}")
+        return self.columns[name]
+
+    def pair(self, first: str, second: str) -> dict:
+        """Correlation and covariance of two columns."""
+        i, j = self.column(first), self.column(second)
+        return {"correlation": float(self.correlation[i, j]), "covariance": float(self.covariance[i, j])}
+
+    def ranked_pairs(self, names: Sequence[str] = None) -> pd.DataFrame:
+        """Every distinct pair among names (default all columns), most correlated first."""
+        indexes = np.array([self.column(name) for name in names]) if names is not None else np.arange(len(self.names))
+        first, second = np.triu_indices(len(indexes), k=1)
+        first, second = indexes[first], indexes[second]
+        table = pd.DataFrame({
+            "first": np.array(self.names, dtype=object)[first],
+            "second": np.array(self.names, dtype=object)[second],
+            "correlation": self.correlation[first, second],
+            "covariance": self.covariance[first, second],
+        })
+        return table.dropna(subset=["correlation"]).sort_values(
+            "correlation", ascending=False, kind="stable"
+        ).reset_index(drop=True)
+
+    def partners(self, name: str) -> pd.Series:
+        """Correlation of one column with every other column, highest first."""
+        col = self.column(name)
+        others = [i for i in range(len(self.names)) if i != col]
+        return pd.Series(self.correlation[col, others], index=[self.names[i] for i in others]).sort_values(
+            ascending=False, kind="stable"
+        ).dropna()
+
+    def smoothing_benefit(self, names: Sequence[str] = None) -> dict:
+        """
+        How much pooling columns smooths output: the std of their equally weighted
+        mean against the average std of the individual columns.
+        """
+        indexes = np.array([self.column(name) for name in names]) if names is not None else np.arange(len(self.names))
+        indexes = indexes[~np.isnan(self.std[indexes])]
+        if len(indexes) < 2:
+            raise ValueError("At least two columns with data are needed for a smoothing benefit")
+        pooled_std = float(np.sqrt(self.covariance[np.ix_(indexes, indexes)].sum()) / len(indexes))
+        average_std = float(self.std[indexes].mean())
+        return {
+            "columns": len(indexes),
+            "average_individual_std": average_std,
+            "pooled_std": pooled_std,
+            "variability_reduction": 1 - pooled_std / average_std if average_std else None,
+        }
@@ -1,5 +1,11 @@
-from typing import Dict
+from typing import Dict, List
 from Base_Tool.base_tool import SingleMessageTool
+from Tools.dataset_version import DerivedCache
+from Tools.region_registry import RegionRegistry, country_column_map
+from Tools.variability_metrics import VariabilityMetrics
+from Tools.wind_correlation import CorrelationMatrix
+from Tools.wind_statistics import WindStatistics, season_numbers
+import numpy as np
 import pandas as pd
 
 class WindNationalTool(SingleMessageTool):
@@ -8,6 +14,7 @@ class WindNationalTool(SingleMessageTool):
     def __init__(self, wind_data):
         """Initialize with wind power data."""
         self.wind_data = wind_data
+        self._derived = DerivedCache()
         self.country_iso_map = {
             'Albania': 'AL',
             'Austria': 'AT',
@@ -57,18 +64,30 @@ class WindNationalTool(SingleMessageTool):
     def get_params_definition(self) -> Dict[str, dict]:
         return {
             "analysis_type": {
-                "description": "Type of analysis: 'top_performers', 'seasonal_pattern', or 'country_comparison'",
+                "description": ("Type of analysis: 'top_performers', 'seasonal_pattern', 'country_comparison', "
+                                "'country_statistics' (mean, std, percentiles, seasonal means, rank and duration "
+                                "curve of one country), 'regional_pattern' (mean capacity factor of a region or custom country group), or "
+                                "'variability' (hourly ramp rates and 3h/24h/7d rolling variability of a country, "
+                                "or all countries ranked from most to least consistent), or 'correlation' (correlation "
+                                "between two countries, a country's most correlated partners, or the most and least "
+                                "correlated pairs and the smoothing benefit of pooling countries)"),
                 "type": "string",
                 "required": True,
-                "enum": ["top_performers", "seasonal_pattern", "country_comparison"]
+                "enum": ["top_performers", "seasonal_pattern", "country_comparison", "country_statistics",
+                         "regional_pattern", "variability", "correlation"]
             },
             "country": {
-                "description": "Country name for specific analysis (required for country_comparison)",
+                "description": "Country name for specific analysis (required for country_comparison and country_statistics)",
+                "type": "string",
+                "required": False
+            },
+            "comparison_country": {
+                "description": "Second country name for correlation",
                 "type": "string",
                 "required": False
             },
             "season": {
-                "description": "Season number (1-4) for seasonal analysis",
+                "description": "Season number (1-4) for seasonal analysis, or to restrict correlation to one season",
                 "type": "integer",
                 "required": False
             },
@@ -76,10 +95,23 @@ class WindNationalTool(SingleMessageTool):
                 "description": "Number of top countries to return",
                 "type": "integer",
                 "required": False
+            },
+            "region": {
+                "description": ("Region for regional_pattern: 'eu27', 'nordics', 'baltics', 'benelux', 'iberia', "
+                                "'british_isles', 'balkans', 'northern_europe', 'central_europe' or 'southern_europe'"),
+                "type": "string",
+                "required": False
+            },
+            "countries": {
+                "description": "Country ISO codes forming a custom region for regional_pattern (e.g. ['DE', 'DK', 'NL'])",
+                "type": "array",
+                "items": {"type": "string"},
+                "required": False
             }
         }
 
-    def run_impl(self, analysis_type: str, country: str = None, season: int = None, top_n: int = 5):
+    def run_impl(self, analysis_type: str, country: str = None, season: int = None, top_n: int = 5,
+                 region: str = None, countries: List[str] = None, comparison_country: str = None):
         """Implement the tool logic."""
         try:
             if analysis_type == "top_performers":
@@ -92,34 +124,67 @@ class WindNationalTool(SingleMessageTool):
                 if not country:
                     raise ValueError("Country is required for country comparison")
                 return self.compare_country_performance(country)
+            elif analysis_type == "country_statistics":
+                if not country:
+                    raise ValueError("Country is required for country statistics")
+                return self.analyze_country_statistics(country)
+            elif analysis_type == "regional_pattern":
+                if not region and not countries:
+                    raise ValueError("A region or a list of countries is required for regional analysis")
+                return self.analyze_regional_pattern(region or countries)
+            elif analysis_type == "variability":
+                return self.analyze_variability(country)
+            elif analysis_type == "correlation":
+                if season and season not in [1, 2, 3, 4]:
+                    raise ValueError("Season must be between 1 and 4")
+                return self.analyze_correlation(country, comparison_country, season, top_n or 5)
             else:
                 raise ValueError(f"Unknown analysis type: {analysis_type}")
         except Exception as e:
             raise Exception(f"Error in wind power analysis: {str(e)}")
 
+    def _seasons(self) -> np.ndarray:
+        """Season (1-4, winter first) of every hourly row."""
+        return self._derived.get(self.wind_data, "seasons", lambda data: season_numbers(data['time']))
+
+    def _statistics(self) -> WindStatistics:
+        """Per-country statistics of the wind data, computed once per dataset version (see wind_statistics.py)."""
+        return self._derived.get(self.wind_data, "statistics", WindStatistics)
+
+    def _correlation(self, season: int = None) -> CorrelationMatrix:
+        """Country x country correlation matrix, over all hours or one season (see wind_correlation.py)."""
+        def build(data: pd.DataFrame) -> CorrelationMatrix:
+            columns = country_column_map(data)
+            values = data[list(columns.values())].to_numpy(dtype=float)
+            if season:
+                values = values[self._seasons() == season]
+            return CorrelationMatrix(values, list(columns))
+
+        return self._derived.get(self.wind_data, ("correlation", season), build)
+
+    def _regions(self) -> RegionRegistry:
+        """Region groupings of the wind data, with their mean series cached (see region_registry.py)."""
+        return self._derived.get(self.wind_data, "regions", RegionRegistry)
+
+    def _variability(self) -> VariabilityMetrics:
+        """Ramp and rolling-variability metrics of every country (see variability_metrics.py)."""
+        return self._derived.get(
+            self.wind_data, "variability",
+            lambda data: VariabilityMetrics.from_frame(data, list(country_column_map(data).values()))
+        )
+
     def get_top_performing_countries(self, top_n: int = 5):
         """Get the top performing countries based on average capacity factor."""
         try:
-            # Convert time to datetime
-            self.wind_data['datetime'] = pd.to_datetime(self.wind_data['time'])
-            
-            # Get numeric columns (country data)
-            numeric_cols = self.wind_data.select_dtypes(include=['float64', 'int64']).columns
-            
-            # Calculate average capacity factor for each country
-            country_averages = self.wind_data[numeric_cols].mean().sort_values(ascending=False)
-            
-            # Get top N countries
-            top_countries = country_averages.head(top_n)
-            
+            stats = self._statistics()
             return {
                 "analysis": "top_performers",
                 "results": [
                     {
                         "country": country,
-                        "average_capacity_factor": float(value)
+                        "average_capacity_factor": float(stats.mean[stats.column(country)])
                     }
-                    for country, value in top_countries.items()
+                    for country in stats.top(top_n)
                 ]
             }
         except Exception as e:
@@ -128,40 +193,20 @@ class WindNationalTool(SingleMessageTool):
     def analyze_seasonal_patterns(self, season: int = None):
         """Analyze seasonal patterns in wind power capacity."""
         try:
-            # Convert time to datetime and extract season
-            self.wind_data['datetime'] = pd.to_datetime(self.wind_data['time'])
-            self.wind_data['season'] = self.wind_data['datetime'].dt.month % 12 // 3 + 1
-            
-            # Get numeric columns (country data)
-            numeric_cols = self.wind_data.select_dtypes(include=['float64', 'int64']).columns
-            
+            stats = self._statistics()
             if season:
                 # Analyze specific season
-                seasonal_data = self.wind_data[self.wind_data['season'] == season]
-                seasonal_avg = seasonal_data[numeric_cols].mean()
-                
                 return {
                     "analysis": "seasonal_pattern",
                     "season": season,
-                    "results": {
-                        country: float(value)
-                        for country, value in seasonal_avg.items()
-                    }
-                }
-            else:
-                # Analyze all seasons
-                seasonal_avg = self.wind_data.groupby('season')[numeric_cols].mean()
-                
-                return {
-                    "analysis": "seasonal_pattern",
-                    "results": {
-                        int(season): {
-                            country: float(value)
-                            for country, value in row.items()
-                        }
-                        for season, row in seasonal_avg.iterrows()
-                    }
+                    "results": stats.seasonal(season)
                 }
+
+            # Analyze all seasons
+            return {
+                "analysis": "seasonal_pattern",
+                "results": {season: stats.seasonal(season) for season in range(1, 5)}
+            }
         except Exception as e:
             raise Exception(f"Error analyzing seasonal patterns: {str(e)}")
 
@@ -170,29 +215,134 @@ class WindNationalTool(SingleMessageTool):
         try:
             if country not in self.country_iso_map:
                 raise ValueError(f"Unknown country: {country}")
-            
-            # Convert time to datetime
-            self.wind_data['datetime'] = pd.to_datetime(self.wind_data['time'])
-            
-            # Get numeric columns (country data)
-            numeric_cols = self.wind_data.select_dtypes(include=['float64', 'int64']).columns
-            
-            # Calculate average capacity factors
-            country_averages = self.wind_data[numeric_cols].mean()
-            overall_avg = country_averages.mean()
-            country_value = country_averages[self.country_iso_map[country]]
-            
-            # Calculate ranking
-            ranking = (country_averages > country_value).sum() + 1
-            
+
+            stats = self._statistics()
+            code = self.country_iso_map[country]
+            country_value = stats.mean[stats.column(code)]
+            overall_avg = np.nanmean(stats.mean)
+
             return {
                 "analysis": "country_comparison",
                 "country": country,
                 "capacity_factor": float(country_value),
                 "overall_average": float(overall_avg),
-                "ranking": int(ranking),
-                "total_countries": len(country_averages),
+                "ranking": stats.rank(code),
+                "total_countries": len(stats.countries),
                 "performance_vs_avg": float(country_value - overall_avg)
             }
         except Exception as e:
-            raise Exception(f"Error comparing country performance: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Error comparing country performance: {str(e)}")
+
+    def analyze_country_statistics(self, country: str):
+        """Full capacity factor statistics of one country, including its duration curve."""
+        try:
+            code = self.country_iso_map.get(country, country)
+            return {
+                "analysis": "country_statistics",
+                "country": country,
+                "total_countries": len(self._statistics().countries),
+                **self._statistics().summary(code)
+            }
+        except Exception as e:
+            raise Exception(f"Error calculating country statistics: {str(e)}")
+
+    def analyze_regional_pattern(self, region):
+        """Analyze the mean capacity factor of a region, overall and per season."""
+        try:
+            registry = self._regions()
+            series = registry.series(region)
+            seasons = self._seasons()
+            seasonal = {
+                int(season): float(np.nanmean(series[seasons == season])) for season in np.unique(seasons)
+            }
+
+            return {
+                "analysis": "regional_pattern",
+                "region": region if isinstance(region, str) else "custom",
+                "countries": registry.members(region),
+                "average_capacity_factor": float(np.nanmean(series)),
+                "capacity_factor_std": float(np.nanstd(series)),
+                "seasonal_averages": seasonal,
+                "best_season": max(seasonal, key=seasonal.get)
+            }
+        except Exception as e:
+            raise Exception(f"Error analyzing regional pattern: {str(e)}")
+
+    def analyze_variability(self, country: str = None):
+        """Ramp rates and multi-timescale variability of one country, or all countries ranked."""
+        try:
+            metrics = self._variability()
+            if country:
+                code = self.country_iso_map.get(country, country)
+                if code not in metrics.columns:
+                    raise ValueError(f"Unknown country: {country}")
+                return {
+                    "analysis": "variability",
+                    "country": country,
+                    **metrics.summary(code)
+                }
+
+            ranking = metrics.ranking()
+            return {
+                "analysis": "variability",
+                "ranking_window": "24h",
+                "most_consistent": ranking["name"].head(3).tolist(),
+                "most_variable": ranking["name"].tail(3)[::-1].tolist(),
+                "results": [
+                    {
+                        "country": row["name"],
+                        "average_capacity_factor": float(row["mean"]),
+                        "mean_absolute_ramp": float(row["mean_abs_ramp"]),
+                        "p95_absolute_ramp": float(row["p95_abs_ramp"]),
+                        "mean_24h_rolling_std": float(row["rolling_std"])
+                    }
+                    for row in ranking.to_dict("records")
+                ]
+            }
+        except Exception as e:
+            raise Exception(f"Error analyzing variability: {str(e)}")
+
+    def analyze_correlation(self, country: str = None, comparison_country: str = None,
+                            season: int = None, top_n: int = 5):
+        """Correlation of wind output between countries."""
+        try:
+            matrix = self._correlation(season)
+            result = {"analysis": "correlation", "season": season}
+            if country and comparison_country:
+                return {
+                    **result,
+                    "country": country,
+                    "comparison_country": comparison_country,
+                    **matrix.pair(self.country_iso_map.get(country, country),
+                                  self.country_iso_map.get(comparison_country, comparison_country)),
+                    "smoothing_benefit": matrix.smoothing_benefit([
+                        self.country_iso_map.get(country, country),
+                        self.country_iso_map.get(comparison_country, comparison_country)
+                    ])
+                }
+            if country:
+                partners = matrix.partners(self.country_iso_map.get(country, country))
+                return {
+                    **result,
+                    "country": country,
+                    "most_correlated": {code: float(value) for code, value in partners.head(top_n).items()},
+                    "least_correlated": {code: float(value) for code, value in partners.tail(top_n)[::-1].items()}
+                }
+
+            pairs = matrix.ranked_pairs()
+
+            def pair_list(rows: pd.DataFrame):
+                return [
+                    {"countries": [row["first"], row["second"]], "correlation": float(row["correlation"])}
+                    for row in rows.to_dict("records")
+                ]
+
+            return {
+                **result,
+                "most_correlated_pairs": pair_list(pairs.head(top_n)),
+                "least_correlated_pairs": pair_list(pairs.tail(top_n)[::-1]),
+                "average_correlation": float(pairs["correlation"].mean()),
+                "smoothing_benefit": matrix.smoothing_benefit()
+            }
+        except Exception as e:
+            raise Exception(f"Error analyzing correlation: {str(e)}")
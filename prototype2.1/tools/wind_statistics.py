@@ -0,0 +1,82 @@
+# tools/wind_statistics.py
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from Tools.region_registry import country_column_map
+
+# Share of hours (in %) at which the duration curve is sampled: 0, 5, ..., 100
+DURATION_POINTS = np.arange(0, 101, 5)
+SEASON_NAMES = {1: "winter", 2: "spring", 3: "summer", 4: "fall"}
+
+
+def season_numbers(times: pd.Series) -> np.ndarray:
+    """Season of each timestamp: 1 = Dec-Feb, 2 = Mar-May, 3 = Jun-Aug, 4 = Sep-Nov."""
+    return (pd.to_datetime(times).dt.month % 12 // 3 + 1).to_numpy()
+
+
+class WindStatistics:
+    """
+    Per-country capacity factor statistics of an hourly wind matrix, computed once:
+    mean, std, percentiles / duration curve, seasonal means and rank order.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        """Compute every statistic for all country columns of data in a few matrix passes."""
+        columns = country_column_map(data)
+        self.countries: List[str] = list(columns)
+        values = data[list(columns.values())].to_numpy(dtype=float)
+        known = ~np.isnan(values)
+        filled = np.where(known, values, 0.0)
+        counts = known.sum(axis=0)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.mean = filled.sum(axis=0) / counts
+            self.std = np.sqrt(((np.where(known, values - self.mean, 0.0)) ** 2).sum(axis=0) / (counts - 1))
+            # Capacity factor exceeded in DURATION_POINTS % of the hours
+            self.duration_curve = np.nanpercentile(values, 100 - DURATION_POINTS, axis=0)
+
+            # Season sums and counts as one season one-hot x values product
+            seasons = season_numbers(data['time'])
+            one_hot = (seasons[None, :] == np.arange(1, 5)[:, None]).astype(float)
+            self.seasonal_mean = (one_hot @ filled) / (one_hot @ known)        # (4, countries)
+
+        # Countries by descending mean; ties keep column order
+        self.order = np.argsort(-self.mean, kind='stable')
+        self._sorted_means = np.sort(self.mean)
+        self.columns = {country: i for i, country in enumerate(self.countries)}
+
+    def column(self, code: str) -> int:
+        if code not in self.columns:
+            raise ValueError(f"No data available for country code: {code}")
+        return self.columns[code]
+
+    def top(self, n: int) -> List[str]:
+        """The n countries with the highest mean capacity factor."""
+        return [self.countries[i] for i in self.order[:n]]
+
+    def rank(self, code: str) -> int:
+        """1 + number of countries with a strictly higher mean."""
+        value = self.mean[self.column(code)]
+        return int(len(self._sorted_means) - np.searchsorted(self._sorted_means, value, side='right') + 1)
+
+    def seasonal(self, season: int) -> Dict[str, float]:
+        """Mean capacity factor of every country in a season (1-4)."""
+        return {country: float(value) for country, value in zip(self.countries, self.seasonal_mean[season - 1])}
+
+    def summary(self, code: str) -> dict:
+        """All statistics of one country."""
+        col = self.column(code)
+        return {
+            "mean": float(self.mean[col]),
+            "std": float(self.std[col]),
+            "percentiles": {f"p{p}": float(self.duration_curve[DURATION_POINTS == 100 - p, col][0])
+                            for p in (5, 25, 50, 75, 95)},
+            "seasonal_means": {SEASON_NAMES[season]: float(self.seasonal_mean[season - 1, col])
+                               for season in SEASON_NAMES},
+            "rank": self.rank(code),
+            "duration_curve": {f"{point}%": float(value)
+                               for point, value in zip(DURATION_POINTS, self.duration_curve[:, col])},
+        }